@@ -10,32 +10,24 @@ from rlcard.agents import (
 )
 from rlcard.utils import (
     get_device,
+    load_model,
     set_seed,
     tournament,
 )
-
-def load_model(model_path, env=None, position=None, device=None):
-    if os.path.isfile(model_path):  # Torch model
-        import torch
-        agent = torch.load(model_path, map_location=device)
-        agent.set_device(device)
-    elif os.path.isdir(model_path):  # CFR model
-        from rlcard.agents import CFRAgent
-        agent = CFRAgent(env, model_path)
-        agent.load()
-    elif model_path == 'random':  # Random model
-        from rlcard.agents import RandomAgent
-        agent = RandomAgent(num_actions=env.num_actions)
-    else:  # A model in the model zoo
-        from rlcard import models
-        agent = models.load(model_path).agents[position]
-    
-    return agent
+from rlcard.utils.parallel_tournament import ParallelTournament
 
 def evaluate(args):
 
     # Check whether gpu is available
     device = get_device()
+
+    if args.num_workers > 0:
+        # Play the games in worker processes, which load the models once
+        with ParallelTournament(args.env, args.models, num_workers=args.num_workers, device=device) as parallel_tournament:
+            result = parallel_tournament.run(args.num_games, seed=args.seed)
+        for position, (mean, var) in enumerate(zip(result.mean, result.var)):
+            print(position, args.models[position], mean, var)
+        return
         
     # Seed numpy, torch, random
     set_seed(args.seed)
@@ -94,6 +86,12 @@ if __name__ == '__main__':
         type=int,
         default=10000,
     )
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        default=0,
+        help='The number of worker processes, or 0 to play the games in this process',
+    )
 
     args = parser.parse_args()
 
@@ -1,4 +1,5 @@
 ''' An example of solve Leduc Hold'em with CFR (chance sampling)
+or Monte Carlo CFR (external or outcome sampling)
 '''
 import os
 import argparse
@@ -14,6 +15,7 @@ from rlcard.utils import (
     Logger,
     plot_curve,
 )
+from rlcard.utils.exploitability import exploitability
 
 def train(args):
     # Make environments, CFR only supports Leduc Holdem
@@ -22,6 +24,8 @@ def train(args):
         config={
             'seed': 0,
             'allow_step_back': True,
+            # The traversals read the states with get_state
+            'lazy_state': True,
         }
     )
     eval_env = rlcard.make(
@@ -41,6 +45,9 @@ def train(args):
             args.log_dir,
             'cfr_model',
         ),
+        sampling=args.sampling,
+        plus=args.plus,
+        num_workers=args.num_workers,
     )
     agent.load()  # If we have saved model, we first load the model
 
@@ -65,9 +72,12 @@ def train(args):
                         args.num_eval_games
                     )[0]
                 )
+                # Exact and deterministic, unlike the tournament
+                logger.log('  exploitability |  ' + str(exploitability(eval_env, agent)))
 
         # Get the paths
         csv_path, fig_path = logger.csv_path, logger.fig_path
+    agent.close()
     # Plot the learning curve
     plot_curve(csv_path, fig_path, 'cfr')
 
@@ -93,6 +103,27 @@ if __name__ == '__main__':
         type=int,
         default=100,
     )
+    parser.add_argument(
+        '--sampling',
+        type=str,
+        default='chance',
+        choices=[
+            'chance',
+            'external',
+            'outcome',
+        ],
+    )
+    parser.add_argument(
+        '--plus',
+        action='store_true',
+        help='Use CFR+ regret flooring',
+    )
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        default=1,
+        help='The number of processes that traverse the game tree',
+    )
     parser.add_argument(
         '--log_dir',
         type=str,
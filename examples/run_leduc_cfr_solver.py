@@ -0,0 +1,83 @@
+''' An example of solving Leduc Hold'em with the full-width CFR+ solver.
+The saved model can be loaded by CFRAgent, e.g., with --model_path
+rlcard/models/pretrained/leduc_holdem_cfr to regenerate the pretrained model
+'''
+import argparse
+
+import rlcard
+from rlcard.agents import (
+    CFRAgent,
+    LeducCFRSolver,
+    RandomAgent,
+)
+from rlcard.utils import (
+    set_seed,
+    tournament,
+)
+from rlcard.utils.exploitability import exploitability
+
+def solve(args):
+    # Seed numpy, torch, random
+    set_seed(args.seed)
+
+    solver = LeducCFRSolver(args.model_path, plus=not args.no_plus)
+    for iteration in range(1, args.num_iterations+1):
+        solver.train()
+        if iteration % args.evaluate_every == 0:
+            print('Iteration {}, exploitability: {:.6f}'.format(iteration, solver.exploitability()))
+    solver.save()
+
+    # Evaluate the saved model against random
+    env = rlcard.make(
+        'leduc-holdem',
+        config={
+            'seed': args.seed,
+        }
+    )
+    agent = CFRAgent(env, args.model_path)
+    agent.load()
+    env.set_agents([
+        agent,
+        RandomAgent(num_actions=env.num_actions),
+    ])
+    print('Reward against random: {}'.format(tournament(env, args.num_eval_games)[0]))
+    # The observations of the environment do not include the betting history,
+    # so the saved model is more exploitable than the solved policy
+    print('Exploitability of the saved model: {:.6f}'.format(exploitability(env, agent)))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("Leduc Hold'em CFR+ solver example in RLCard")
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+    )
+    parser.add_argument(
+        '--num_iterations',
+        type=int,
+        default=1000,
+    )
+    parser.add_argument(
+        '--num_eval_games',
+        type=int,
+        default=2000,
+    )
+    parser.add_argument(
+        '--evaluate_every',
+        type=int,
+        default=100,
+    )
+    parser.add_argument(
+        '--no_plus',
+        action='store_true',
+        help='Do not floor the regrets at zero',
+    )
+    parser.add_argument(
+        '--model_path',
+        type=str,
+        default='experiments/leduc_holdem_cfr_solver/cfr_model',
+    )
+
+    args = parser.parse_args()
+
+    solve(args)
@@ -57,32 +57,56 @@ def train(args):
 
     # Start training
     with Logger(args.log_dir) as logger:
-        for episode in range(args.num_episodes):
-
-            if args.algorithm == 'nfsp':
-                agents[0].sample_episode_policy()
-
-            # Generate data from the environment
-            trajectories, payoffs = env.run(is_training=True)
-
-            # Reorganaize the data to be state, action, reward, next_state, done
-            trajectories = reorganize(trajectories, payoffs)
-
-            # Feed transitions into agent memory, and train the agent
-            # Here, we assume that DQN always plays the first position
-            # and the other players play randomly (if any)
-            for ts in trajectories[0]:
-                agent.feed(ts)
-
-            # Evaluate the performance. Play with random agents.
-            if episode % args.evaluate_every == 0:
-                logger.log_performance(
-                    env.timestep,
+        if args.num_actors > 0:
+            # Ape-X style: actor processes feed a shared replay memory
+            # and the agent is trained in this process
+            from rlcard.agents.distributed_dqn import DistributedDQNTrainer
+            if args.algorithm != 'dqn':
+                raise ValueError('Distributed training only supports DQN')
+            trainer = DistributedDQNTrainer(
+                env,
+                agent,
+                opponents=agents[1:],
+                num_actors=args.num_actors,
+                seed=args.seed,
+            )
+            trainer.start(
+                args.num_train_steps,
+                callback=lambda trainer: logger.log_performance(
+                    trainer.num_frames,
                     tournament(
                         env,
                         args.num_eval_games,
                     )[0]
-                )
+                ),
+                callback_every=args.evaluate_every,
+            )
+        else:
+            for episode in range(args.num_episodes):
+
+                if args.algorithm == 'nfsp':
+                    agents[0].sample_episode_policy()
+
+                # Generate data from the environment, recorded in arrays
+                trajectories, payoffs = env.run(is_training=True, columnar=True)
+
+                # Reorganaize the data to be state, action, reward, next_state, done
+                trajectories = reorganize(trajectories, payoffs)
+
+                # Feed transitions into agent memory, and train the agent
+                # Here, we assume that DQN always plays the first position
+                # and the other players play randomly (if any)
+                agent.feed_batch(trajectories[0])
+
+                # Evaluate the performance. Play with random agents.
+                if episode % args.evaluate_every == 0:
+                    logger.log_performance(
+                        env.timestep,
+                        tournament(
+                            env,
+                            args.num_eval_games,
+                        )[0]
+                    )
 
         # Get the paths
         csv_path, fig_path = logger.csv_path, logger.fig_path
@@ -152,6 +176,18 @@ if __name__ == '__main__':
         type=str,
         default='experiments/leduc_holdem_dqn_result/',
     )
+    parser.add_argument(
+        '--num_actors',
+        type=int,
+        default=0,
+        help='The number of actor processes for distributed DQN training. 0 trains in a single loop',
+    )
+    parser.add_argument(
+        '--num_train_steps',
+        type=int,
+        default=100000,
+        help='The number of training steps of the learner in distributed training',
+    )
 
     args = parser.parse_args()
 
@@ -1,18 +1,38 @@
-import subprocess
-import sys
-from distutils.version import LooseVersion
-
-reqs = subprocess.check_output([sys.executable, '-m', 'pip', 'freeze'])
-installed_packages = [r.decode().split('==')[0] for r in reqs.split()]
-
-if 'torch' in installed_packages:
-    from rlcard.agents.dqn_agent import DQNAgent as DQNAgent
-    from rlcard.agents.nfsp_agent import NFSPAgent as NFSPAgent
-
-from rlcard.agents.cfr_agent import CFRAgent
-from rlcard.agents.human_agents.limit_holdem_human_agent import HumanAgent as LimitholdemHumanAgent
-from rlcard.agents.human_agents.nolimit_holdem_human_agent import HumanAgent as NolimitholdemHumanAgent
-from rlcard.agents.human_agents.leduc_holdem_human_agent import HumanAgent as LeducholdemHumanAgent
-from rlcard.agents.human_agents.blackjack_human_agent import HumanAgent as BlackjackHumanAgent
-from rlcard.agents.human_agents.uno_human_agent import HumanAgent as UnoHumanAgent
-from rlcard.agents.random_agent import RandomAgent
+''' Agents are imported on first access, so that importing the package does
+not import torch or the human agents
+'''
+import importlib
+
+from rlcard.utils.utils import is_torch_available
+
+# name of agent: (module, class name)
+_AGENTS = {
+    'DQNAgent': ('rlcard.agents.dqn_agent', 'DQNAgent'),
+    'NFSPAgent': ('rlcard.agents.nfsp_agent', 'NFSPAgent'),
+    'CFRAgent': ('rlcard.agents.cfr_agent', 'CFRAgent'),
+    'LeducCFRSolver': ('rlcard.agents.leduc_cfr_solver', 'LeducCFRSolver'),
+    'LimitholdemHumanAgent': ('rlcard.agents.human_agents.limit_holdem_human_agent', 'HumanAgent'),
+    'NolimitholdemHumanAgent': ('rlcard.agents.human_agents.nolimit_holdem_human_agent', 'HumanAgent'),
+    'LeducholdemHumanAgent': ('rlcard.agents.human_agents.leduc_holdem_human_agent', 'HumanAgent'),
+    'BlackjackHumanAgent': ('rlcard.agents.human_agents.blackjack_human_agent', 'HumanAgent'),
+    'UnoHumanAgent': ('rlcard.agents.human_agents.uno_human_agent', 'HumanAgent'),
+    'RandomAgent': ('rlcard.agents.random_agent', 'RandomAgent'),
+}
+
+# agents only available with torch installed
+_TORCH_AGENTS = ('DQNAgent', 'NFSPAgent')
+
+__all__ = [name for name in _AGENTS if name not in _TORCH_AGENTS or is_torch_available()]
+
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+    mod_name, class_name = _AGENTS[name]
+    agent = getattr(importlib.import_module(mod_name), class_name)
+    globals()[name] = agent
+    return agent
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,31 +1,515 @@
 import numpy as np
-import collections
 
 import os
 import pickle
+import hashlib
+import multiprocessing
 
 from rlcard.utils.utils import *
 
+def _save_array(path, array):
+    ''' Save an array as a .npy file through a temporary file. The file may
+    be memory-mapped by a loaded table, so it is replaced rather than
+    truncated while the saved arrays are read from it.
+    '''
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+class InfoSetTable(object):
+    ''' Tabular storage for the information sets of CFR.
+
+    Every information set is a row identified by a 64-bit hash of its
+    observation. The values of a row are only stored for the legal actions,
+    and all the rows live in contiguous float32 arrays (like a CSR matrix),
+    where row i spans `offsets[i]:offsets[i+1]`. The capacities grow by
+    doubling.
+
+    The actions of a row are sorted. If an observation is met again with
+    actions that are not in its row yet, the row is widened to the union
+    of the legal actions.
+    '''
+
+    FIELDS = ('regrets', 'average_policy', 'policy')
+
+    def __init__(self, capacity=1024):
+        ''' Initialize an empty table
+
+        Args:
+            capacity (int): The initial number of rows
+        '''
+        self.num_rows = 0
+        self.num_values = 0
+        self._index = {}
+        self._keys = np.zeros(capacity, dtype=np.uint64)
+        self._offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self._reach_probs = np.zeros(capacity, dtype=np.float64)
+        self._actions = np.zeros(capacity, dtype=np.int32)
+        self._values = {field: np.zeros(capacity, dtype=np.float32) for field in self.FIELDS}
+
+    @staticmethod
+    def hash_key(obs):
+        ''' Get the 64-bit key of an observation
+
+        Args:
+            obs (numpy.array or bytes): The observation
+
+        Returns:
+            (int): The key
+        '''
+        if isinstance(obs, np.ndarray):
+            obs = obs.tobytes()
+        return int.from_bytes(hashlib.blake2b(obs, digest_size=8).digest(), 'little')
+
+    def __len__(self):
+        return self.num_rows
+
+    def __contains__(self, key):
+        return key in self._index
+
+    @property
+    def keys(self):
+        return self._keys[:self.num_rows]
+
+    @property
+    def offsets(self):
+        return self._offsets[:self.num_rows+1]
+
+    @property
+    def reach_probs(self):
+        ''' The reach probabilities accumulated for each row since the last
+        `update_average_policy`. They are not saved.
+        '''
+        return self._reach_probs[:self.num_rows]
+
+    @property
+    def actions(self):
+        return self._actions[:self.num_values]
+
+    @property
+    def regrets(self):
+        return self._values['regrets'][:self.num_values]
+
+    @property
+    def average_policy(self):
+        return self._values['average_policy'][:self.num_values]
+
+    @property
+    def policy(self):
+        return self._values['policy'][:self.num_values]
+
+    def find(self, key):
+        ''' Find the row of a key
+
+        Args:
+            key (int): The key of the information set
+
+        Returns:
+            (int): The row index, or None if the key is not in the table
+        '''
+        return self._index.get(key)
+
+    def add(self, key, legal_actions):
+        ''' Add a row for a new information set. The policy is initialized
+        to be uniform over the legal actions, the other fields to zeros.
+
+        Args:
+            key (int): The key of the information set
+            legal_actions (list): The legal actions of the information set
+
+        Returns:
+            (int): The row index
+        '''
+        legal_actions = np.unique(legal_actions)
+        num_legal_actions = len(legal_actions)
+        if self.num_rows + 1 > len(self._keys):
+            self._keys = self._grow(self._keys, self.num_rows + 1)
+        if self.num_rows + 2 > len(self._offsets):
+            self._offsets = self._grow(self._offsets, self.num_rows + 2)
+        if self.num_rows + 1 > len(self._reach_probs):
+            self._reach_probs = self._grow(self._reach_probs, self.num_rows + 1)
+        self._reserve(self.num_values + num_legal_actions)
+
+        row = self.num_rows
+        start, end = self.num_values, self.num_values + num_legal_actions
+        self._keys[row] = key
+        self._offsets[row+1] = end
+        self._reach_probs[row] = 0
+        self._actions[start:end] = legal_actions
+        for field in self.FIELDS:
+            self._values[field][start:end] = 0
+        self._values['policy'][start:end] = 1.0 / num_legal_actions
+
+        self._index[key] = row
+        self.num_rows += 1
+        self.num_values = end
+        return row
+
+    def get_positions(self, key, legal_actions):
+        ''' Find the positions of the legal actions of an information set
+        in the value arrays. The row is added or widened if needed.
+
+        Args:
+            key (int): The key of the information set
+            legal_actions (numpy.array): The sorted legal actions of the information set
+
+        Returns:
+            (tuple) that contains:
+                row (int): The row index
+                positions (numpy.array): The positions of the legal actions
+        '''
+        row = self._index.get(key)
+        if row is None:
+            row = self.add(key, legal_actions)
+        start, end = self._offsets[row], self._offsets[row+1]
+        if end - start == len(legal_actions) and np.array_equal(self._actions[start:end], legal_actions):
+            return row, np.arange(start, end)
+        positions = start + np.searchsorted(self._actions[start:end], legal_actions)
+        if np.any(positions >= end) or np.any(self._actions[np.minimum(positions, end-1)] != legal_actions):
+            self._widen(row, legal_actions)
+            start, end = self._offsets[row], self._offsets[row+1]
+            positions = start + np.searchsorted(self._actions[start:end], legal_actions)
+        return row, positions
+
+    def row_ids(self):
+        ''' Get the row index of every value
+
+        Returns:
+            (numpy.array): The row of each position in the value arrays
+        '''
+        return np.repeat(np.arange(self.num_rows), np.diff(self.offsets))
+
+    def regret_matching(self, plus=False):
+        ''' Apply regret matching to all the rows at once and store the
+        result in the policy
+
+        Args:
+            plus (boolean): Floor the regrets at zero first, as in CFR+
+        '''
+        if self.num_rows == 0:
+            return
+        regrets = self.regrets
+        if plus:
+            np.maximum(regrets, 0, out=regrets)
+        positive_regrets = np.maximum(regrets, 0)
+        row_sums = np.add.reduceat(positive_regrets, self.offsets[:-1])
+        row_ids = self.row_ids()
+        sums = row_sums[row_ids]
+        uniform = 1.0 / np.diff(self.offsets)[row_ids]
+        positive = sums > 0
+        self.policy[:] = np.where(positive, positive_regrets / np.where(positive, sums, 1), uniform)
+
+    def update_average_policy(self, weight):
+        ''' Add the policy of all the rows, weighted by the accumulated reach
+        probabilities, to the average policy, and reset the reach probabilities
+
+        Args:
+            weight (float): The weight of the current iteration
+        '''
+        if self.num_rows == 0:
+            return
+        self.average_policy[:] += (weight * self.reach_probs)[self.row_ids()] * self.policy
+        self.reach_probs[:] = 0
+
+    def row_slice(self, row):
+        ''' Get the slice of a row in the value arrays
+
+        Args:
+            row (int): The row index
+
+        Returns:
+            (slice): The positions of the row
+        '''
+        return slice(self._offsets[row], self._offsets[row+1])
+
+    def to_arrays(self):
+        ''' Copy the content of the table into a dictionary of arrays
+
+        Returns:
+            (dict): The keys, offsets, actions, reach probabilities and values of the rows
+        '''
+        arrays = {
+            'keys': self.keys.copy(),
+            'offsets': self.offsets.copy(),
+            'actions': self.actions.copy(),
+            'reach_probs': self.reach_probs.copy(),
+        }
+        for field in self.FIELDS:
+            arrays[field] = self._values[field][:self.num_values].copy()
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        ''' Build a table from the arrays returned by `to_arrays`
+
+        Args:
+            arrays (dict): The arrays of the table
+
+        Returns:
+            (InfoSetTable): The table
+        '''
+        table = cls(capacity=0)
+        table._keys = arrays['keys'].copy()
+        table._offsets = arrays['offsets'].copy()
+        table._actions = arrays['actions'].copy()
+        table._reach_probs = arrays['reach_probs'].copy()
+        for field in cls.FIELDS:
+            table._values[field] = arrays[field].copy()
+        table.num_rows = len(table._keys)
+        table.num_values = len(table._actions)
+        table._index = dict(zip(table._keys.tolist(), range(table.num_rows)))
+        return table
+
+    def match(self, keys, offsets, actions):
+        ''' Find the positions of the values of another table in this table.
+        It is vectorized over all the values.
+
+        Args:
+            keys (numpy.array): The keys of the rows of the other table
+            offsets (numpy.array): The offsets of the rows of the other table
+            actions (numpy.array): The actions of the other table
+
+        Returns:
+            (tuple) that contains:
+                rows (numpy.array): The row of each row of the other table, -1 if missing
+                positions (numpy.array): The position of each value of the other table, -1 if missing
+        '''
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        positions = np.full(len(actions), -1, dtype=np.int64)
+        if self.num_rows == 0 or len(keys) == 0:
+            return rows, positions
+
+        order = np.argsort(self.keys)
+        sorted_keys = self.keys[order]
+        idx = np.minimum(np.searchsorted(sorted_keys, keys), self.num_rows - 1)
+        found = sorted_keys[idx] == keys
+        rows[found] = order[idx[found]]
+
+        # The (row, action) pairs are sorted, so the values are matched with one search
+        width = int(max(self.actions.max(), actions.max())) + 1
+        combined = self.row_ids() * width + self.actions
+        value_rows = rows[np.repeat(np.arange(len(keys)), np.diff(offsets))]
+        other_combined = value_rows * width + actions
+        idx = np.minimum(np.searchsorted(combined, other_combined), self.num_values - 1)
+        found = (value_rows >= 0) & (combined[idx] == other_combined)
+        positions[found] = idx[found]
+        return rows, positions
+
+    def delta(self, base):
+        ''' Get the change of the table since it was copied from `base`. The
+        table may have new rows and wider rows than `base`.
+
+        Args:
+            base (InfoSetTable): The table this table was copied from
+
+        Returns:
+            (dict): The arrays of the table, holding the differences of the
+              regrets, the average policy and the reach probabilities
+        '''
+        arrays = self.to_arrays()
+        rows, positions = base.match(arrays['keys'], arrays['offsets'], arrays['actions'])
+        found = positions >= 0
+        for field in ['regrets', 'average_policy']:
+            arrays[field][found] -= getattr(base, field)[positions[found]]
+        arrays['reach_probs'][rows >= 0] -= base.reach_probs[rows[rows >= 0]]
+        return arrays
+
+    def merge(self, delta):
+        ''' Add the changes returned by `delta` to the table. The missing
+        rows are added and the narrower rows are widened.
+
+        Args:
+            delta (dict): The arrays returned by `delta`
+        '''
+        keys, offsets, actions = delta['keys'], delta['offsets'], delta['actions']
+        rows, positions = self.match(keys, offsets, actions)
+        value_rows = np.repeat(np.arange(len(keys)), np.diff(offsets))
+        missing = np.unique(value_rows[positions < 0])
+        if len(missing) > 0:
+            for row in missing:
+                self.get_positions(int(keys[row]), actions[offsets[row]:offsets[row+1]])
+            rows, positions = self.match(keys, offsets, actions)
+        self.regrets[positions] += delta['regrets']
+        self.average_policy[positions] += delta['average_policy']
+        self.reach_probs[rows] += delta['reach_probs']
+
+    def save(self, path):
+        ''' Save the table as .npy files in a directory
+
+        Args:
+            path (str): The directory
+        '''
+        _save_array(os.path.join(path, 'keys.npy'), self.keys)
+        _save_array(os.path.join(path, 'offsets.npy'), self.offsets)
+        _save_array(os.path.join(path, 'actions.npy'), self.actions)
+        for field in self.FIELDS:
+            _save_array(os.path.join(path, field+'.npy'), self._values[field][:self.num_values])
+
+    @classmethod
+    def load(cls, path, mmap_mode='c'):
+        ''' Load a table saved by `save`. The arrays are memory-mapped,
+        so only the pages that are used are read from the disk.
+
+        Args:
+            path (str): The directory
+            mmap_mode (str): The memory-map mode. The default copy-on-write
+              mode keeps the table writable without changing the files
+
+        Returns:
+            (InfoSetTable): The table
+        '''
+        table = cls(capacity=0)
+        table._keys = np.load(os.path.join(path, 'keys.npy'), mmap_mode=mmap_mode)
+        table._offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode=mmap_mode)
+        table._actions = np.load(os.path.join(path, 'actions.npy'), mmap_mode=mmap_mode)
+        for field in cls.FIELDS:
+            table._values[field] = np.load(os.path.join(path, field+'.npy'), mmap_mode=mmap_mode)
+        table.num_rows = len(table._keys)
+        table.num_values = len(table._actions)
+        table._reach_probs = np.zeros(table.num_rows, dtype=np.float64)
+        table._index = dict(zip(table._keys.tolist(), range(table.num_rows)))
+        return table
+
+    @classmethod
+    def from_dicts(cls, num_actions, policy, average_policy, regrets):
+        ''' Build a table from the dictionaries of full-length arrays that
+        were used to store CFR models. The legal actions are not recorded in
+        these dictionaries, so they are recovered as the actions with nonzero
+        regret or average policy, or all the actions if there is none.
+
+        Args:
+            num_actions (int): The number of actions
+            policy (dict): state_str -> action probabilities
+            average_policy (dict): state_str -> accumulated action probabilities
+            regrets (dict): state_str -> action regrets
+
+        Returns:
+            (InfoSetTable): The table
+        '''
+        table = cls()
+        zeros = np.zeros(num_actions)
+        for obs in regrets:
+            regret = np.asarray(regrets[obs])
+            avg = np.asarray(average_policy.get(obs, zeros))
+            legal_actions = np.flatnonzero((regret != 0) | (avg != 0))
+            if len(legal_actions) == 0:
+                legal_actions = np.arange(num_actions)
+            row = table.add(cls.hash_key(obs), legal_actions)
+            s = table.row_slice(row)
+            table.regrets[s] = regret[legal_actions]
+            table.average_policy[s] = avg[legal_actions]
+            if obs in policy:
+                table.policy[s] = remove_illegal(np.asarray(policy[obs]), legal_actions)[legal_actions]
+        return table
+
+    def _widen(self, row, legal_actions):
+        ''' Widen a row to the union of its actions and the given legal actions.
+        The new actions have zero regret and average policy. Their policy is
+        zero if the row has a positive regret, and uniform otherwise, which is
+        what regret matching gives for actions with zero regret.
+
+        Args:
+            row (int): The row index
+            legal_actions (numpy.array): The legal actions
+        '''
+        start, end = self._offsets[row], self._offsets[row+1]
+        old_actions = self._actions[start:end].copy()
+        actions = np.union1d(old_actions, legal_actions)
+        num_new = len(actions) - len(old_actions)
+        self._reserve(self.num_values + num_new)
+
+        old_positions = np.searchsorted(actions, old_actions)
+        has_positive_regret = np.any(self._values['regrets'][start:end] > 0)
+        for array in [self._actions] + [self._values[field] for field in self.FIELDS]:
+            old_values = array[start:end].copy()
+            # Shift the following rows to make room
+            array[end+num_new:self.num_values+num_new] = array[end:self.num_values].copy()
+            array[start:end+num_new] = 0
+            array[start+old_positions] = old_values
+        self._actions[start:end+num_new] = actions
+        if not has_positive_regret:
+            self._values['policy'][start:end+num_new] = 1.0 / len(actions)
+
+        self._offsets[row+1:self.num_rows+1] += num_new
+        self.num_values += num_new
+
+    def _reserve(self, size):
+        ''' Grow the value arrays to hold `size` values
+        '''
+        if size > len(self._actions):
+            self._actions = self._grow(self._actions, size)
+            for field in self.FIELDS:
+                self._values[field] = self._grow(self._values[field], size)
+
+    @staticmethod
+    def _grow(array, size):
+        ''' Double the capacity of an array until it holds `size` elements
+        '''
+        capacity = max(len(array), 1)
+        while capacity < size:
+            capacity *= 2
+        new_array = np.zeros(capacity, dtype=array.dtype)
+        new_array[:len(array)] = array
+        return new_array
+
 class CFRAgent():
-    ''' Implement CFR (chance sampling) algorithm
+    ''' Implement CFR (chance sampling) algorithm, and the external sampling
+    and outcome sampling variants of Monte Carlo CFR. See the paper
+    http://mlanctot.info/files/papers/nips09mccfr.pdf for more details.
+
+    Chance sampling expands every action of every player in each iteration.
+    External sampling only expands the actions of the player that is updated
+    and samples the actions of the other players. Outcome sampling samples a
+    single trajectory. Chance events are sampled by the environment in all
+    the variants. The sampling variants only update the visited information
+    sets, so an iteration costs as much as the sampled part of the tree.
+
+    With `plus=True`, the regrets are floored at zero after each iteration,
+    as in CFR+ (https://arxiv.org/abs/1407.5042).
+
+    With `num_workers > 1`, each iteration is traversed by a pool of worker
+    processes that own a copy of the environment. Every worker starts from
+    the current table, traverses `traversals_per_worker` times for each
+    player, and sends back the changes of the regrets and of the average
+    policy, which are summed into the table.
     '''
 
-    def __init__(self, env, model_path='./cfr_model'):
+    def __init__(self,
+                 env,
+                 model_path='./cfr_model',
+                 sampling='chance',
+                 exploration=0.6,
+                 plus=False,
+                 num_workers=1,
+                 traversals_per_worker=1):
         ''' Initilize Agent
 
         Args:
             env (Env): Env class
+            model_path (str): The directory to save the model
+            sampling (str): 'chance', 'external' or 'outcome'
+            exploration (float): The probability of sampling a uniformly random action
+              for the updated player in outcome sampling
+            plus (boolean): Whether to use CFR+ regret flooring
+            num_workers (int): The number of worker processes. 1 traverses in this process
+            traversals_per_worker (int): The number of traversals of each worker in an iteration
         '''
+        if sampling not in ['chance', 'external', 'outcome']:
+            raise ValueError("'sampling' should be 'chance', 'external' or 'outcome'.")
         self.use_raw = False
         self.env = env
         self.model_path = model_path
+        self.sampling = sampling
+        self.exploration = exploration
+        self.plus = plus
+        self.num_workers = num_workers
+        self.traversals_per_worker = traversals_per_worker
+        self._pool = None
 
-        # A policy is a dict state_str -> action probabilities
-        self.policy = collections.defaultdict(list)
-        self.average_policy = collections.defaultdict(np.array)
-
-        # Regret is a dict state_str -> action regrets
-        self.regrets = collections.defaultdict(np.array)
+        # The policy, the average policy and the regrets of
+        # every information set are stored in a table
+        self.table = InfoSetTable()
 
         self.iteration = 0
 
@@ -35,13 +519,51 @@ class CFRAgent():
         self.iteration += 1
         # Firstly, traverse tree to compute counterfactual regret for each player
         # The regrets are recorded in traversal
+        if self.num_workers > 1:
+            self.traverse_parallel()
+        else:
+            self.traverse()
+
+        # Update policy. The sampling variants compute the policy during traversal
+        if self.sampling == 'chance':
+            self.update_policy()
+
+    def traverse(self):
+        ''' Traverse the game tree once for each player
+        '''
         for player_id in range(self.env.num_players):
             self.env.reset()
-            probs = np.ones(self.env.num_players)
-            self.traverse_tree(probs, player_id)
-
-        # Update policy
-        self.update_policy()
+            if self.sampling == 'external':
+                self.traverse_external(player_id)
+            elif self.sampling == 'outcome':
+                self.traverse_outcome(player_id, 1.0, 1.0, 1.0)
+            else:
+                probs = np.ones(self.env.num_players)
+                self.traverse_tree(probs, player_id)
+
+    def traverse_parallel(self):
+        ''' Traverse the game tree in the worker processes and merge their
+        changes into the table
+        '''
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.env, self.sampling, self.exploration, self.plus),
+            )
+        arrays = self.table.to_arrays()
+        seeds = np.random.randint(0, 2**31, size=self.num_workers)
+        tasks = [(arrays, self.iteration, int(seed), self.traversals_per_worker) for seed in seeds]
+        for delta in self._pool.imap_unordered(_traverse_worker, tasks):
+            self.table.merge(delta)
+
+    def close(self):
+        ''' Stop the worker processes
+        '''
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
 
     def traverse_tree(self, probs, player_id):
         ''' Traverse the game tree, update the regrets
@@ -58,23 +580,27 @@ class CFRAgent():
 
         current_player = self.env.get_player_id()
 
-        action_utilities = {}
-        state_utility = np.zeros(self.env.num_players)
         obs, legal_actions = self.get_state(current_player)
-        action_probs = self.action_probs(obs, legal_actions, self.policy)
+        legal_actions = np.sort(legal_actions)
+        row, positions = self.table.get_positions(obs, legal_actions)
+        action_probs = self.table.policy[positions].astype(np.float64)
+        probs_sum = action_probs.sum()
+        if probs_sum > 0:
+            action_probs /= probs_sum
+        else:
+            action_probs[:] = 1.0 / len(legal_actions)
 
-        for action in legal_actions:
-            action_prob = action_probs[action]
+        action_utilities = np.zeros((len(legal_actions), self.env.num_players))
+        for i, action in enumerate(legal_actions):
             new_probs = probs.copy()
-            new_probs[current_player] *= action_prob
+            new_probs[current_player] *= action_probs[i]
 
             # Keep traversing the child state
             self.env.step(action)
-            utility = self.traverse_tree(new_probs, player_id)
+            action_utilities[i] = self.traverse_tree(new_probs, player_id)
             self.env.step_back()
 
-            state_utility += action_prob * utility
-            action_utilities[action] = utility
+        state_utility = action_probs.dot(action_utilities)
 
         if not current_player == player_id:
             return state_utility
@@ -85,61 +611,154 @@ class CFRAgent():
                                 np.prod(probs[current_player + 1:]))
         player_state_utility = state_utility[current_player]
 
-        if obs not in self.regrets:
-            self.regrets[obs] = np.zeros(self.env.num_actions)
-        if obs not in self.average_policy:
-            self.average_policy[obs] = np.zeros(self.env.num_actions)
-        for action in legal_actions:
-            action_prob = action_probs[action]
-            regret = counterfactual_prob * (action_utilities[action][current_player]
-                    - player_state_utility)
-            self.regrets[obs][action] += regret
-            self.average_policy[obs][action] += self.iteration * player_prob * action_prob
+        self.table.regrets[positions] += counterfactual_prob * (action_utilities[:, current_player] - player_state_utility)
+
+        # The average policy is updated for all the information sets at once
+        # in `update_policy`, except when only a part of the row is legal here
+        if len(positions) == self.table.row_slice(row).stop - self.table.row_slice(row).start:
+            self.table.reach_probs[row] += player_prob
+        else:
+            self.table.average_policy[positions] += self.iteration * player_prob * action_probs
         return state_utility
 
-    def update_policy(self):
-        ''' Update policy based on the current regrets
+    def traverse_external(self, player_id):
+        ''' Traverse the game tree with external sampling, update the regrets
+        of `player_id` and the average policy of the next player
+
+        Args:
+            player_id: The player to update the value
+
+        Returns:
+            utility (float): The sampled utility of `player_id`
         '''
-        for obs in self.regrets:
-            self.policy[obs] = self.regret_matching(obs)
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id]
+
+        current_player = self.env.get_player_id()
+        legal_actions, positions, action_probs = self.current_policy(current_player)
 
-    def regret_matching(self, obs):
-        ''' Apply regret matching
+        if current_player != player_id:
+            action_idx = np.random.choice(len(legal_actions), p=action_probs)
+            self.env.step(legal_actions[action_idx])
+            utility = self.traverse_external(player_id)
+            self.env.step_back()
+
+            # Average on the nodes of the opponents. With more than two players,
+            # only the next player is averaged so that every node is averaged once
+            if current_player == (player_id + 1) % self.env.num_players:
+                self.table.average_policy[positions] += action_probs
+            return utility
+
+        action_utilities = np.zeros(len(legal_actions))
+        for i, action in enumerate(legal_actions):
+            self.env.step(action)
+            action_utilities[i] = self.traverse_external(player_id)
+            self.env.step_back()
+
+        utility = action_probs.dot(action_utilities)
+        self.table.regrets[positions] += action_utilities - utility
+        if self.plus:
+            self.table.regrets[positions] = np.maximum(self.table.regrets[positions], 0)
+        return utility
+
+    def traverse_outcome(self, player_id, player_prob, opponent_prob, sample_prob):
+        ''' Sample a trajectory with outcome sampling, update the regrets and
+        the average policy of `player_id`
 
         Args:
-            obs (string): The state_str
+            player_id: The player to update the value
+            player_prob: The reach probability of `player_id`
+            opponent_prob: The reach probability of the other players
+            sample_prob: The probability of sampling the trajectory so far
+
+        Returns:
+            utility (float): The sampled utility of `player_id`, weighted by the
+              probability of the sampled suffix of the trajectory
         '''
-        regret = self.regrets[obs]
-        positive_regret_sum = sum([r for r in regret if r > 0])
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id]
 
-        action_probs = np.zeros(self.env.num_actions)
+        current_player = self.env.get_player_id()
+        legal_actions, positions, action_probs = self.current_policy(current_player)
+
+        if current_player == player_id:
+            sample_probs = self.exploration / len(legal_actions) + (1 - self.exploration) * action_probs
+        else:
+            sample_probs = action_probs
+        action_idx = np.random.choice(len(legal_actions), p=sample_probs)
+        action_prob = action_probs[action_idx]
+
+        self.env.step(legal_actions[action_idx])
+        if current_player == player_id:
+            child_utility = self.traverse_outcome(player_id, player_prob * action_prob, opponent_prob,
+                                                  sample_prob * sample_probs[action_idx])
+        else:
+            child_utility = self.traverse_outcome(player_id, player_prob, opponent_prob * action_prob,
+                                                  sample_prob * sample_probs[action_idx])
+        self.env.step_back()
+
+        # The sampled action utilities are importance weighted, the others are 0
+        action_utilities = np.zeros(len(legal_actions))
+        action_utilities[action_idx] = child_utility / sample_probs[action_idx]
+        utility = action_prob * action_utilities[action_idx]
+
+        if current_player == player_id:
+            weight = opponent_prob / sample_prob
+            self.table.regrets[positions] += weight * (action_utilities - utility)
+            if self.plus:
+                self.table.regrets[positions] = np.maximum(self.table.regrets[positions], 0)
+            self.table.average_policy[positions] += player_prob / sample_prob * action_probs
+        return utility
+
+    def current_policy(self, player_id):
+        ''' Compute the policy of the current information set of a player by
+        regret matching, and record it in the table
+
+        Args:
+            player_id (int): The player id
+
+        Returns:
+            (tuple) that contains:
+                legal_actions (numpy.array): The sorted legal actions
+                positions (numpy.array): The positions of the legal actions in the table
+                action_probs (numpy.array): The probabilities of the legal actions
+        '''
+        obs, legal_actions = self.get_state(player_id)
+        legal_actions = np.sort(legal_actions)
+        _, positions = self.table.get_positions(obs, legal_actions)
+        positive_regret = np.maximum(self.table.regrets[positions], 0).astype(np.float64)
+        positive_regret_sum = positive_regret.sum()
         if positive_regret_sum > 0:
-            for action in range(self.env.num_actions):
-                action_probs[action] = max(0.0, regret[action] / positive_regret_sum)
+            action_probs = positive_regret / positive_regret_sum
         else:
-            for action in range(self.env.num_actions):
-                action_probs[action] = 1.0 / self.env.num_actions
-        return action_probs
+            action_probs = np.full(len(legal_actions), 1.0 / len(legal_actions))
+        self.table.policy[positions] = action_probs
+        return legal_actions, positions, action_probs
+
+    def update_policy(self):
+        ''' Update the average policy with the policy of this iteration
+        (linear averaging), then update the policy based on the current
+        regrets. Both are batched over all the information sets.
+        '''
+        self.table.update_average_policy(self.iteration)
+        self.table.regret_matching(plus=self.plus)
 
     def action_probs(self, obs, legal_actions, policy):
         ''' Obtain the action probabilities of the current state
 
         Args:
-            obs (str): state_str
+            obs (int): The key of the state
             legal_actions (list): List of leagel actions
-            player_id (int): The current player
-            policy (dict): The used policy
+            policy (str): The used policy, either 'policy' or 'average_policy'
 
         Returns:
-            (tuple) that contains:
-                action_probs(numpy.array): The action probabilities
-                legal_actions (list): Indices of legal actions
+            action_probs(numpy.array): The action probabilities
         '''
-        if obs not in policy.keys():
-            action_probs = np.array([1.0/self.env.num_actions for _ in range(self.env.num_actions)])
-            self.policy[obs] = action_probs
-        else:
-            action_probs = policy[obs]
+        action_probs = np.zeros(self.env.num_actions)
+        row = self.table.find(obs)
+        if row is not None:
+            s = self.table.row_slice(row)
+            action_probs[self.table.actions[s]] = getattr(self.table, policy)[s]
         action_probs = remove_illegal(action_probs, legal_actions)
         return action_probs
 
@@ -153,14 +772,35 @@ class CFRAgent():
             action (int): Predicted action
             info (dict): A dictionary containing information
         '''
-        probs = self.action_probs(state['obs'].tostring(), list(state['legal_actions'].keys()), self.average_policy)
-        action = np.random.choice(len(probs), p=probs)
+        action, probs = self._average_policy_action(state)
 
         info = {}
-        info['probs'] = {state['raw_legal_actions'][i]: float(probs[list(state['legal_actions'].keys())[i]]) for i in range(len(state['legal_actions']))}
+        info['probs'] = {raw_action: float(probs[action_id]) for raw_action, action_id in zip(state['raw_legal_actions'], state['legal_actions'])}
 
         return action, info
 
+    def eval_action(self, state):
+        ''' Given a state, predict action based on average policy, without the information of `eval_step`
+
+        Args:
+            state (numpy.array): State representation
+
+        Returns:
+            action (int): Predicted action
+        '''
+        return self._average_policy_action(state)[0]
+
+    def _average_policy_action(self, state):
+        ''' Sample an action from the average policy
+
+        Returns:
+            action (int): Predicted action
+            probs (numpy.array): The probabilities of the actions
+        '''
+        probs = self.action_probs(self.table.hash_key(state['obs']), list(state['legal_actions'].keys()), 'average_policy')
+        action = np.random.choice(len(probs), p=probs)
+        return action, probs
+
     def get_state(self, player_id):
         ''' Get state_str of the player
 
@@ -169,11 +809,11 @@ class CFRAgent():
 
         Returns:
             (tuple) that contains:
-                state (str): The state str
+                state (int): The key of the state
                 legal_actions (list): Indices of legal actions
         '''
         state = self.env.get_state(player_id)
-        return state['obs'].tostring(), list(state['legal_actions'].keys())
+        return self.table.hash_key(state['obs']), list(state['legal_actions'].keys())
 
     def save(self):
         ''' Save model
@@ -181,41 +821,59 @@ class CFRAgent():
         if not os.path.exists(self.model_path):
             os.makedirs(self.model_path)
 
-        policy_file = open(os.path.join(self.model_path, 'policy.pkl'),'wb')
-        pickle.dump(self.policy, policy_file)
-        policy_file.close()
-
-        average_policy_file = open(os.path.join(self.model_path, 'average_policy.pkl'),'wb')
-        pickle.dump(self.average_policy, average_policy_file)
-        average_policy_file.close()
-
-        regrets_file = open(os.path.join(self.model_path, 'regrets.pkl'),'wb')
-        pickle.dump(self.regrets, regrets_file)
-        regrets_file.close()
-
-        iteration_file = open(os.path.join(self.model_path, 'iteration.pkl'),'wb')
-        pickle.dump(self.iteration, iteration_file)
-        iteration_file.close()
+        self.table.save(self.model_path)
+        _save_array(os.path.join(self.model_path, 'iteration.npy'), self.iteration)
 
     def load(self):
-        ''' Load model
+        ''' Load model. Models saved as pickles of dictionaries are also supported.
         '''
         if not os.path.exists(self.model_path):
             return
 
-        policy_file = open(os.path.join(self.model_path, 'policy.pkl'),'rb')
-        self.policy = pickle.load(policy_file)
-        policy_file.close()
+        if os.path.exists(os.path.join(self.model_path, 'keys.npy')):
+            self.table = InfoSetTable.load(self.model_path)
+            self.iteration = int(np.load(os.path.join(self.model_path, 'iteration.npy')))
+            return
 
-        average_policy_file = open(os.path.join(self.model_path, 'average_policy.pkl'),'rb')
-        self.average_policy = pickle.load(average_policy_file)
-        average_policy_file.close()
+        tables = {}
+        for name in ['policy', 'average_policy', 'regrets', 'iteration']:
+            with open(os.path.join(self.model_path, name+'.pkl'), 'rb') as f:
+                tables[name] = pickle.load(f)
+        self.table = InfoSetTable.from_dicts(self.env.num_actions, tables['policy'], tables['average_policy'], tables['regrets'])
+        self.iteration = tables['iteration']
 
-        regrets_file = open(os.path.join(self.model_path, 'regrets.pkl'),'rb')
-        self.regrets = pickle.load(regrets_file)
-        regrets_file.close()
+# The agent of a worker process of the parallel traversal
+_worker_agent = None
 
-        iteration_file = open(os.path.join(self.model_path, 'iteration.pkl'),'rb')
-        self.iteration = pickle.load(iteration_file)
-        iteration_file.close()
+def _init_worker(env, sampling, exploration, plus):
+    ''' Create the agent of a worker process
 
+    Args:
+        env (Env): The environment, copied into the process
+        sampling (str): The sampling variant
+        exploration (float): The exploration of outcome sampling
+        plus (boolean): Whether to use CFR+ regret flooring
+    '''
+    global _worker_agent
+    _worker_agent = CFRAgent(env, sampling=sampling, exploration=exploration, plus=plus)
+
+def _traverse_worker(task):
+    ''' Traverse the game tree in a worker process
+
+    Args:
+        task (tuple): The arrays of the table, the iteration, the random seed
+          and the number of traversals
+
+    Returns:
+        (dict): The changes of the table, see `InfoSetTable.delta`
+    '''
+    arrays, iteration, seed, num_traversals = task
+    agent = _worker_agent
+    agent.env.seed(seed)
+    np.random.seed(seed)
+    base = InfoSetTable.from_arrays(arrays)
+    agent.table = InfoSetTable.from_arrays(arrays)
+    agent.iteration = iteration
+    for _ in range(num_traversals):
+        agent.traverse()
+    return agent.table.delta(base)
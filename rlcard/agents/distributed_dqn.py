@@ -0,0 +1,360 @@
+''' Ape-X style distributed training for the DQN agent
+
+Several actor processes play the game with their own copy of the
+environment and of the Q-network, and push the transitions into a replay
+memory that lives in shared memory. A single learner samples from the
+shared memory and trains continuously, and periodically publishes its
+weights to the actors.
+
+See the paper https://arxiv.org/abs/1803.00933 for more details.
+'''
+
+import time
+import random
+import traceback
+from copy import deepcopy
+
+import numpy as np
+import torch
+from torch import multiprocessing as mp
+
+from rlcard.agents.random_agent import RandomAgent
+from rlcard.utils.utils import reorganize
+
+class SharedMemory(object):
+    ''' A circular replay memory backed by shared-memory tensors, so that
+    it can be written by the actor processes and sampled by the learner.
+    It can replace `Memory` in `DQNAgent`.
+    '''
+
+    def __init__(self, memory_size, batch_size, state_shape, num_actions, ctx=None):
+        ''' Initialize
+
+        Args:
+            memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled batches
+            state_shape (list): the shape of the state vector
+            num_actions (int): the number of the actions
+            ctx (multiprocessing context): the context used to create the shared counters
+        '''
+        if ctx is None:
+            ctx = mp.get_context('spawn')
+        self.memory_size = memory_size
+        self.batch_size = batch_size
+        self.num_actions = num_actions
+
+        state_shape = tuple(state_shape)
+        self.states = torch.zeros((memory_size,) + state_shape, dtype=torch.float32).share_memory_()
+        self.actions = torch.zeros(memory_size, dtype=torch.int64).share_memory_()
+        self.rewards = torch.zeros(memory_size, dtype=torch.float32).share_memory_()
+        self.next_states = torch.zeros((memory_size,) + state_shape, dtype=torch.float32).share_memory_()
+        self.legal_actions = torch.zeros((memory_size, num_actions), dtype=torch.bool).share_memory_()
+        self.dones = torch.zeros(memory_size, dtype=torch.bool).share_memory_()
+
+        self._lock = ctx.Lock()
+        self._position = ctx.Value('l', 0, lock=False)
+        self._size = ctx.Value('l', 0, lock=False)
+        self._num_added = ctx.Value('l', 0, lock=False)
+
+    def __len__(self):
+        return self._size.value
+
+    @property
+    def num_added(self):
+        ''' The total number of transitions saved so far
+        '''
+        return self._num_added.value
+
+    def save(self, state, action, reward, next_state, legal_actions, done):
+        ''' Save transition into memory
+
+        Args:
+            state (numpy.array): the current state
+            action (int): the performed action ID
+            reward (float): the reward received
+            next_state (numpy.array): the next state after performing the action
+            legal_actions (numpy.array): a boolean mask of the legal actions of the next state
+            done (boolean): whether the episode is finished
+        '''
+        self.save_batch([state], [action], [reward], [next_state], [legal_actions], [done])
+
+    def save_batch(self, states, actions, rewards, next_states, legal_actions, dones):
+        ''' Save a batch of transitions into memory with a single lock acquisition
+
+        Args:
+            states (numpy.array): (batch, state_shape) current states
+            actions (numpy.array): (batch,) performed action IDs
+            rewards (numpy.array): (batch,) rewards received
+            next_states (numpy.array): (batch, state_shape) next states
+            legal_actions (numpy.array): (batch, num_actions) boolean masks of the legal actions of the next states
+            dones (numpy.array): (batch,) whether the episode is finished
+        '''
+        num_transitions = len(actions)
+        if num_transitions == 0:
+            return
+        with self._lock:
+            indices = torch.arange(self._position.value, self._position.value + num_transitions) % self.memory_size
+            self.states[indices] = torch.as_tensor(np.array(states), dtype=torch.float32)
+            self.actions[indices] = torch.as_tensor(np.array(actions), dtype=torch.int64)
+            self.rewards[indices] = torch.as_tensor(np.array(rewards), dtype=torch.float32)
+            self.next_states[indices] = torch.as_tensor(np.array(next_states), dtype=torch.float32)
+            self.legal_actions[indices] = torch.as_tensor(np.array(legal_actions), dtype=torch.bool)
+            self.dones[indices] = torch.as_tensor(np.array(dones), dtype=torch.bool)
+            self._position.value = (self._position.value + num_transitions) % self.memory_size
+            self._size.value = min(self._size.value + num_transitions, self.memory_size)
+            self._num_added.value += num_transitions
+
+    def sample(self):
+        ''' Sample a minibatch from the replay memory
+
+        Returns:
+            state_batch (numpy.array): a batch of states
+            action_batch (numpy.array): a batch of actions
+            reward_batch (numpy.array): a batch of rewards
+            next_state_batch (numpy.array): a batch of states
+            legal_actions_batch (numpy.array): a (batch, num_actions) boolean mask of legal actions
+            done_batch (numpy.array): a batch of dones
+        '''
+        # The rows are copied under the lock, so that they are not overwritten
+        # by the actors while they are read
+        with self._lock:
+            indices = torch.as_tensor(random.sample(range(len(self)), self.batch_size))
+            return (self.states[indices].numpy(),
+                    self.actions[indices].numpy(),
+                    self.rewards[indices].numpy(),
+                    self.next_states[indices].numpy(),
+                    self.legal_actions[indices].numpy(),
+                    self.dones[indices].numpy())
+
+class DQNActorAgent(object):
+    ''' An epsilon-greedy agent that acts with a local copy of the learner's Q-network
+    '''
+
+    def __init__(self, qnet, num_actions, epsilon):
+        ''' Initialize
+
+        Args:
+            qnet (EstimatorNetwork): the Q-network to copy
+            num_actions (int): the number of the actions
+            epsilon (float): the chance to sample a random action
+        '''
+        self.use_raw = False
+        self.num_actions = num_actions
+        self.epsilon = epsilon
+        self.qnet = deepcopy(qnet).cpu()
+        self.qnet.eval()
+
+    def sync(self, qnet):
+        ''' Copy the parameters of the given Q-network
+
+        Args:
+            qnet (EstimatorNetwork): the Q-network to copy
+        '''
+        self.qnet.load_state_dict(qnet.state_dict())
+
+    def step(self, state):
+        ''' Predict the action with an epsilon-greedy policy
+
+        Args:
+            state (dict): current state
+
+        Returns:
+            action (int): an action id
+        '''
+        legal_actions = list(state['legal_actions'].keys())
+        if np.random.rand() < self.epsilon:
+            return legal_actions[np.random.randint(len(legal_actions))]
+        return self.eval_step(state)[0]
+
+    def eval_step(self, state):
+        ''' Predict the greedy action
+
+        Args:
+            state (dict): current state
+
+        Returns:
+            action (int): an action id
+            info (dict): an empty dictionary
+        '''
+        legal_actions = list(state['legal_actions'].keys())
+        with torch.no_grad():
+            s = torch.from_numpy(np.expand_dims(state['obs'], 0)).float()
+            q_values = self.qnet(s)[0].numpy()
+        return legal_actions[int(np.argmax(q_values[legal_actions]))], {}
+
+def act(actor_id, env, opponents, shared_qnet, qnet_lock, memory, epsilon, sync_every, seed, stop_event):
+    ''' The loop of an actor process. It plays games in the first position
+    and saves the transitions of that position into the shared memory.
+
+    Args:
+        actor_id (int): the id of the actor
+        env (Env): the environment, copied into the process
+        opponents (list): the agents of the other positions
+        shared_qnet (EstimatorNetwork): the Q-network published by the learner
+        qnet_lock (Lock): held while the shared Q-network is published or copied
+        memory (SharedMemory): the shared replay memory
+        epsilon (float): the exploration rate of this actor
+        sync_every (int): copy the shared Q-network every N episodes
+        seed (int): the random seed of this actor, or None
+        stop_event (Event): set by the learner when training is over
+    '''
+    try:
+        torch.set_num_threads(1)
+        if seed is not None:
+            env.seed(seed)
+            np.random.seed(seed)
+            random.seed(seed)
+            torch.manual_seed(seed)
+
+        with qnet_lock:
+            agent = DQNActorAgent(shared_qnet, memory.num_actions, epsilon)
+        env.set_agents([agent] + list(opponents))
+
+        episode = 0
+        while not stop_event.is_set():
+            trajectories, payoffs = env.run(is_training=True, columnar=True)
+            transitions = reorganize(trajectories, payoffs)[0]
+            memory.save_batch(*transitions)
+
+            episode += 1
+            if episode % sync_every == 0:
+                with qnet_lock:
+                    agent.sync(shared_qnet)
+
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print('Exception in actor process {}'.format(actor_id))
+        traceback.print_exc()
+        raise e
+
+class DistributedDQNTrainer(object):
+    ''' Train a DQNAgent with several actor processes that feed a shared replay memory.
+    The agent plays in the first position and the opponents play the others.
+
+    Actor i explores with epsilon ** (1 + alpha * i / (num_actors - 1)), as in Ape-X,
+    so that the actors cover a range of exploration rates.
+    '''
+
+    def __init__(self,
+                 env,
+                 agent,
+                 opponents=None,
+                 num_actors=4,
+                 sync_every=10,
+                 publish_every=10,
+                 actor_epsilon=0.4,
+                 actor_epsilon_alpha=7,
+                 seed=None):
+        ''' Initialize
+
+        Args:
+            env (Env): the environment. Every actor plays with its own copy
+            agent (DQNAgent): the learner agent. Its replay memory is replaced
+              by a SharedMemory of the same size during training. Prioritized
+              replay is not supported
+            opponents (list): the agents of the other positions. Random agents by default
+            num_actors (int): the number of actor processes
+            sync_every (int): the actors copy the published Q-network every N episodes
+            publish_every (int): the learner publishes its Q-network every N training steps
+            actor_epsilon (float): the base exploration rate of the actors
+            actor_epsilon_alpha (float): how fast the exploration rate decays across the actors
+            seed (int): the base random seed of the actors, or None
+        '''
+        if agent.prioritized_replay:
+            raise ValueError('DistributedDQNTrainer does not support prioritized replay, '
+                             'create the agent with prioritized_replay=False')
+        self.env = env
+        self.agent = agent
+        if opponents is None:
+            opponents = [RandomAgent(num_actions=env.num_actions) for _ in range(1, env.num_players)]
+        self.opponents = opponents
+        self.num_actors = num_actors
+        self.sync_every = sync_every
+        self.publish_every = publish_every
+        self.seed = seed
+        if num_actors > 1:
+            self.epsilons = [actor_epsilon ** (1 + actor_epsilon_alpha * i / (num_actors - 1)) for i in range(num_actors)]
+        else:
+            self.epsilons = [actor_epsilon]
+
+        self.ctx = mp.get_context('spawn')
+        self.memory = SharedMemory(
+            agent.memory.memory_size,
+            agent.batch_size,
+            agent.q_estimator.state_shape,
+            agent.num_actions,
+            ctx=self.ctx,
+        )
+
+        # The Q-network that is published to the actors
+        self.shared_qnet = deepcopy(agent.q_estimator.qnet).cpu()
+        self.shared_qnet.eval()
+        self.shared_qnet.share_memory()
+        self.qnet_lock = self.ctx.Lock()
+
+    @property
+    def num_frames(self):
+        ''' The number of transitions generated by the actors so far
+        '''
+        return self.memory.num_added
+
+    def start(self, num_train_steps, callback=None, callback_every=100):
+        ''' Start the actors and train the agent
+
+        Args:
+            num_train_steps (int): the number of training steps of the learner
+            callback (function): called with the trainer every `callback_every` training steps,
+              e.g., to evaluate the agent
+            callback_every (int): the frequency of the callback
+        '''
+        # The shared memory cannot be pickled outside of process creation,
+        # so the agent only holds it during training
+        agent_memory = self.agent.memory
+        self.agent.memory = self.memory
+
+        stop_event = self.ctx.Event()
+        actor_processes = []
+        for i in range(self.num_actors):
+            actor = self.ctx.Process(
+                target=act,
+                args=(
+                    i,
+                    self.env,
+                    self.opponents,
+                    self.shared_qnet,
+                    self.qnet_lock,
+                    self.memory,
+                    self.epsilons[i],
+                    self.sync_every,
+                    None if self.seed is None else self.seed + i,
+                    stop_event,
+                ))
+            actor.start()
+            actor_processes.append(actor)
+
+        try:
+            train_step = 0
+            while train_step < num_train_steps:
+                if len(self.memory) < max(self.agent.replay_memory_init_size, self.agent.batch_size):
+                    if not any(actor.is_alive() for actor in actor_processes):
+                        raise RuntimeError('All the actor processes exited')
+                    time.sleep(0.01)
+                    continue
+
+                self.agent.total_t = self.num_frames
+                self.agent.train()
+                train_step += 1
+
+                if train_step % self.publish_every == 0:
+                    with self.qnet_lock:
+                        self.shared_qnet.load_state_dict(self.agent.q_estimator.qnet.state_dict())
+                if callback is not None and train_step % callback_every == 0:
+                    callback(self)
+        finally:
+            stop_event.set()
+            for actor in actor_processes:
+                actor.join(timeout=10)
+                if actor.is_alive():
+                    actor.terminate()
+            self.agent.memory = agent_memory
@@ -79,6 +79,11 @@ class DMCAgent:
 
         return action, info
 
+    def eval_action(self, state):
+        action_keys, values = self.predict(state)
+
+        return action_keys[np.argmax(values)]
+
     def share_memory(self):
         self.net.share_memory()
 
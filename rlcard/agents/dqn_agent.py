@@ -56,7 +56,11 @@ class DQNAgent(object):
                  train_every=1,
                  mlp_layers=None,
                  learning_rate=0.00005,
-                 device=None):
+                 device=None,
+                 prioritized_replay=False,
+                 prioritized_replay_alpha=0.6,
+                 prioritized_replay_beta_start=0.4,
+                 prioritized_replay_beta_decay_steps=20000):
 
         '''
         Q-Learning algorithm for off-policy TD control using Function Approximation.
@@ -81,6 +85,12 @@ class DQNAgent(object):
             mlp_layers (list): The layer number and the dimension of each layer in MLP
             learning_rate (float): The learning rate of the DQN agent.
             device (torch.device): whether to use the cpu or gpu
+            prioritized_replay (boolean): Sample transitions proportionally to their TD errors
+              instead of uniformly
+            prioritized_replay_alpha (float): How much prioritization is used (0 is uniform)
+            prioritized_replay_beta_start (float): The initial importance-sampling exponent.
+              It is annealed to 1 over time
+            prioritized_replay_beta_decay_steps (int): Number of training steps to anneal beta over
         '''
         self.use_raw = False
         self.replay_memory_init_size = replay_memory_init_size
@@ -90,6 +100,7 @@ class DQNAgent(object):
         self.batch_size = batch_size
         self.num_actions = num_actions
         self.train_every = train_every
+        self.prioritized_replay = prioritized_replay
 
         # Torch device
         if device is None:
@@ -113,7 +124,12 @@ class DQNAgent(object):
             mlp_layers=mlp_layers, device=self.device)
 
         # Create replay memory
-        self.memory = Memory(replay_memory_size, batch_size)
+        if self.prioritized_replay:
+            self.memory = PrioritizedMemory(replay_memory_size, batch_size, alpha=prioritized_replay_alpha)
+            # The importance-sampling scheduler
+            self.betas = np.linspace(prioritized_replay_beta_start, 1.0, prioritized_replay_beta_decay_steps)
+        else:
+            self.memory = Memory(replay_memory_size, batch_size)
 
     def feed(self, ts):
         ''' Store data in to replay buffer and train the agent. There are two stages.
@@ -125,6 +141,25 @@ class DQNAgent(object):
         '''
         (state, action, reward, next_state, done) = tuple(ts)
         self.feed_memory(state['obs'], action, reward, next_state['obs'], list(next_state['legal_actions'].keys()), done)
+        self._count_transition()
+
+    def feed_batch(self, transitions):
+        ''' Store a batch of transitions into the replay buffer, training the
+            agent after the same transitions as `feed` would
+
+        Args:
+            transitions (Transitions): the arrays of the transitions, as returned by
+              `reorganize` for trajectories recorded with `columnar=True`
+        '''
+        for i in range(len(transitions.action)):
+            self.memory.save(transitions.state[i], transitions.action[i], transitions.reward[i],
+                             transitions.next_state[i], transitions.legal_actions[i], transitions.done[i])
+            self._count_transition()
+
+    def _count_transition(self):
+        ''' Count a stored transition and train every `train_every` transitions
+            once the memory is populated
+        '''
         self.total_t += 1
         tmp = self.total_t - self.replay_memory_init_size
         if tmp>=0 and tmp%self.train_every == 0:
@@ -164,10 +199,21 @@ class DQNAgent(object):
         best_action = np.argmax(q_values)
 
         info = {}
-        info['values'] = {state['raw_legal_actions'][i]: float(q_values[list(state['legal_actions'].keys())[i]]) for i in range(len(state['legal_actions']))}
+        info['values'] = {raw_action: float(q_values[action]) for raw_action, action in zip(state['raw_legal_actions'], state['legal_actions'])}
 
         return best_action, info
 
+    def eval_action(self, state):
+        ''' Predict the action for evaluation purpose, without the information of `eval_step`.
+
+        Args:
+            state (numpy.array): current state
+
+        Returns:
+            action (int): an action id
+        '''
+        return np.argmax(self.predict(state))
+
     def predict(self, state):
         ''' Predict the masked Q-values
 
@@ -179,11 +225,11 @@ class DQNAgent(object):
         '''
         
         q_values = self.q_estimator.predict_nograd(np.expand_dims(state['obs'], 0))[0]
-        masked_q_values = -np.inf * np.ones(self.num_actions, dtype=float)
-        legal_actions = list(state['legal_actions'].keys())
-        masked_q_values[legal_actions] = q_values[legal_actions]
+        legal_mask = np.zeros(self.num_actions, dtype=bool)
+        legal_mask[list(state['legal_actions'].keys())] = True
+        q_values[~legal_mask] = -np.inf
 
-        return masked_q_values
+        return q_values
 
     def train(self):
         ''' Train the network
@@ -191,27 +237,36 @@ class DQNAgent(object):
         Returns:
             loss (float): The loss of the current batch.
         '''
-        state_batch, action_batch, reward_batch, next_state_batch, legal_actions_batch, done_batch = self.memory.sample()
-
-        # Calculate best next actions using Q-network (Double DQN)
-        q_values_next = self.q_estimator.predict_nograd(next_state_batch)
-        legal_actions = []
-        for b in range(self.batch_size):
-            legal_actions.extend([i + b * self.num_actions for i in legal_actions_batch[b]])
-        masked_q_values = -np.inf * np.ones(self.num_actions * self.batch_size, dtype=float)
-        masked_q_values[legal_actions] = q_values_next.flatten()[legal_actions]
-        masked_q_values = masked_q_values.reshape((self.batch_size, self.num_actions))
-        best_actions = np.argmax(masked_q_values, axis=1)
-
-        # Evaluate best next actions using Target-network (Double DQN)
-        q_values_next_target = self.target_estimator.predict_nograd(next_state_batch)
-        target_batch = reward_batch + np.invert(done_batch).astype(np.float32) * \
-            self.discount_factor * q_values_next_target[np.arange(self.batch_size), best_actions]
-
-        # Perform gradient descent update
-        state_batch = np.array(state_batch)
-
-        loss = self.q_estimator.update(state_batch, action_batch, target_batch)
+        if self.prioritized_replay:
+            beta = self.betas[min(self.train_t, len(self.betas)-1)]
+            state_batch, action_batch, reward_batch, next_state_batch, legal_actions_batch, done_batch, \
+                weights, indices = self.memory.sample(beta)
+        else:
+            state_batch, action_batch, reward_batch, next_state_batch, legal_actions_batch, done_batch = self.memory.sample()
+            weights = None
+
+        next_state_batch = torch.from_numpy(next_state_batch).float().to(self.device)
+        legal_mask_batch = torch.from_numpy(legal_actions_batch).to(self.device)
+        reward_batch = torch.from_numpy(reward_batch).float().to(self.device)
+        not_done_batch = torch.from_numpy(~done_batch).float().to(self.device)
+
+        with torch.no_grad():
+            # Calculate best next actions using Q-network (Double DQN)
+            q_values_next = self.q_estimator.qnet(next_state_batch)
+            q_values_next = q_values_next.masked_fill(~legal_mask_batch, -float('inf'))
+            best_actions = q_values_next.argmax(dim=1, keepdim=True)
+
+            # Evaluate best next actions using Target-network (Double DQN)
+            q_values_next_target = self.target_estimator.qnet(next_state_batch)
+            target_batch = reward_batch + not_done_batch * \
+                self.discount_factor * q_values_next_target.gather(1, best_actions).squeeze(1)
+
+        if self.prioritized_replay:
+            loss, td_errors = self.q_estimator.update(state_batch, action_batch, target_batch,
+                                                      weights=weights, return_td_errors=True)
+            self.memory.update_priorities(indices, td_errors)
+        else:
+            loss = self.q_estimator.update(state_batch, action_batch, target_batch)
         print('\rINFO - Step {}, rl-loss: {}'.format(self.total_t, loss), end='')
 
         # Update the target estimator
@@ -232,7 +287,9 @@ class DQNAgent(object):
             legal_actions (list): the legal actions of the next state
             done (boolean): whether the episode is finished
         '''
-        self.memory.save(state, action, reward, next_state, legal_actions, done)
+        legal_mask = np.zeros(self.num_actions, dtype=bool)
+        legal_mask[legal_actions] = True
+        self.memory.save(state, action, reward, next_state, legal_mask, done)
 
     def set_device(self, device):
         self.device = device
@@ -297,7 +354,7 @@ class Estimator(object):
             q_as = self.qnet(s).cpu().numpy()
         return q_as
 
-    def update(self, s, a, y):
+    def update(self, s, a, y, weights=None, return_td_errors=False):
         ''' Updates the estimator towards the given targets.
             In this case y is the target-network estimated
             value of the Q-network optimal actions, which
@@ -306,18 +363,20 @@ class Estimator(object):
         Args:
           s (np.ndarray): (batch, state_shape) state representation
           a (np.ndarray): (batch,) integer sampled actions
-          y (np.ndarray): (batch,) value of optimal actions according to Q-target
+          y (np.ndarray or Tensor): (batch,) value of optimal actions according to Q-target
+          weights (np.ndarray): (batch,) importance-sampling weights of the samples, if any
+          return_td_errors (boolean): Whether to also return the TD errors of the batch
 
         Returns:
-          The calculated loss on the batch.
+          The calculated loss on the batch, and the (batch,) TD errors if `return_td_errors` is set.
         '''
         self.optimizer.zero_grad()
 
         self.qnet.train()
 
-        s = torch.from_numpy(s).float().to(self.device)
-        a = torch.from_numpy(a).long().to(self.device)
-        y = torch.from_numpy(y).float().to(self.device)
+        s = torch.as_tensor(s, dtype=torch.float32, device=self.device)
+        a = torch.as_tensor(a, dtype=torch.long, device=self.device)
+        y = torch.as_tensor(y, dtype=torch.float32, device=self.device)
 
         # (batch, state_shape) -> (batch, num_actions)
         q_as = self.qnet(s)
@@ -326,13 +385,19 @@ class Estimator(object):
         Q = torch.gather(q_as, dim=-1, index=a.unsqueeze(-1)).squeeze(-1)
 
         # update model
-        batch_loss = self.mse_loss(Q, y)
+        if weights is None:
+            batch_loss = self.mse_loss(Q, y)
+        else:
+            weights = torch.as_tensor(weights, dtype=torch.float32, device=self.device)
+            batch_loss = (weights * (Q - y) ** 2).mean()
         batch_loss.backward()
         self.optimizer.step()
         batch_loss = batch_loss.item()
 
         self.qnet.eval()
 
+        if return_td_errors:
+            return batch_loss, (Q - y).detach().cpu().numpy()
         return batch_loss
 
 
@@ -394,7 +459,7 @@ class Memory(object):
             action (int): the performed action ID
             reward (float): the reward received
             next_state (numpy.array): the next state after performing the action
-            legal_actions (list): the legal actions of the next state
+            legal_actions (numpy.array): a boolean mask of the legal actions of the next state
             done (boolean): whether the episode is finished
         '''
         if len(self.memory) == self.memory_size:
@@ -410,7 +475,153 @@ class Memory(object):
             action_batch (list): a batch of actions
             reward_batch (list): a batch of rewards
             next_state_batch (list): a batch of states
+            legal_actions_batch (numpy.array): a (batch, num_actions) boolean mask of legal actions
             done_batch (list): a batch of dones
         '''
         samples = random.sample(self.memory, self.batch_size)
         return map(np.array, zip(*samples))
+
+class SumTree(object):
+    ''' A complete binary tree stored in a flat array, where every parent
+    node holds the sum of its two children. The leaves hold the priorities,
+    so that both updating a priority and sampling a leaf proportionally to
+    its priority take O(log n).
+    '''
+
+    def __init__(self, capacity):
+        ''' Initialize
+        Args:
+            capacity (int): the number of leaves
+        '''
+        self.capacity = capacity
+        # Round up to a power of two so that every leaf has the same depth
+        self._num_leaves = 1 << max(capacity - 1, 0).bit_length()
+        self._depth = self._num_leaves.bit_length() - 1
+        # Node i has children 2i and 2i+1. The root is node 1 and the leaves
+        # are nodes [num_leaves, 2 * num_leaves)
+        self.tree = np.zeros(2 * self._num_leaves)
+
+    def total(self):
+        ''' The sum of all the priorities
+        '''
+        return self.tree[1]
+
+    def get(self, indices):
+        ''' Get the priorities of the given leaves
+
+        Args:
+            indices (numpy.array): the leaf indices
+        '''
+        return self.tree[np.asarray(indices) + self._num_leaves]
+
+    def update(self, indices, priorities):
+        ''' Set the priorities of the given leaves and propagate the sums to the root
+
+        Args:
+            indices (int or numpy.array): the leaf indices
+            priorities (float or numpy.array): the new priorities
+        '''
+        nodes = np.atleast_1d(indices) + self._num_leaves
+        self.tree[nodes] = priorities
+        for _ in range(self._depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        ''' Find the leaves in which the given prefix sums fall
+
+        Args:
+            values (numpy.array): prefix sums in [0, total)
+
+        Returns:
+            indices (numpy.array): the leaf indices
+        '''
+        values = np.array(values, dtype=float)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self._depth):
+            left = 2 * nodes
+            go_right = values >= self.tree[left]
+            values -= self.tree[left] * go_right
+            nodes = left + go_right
+        return np.minimum(nodes - self._num_leaves, self.capacity - 1)
+
+class PrioritizedMemory(Memory):
+    ''' Memory that samples transitions proportionally to their priorities,
+    see https://arxiv.org/abs/1511.05952 for more details
+    '''
+
+    def __init__(self, memory_size, batch_size, alpha=0.6, epsilon=1e-6):
+        ''' Initialize
+        Args:
+            memory_size (int): the size of the memroy buffer
+            batch_size (int): the size of the sampled batches
+            alpha (float): the exponent applied to the priorities
+            epsilon (float): a small constant that keeps every priority positive
+        '''
+        super(PrioritizedMemory, self).__init__(memory_size, batch_size)
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.tree = SumTree(memory_size)
+        self.max_priority = 1.0
+        self.position = 0
+
+    def save(self, state, action, reward, next_state, legal_actions, done):
+        ''' Save transition into memory with the maximal priority seen so far,
+            so that every transition is sampled at least once
+
+        Args:
+            state (numpy.array): the current state
+            action (int): the performed action ID
+            reward (float): the reward received
+            next_state (numpy.array): the next state after performing the action
+            legal_actions (numpy.array): a boolean mask of the legal actions of the next state
+            done (boolean): whether the episode is finished
+        '''
+        transition = Transition(state, action, reward, next_state, legal_actions, done)
+        if len(self.memory) < self.memory_size:
+            self.memory.append(transition)
+        else:
+            self.memory[self.position] = transition
+        self.tree.update(self.position, self.max_priority ** self.alpha)
+        self.position = (self.position + 1) % self.memory_size
+
+    def sample(self, beta):
+        ''' Sample a minibatch proportionally to the priorities
+
+        Args:
+            beta (float): the importance-sampling exponent
+
+        Returns:
+            state_batch (list): a batch of states
+            action_batch (list): a batch of actions
+            reward_batch (list): a batch of rewards
+            next_state_batch (list): a batch of states
+            legal_actions_batch (numpy.array): a (batch, num_actions) boolean mask of legal actions
+            done_batch (list): a batch of dones
+            weights (numpy.array): the normalized importance-sampling weights of the batch
+            indices (numpy.array): the indices of the sampled transitions
+        '''
+        # Stratified sampling: one sample from each of batch_size equal segments
+        total = self.tree.total()
+        values = (np.arange(self.batch_size) + np.random.rand(self.batch_size)) * total / self.batch_size
+        # Rounding may reach a leaf past the saved transitions, and the sampled
+        # priorities are floored at the smallest one that can be stored
+        indices = np.minimum(self.tree.find(values), len(self.memory) - 1)
+
+        probs = np.maximum(self.tree.get(indices), self.epsilon ** self.alpha) / total
+        weights = (len(self.memory) * probs) ** (-beta)
+        weights /= weights.max()
+
+        samples = [self.memory[i] for i in indices]
+        return tuple(map(np.array, zip(*samples))) + (weights.astype(np.float32), indices)
+
+    def update_priorities(self, indices, td_errors):
+        ''' Update the priorities of the sampled transitions
+
+        Args:
+            indices (numpy.array): the indices of the sampled transitions
+            td_errors (numpy.array): the TD errors of the sampled transitions
+        '''
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, priorities.max())
+        self.tree.update(indices, priorities ** self.alpha)
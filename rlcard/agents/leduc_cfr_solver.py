@@ -0,0 +1,426 @@
+''' A full-width CFR+ solver for Leduc Hold'em over the public tree
+
+The betting of Leduc Hold'em is public, so the game tree can be built once
+over the public actions only. The private cards of each player are
+represented by a range, i.e., a vector of the reach probabilities of each
+card, and every iteration walks the public tree once per player with range
+vectors, instead of walking the histories of each deal through `env.step`.
+The chance probabilities of the deals and the showdown results are folded
+into matrices, so the terminal values are range-vs-range matrix products.
+The public card is handled by giving the ranges of the second round a
+leading axis over the possible public cards.
+
+The solved policy is exported as an `InfoSetTable` keyed by the observations
+of the environment, so that it can be loaded by `CFRAgent`.
+'''
+import os
+
+import numpy as np
+
+import rlcard
+from rlcard.agents.cfr_agent import InfoSetTable, _save_array
+from rlcard.games.base import Card
+from rlcard.games.leducholdem import Game, Judger, Player
+
+# The ranks in the order of `card2index.json`
+RANKS = ['J', 'Q', 'K']
+
+# The actions in the order of the environment
+ACTIONS = ['call', 'raise', 'fold', 'check']
+
+class PublicNode(object):
+    ''' A node of the public tree. The players are relative to the blinds:
+    player 0 is the small blind, who acts first, and player 1 is the big blind.
+    '''
+
+    def __init__(self, kind, round_counter, chips, player=None, actions=None, children=None, folded=None):
+        ''' Initialize
+
+        Args:
+            kind (str): 'decision', 'chance' or 'terminal'
+            round_counter (int): The betting round, 0 or 1
+            chips (list): The chips that each player has put in
+            player (int): The acting player of a decision node
+            actions (list): The legal action IDs of a decision node, in the order of the game
+            children (list): The child nodes
+            folded (int): The player who folded at a terminal node, or None for a showdown
+        '''
+        self.kind = kind
+        self.round_counter = round_counter
+        self.chips = chips
+        self.player = player
+        self.actions = actions
+        self.children = children
+        self.folded = folded
+        self.regrets = None
+        self.average_policy = None
+
+def build_public_tree(game):
+    ''' Build the public tree of Leduc Hold'em by stepping a game.
+    The private cards and the public card dealt by the game do not matter.
+
+    Args:
+        game (LeducholdemGame): A game that allows step back
+
+    Returns:
+        (PublicNode): The root
+    '''
+    game.init_game()
+    small_blind = game.game_pointer
+
+    def players():
+        return [game.players[(small_blind + i) % game.num_players] for i in range(game.num_players)]
+
+    def build(round_counter):
+        chips = [p.in_chips for p in players()]
+        if game.is_over():
+            folded = [i for i, p in enumerate(players()) if p.status == 'folded']
+            return PublicNode('terminal', round_counter, chips, folded=folded[0] if folded else None)
+        if game.round_counter != round_counter:
+            return PublicNode('chance', round_counter, chips, children=[build(game.round_counter)])
+
+        legal_actions = game.get_legal_actions()
+        children = []
+        for action in legal_actions:
+            game.step(action)
+            children.append(build(round_counter))
+            game.step_back()
+        return PublicNode('decision', round_counter, chips,
+                          player=(game.game_pointer - small_blind) % game.num_players,
+                          actions=[ACTIONS.index(a) for a in legal_actions],
+                          children=children)
+
+    return build(0)
+
+class LeducPublicTree(object):
+    ''' The public tree of two-player Leduc Hold'em, with the chance
+    probabilities of the deals and the showdown results as matrices.
+
+    The values are computed on range vectors of shape (boards, ranks), where
+    there is one board before the public card and one per public card after
+    it. A policy is given as a function that maps a decision node to an
+    array of shape (boards, ranks, actions).
+    '''
+
+    def __init__(self):
+        ''' Build the public tree and the chance matrices
+        '''
+        game = Game(allow_step_back=True)
+        self.big_blind = game.big_blind
+        self.root = build_public_tree(game)
+        self.nodes = []
+        self._init_nodes(self.root)
+
+        # The number of cards of each rank, and the number of possible public cards
+        counts = np.full(len(RANKS), 2)
+        num_cards = counts.sum()
+        num_ranks = len(RANKS)
+        eye = np.eye(num_ranks)
+
+        # Probability of the deal (i, j), and of the deal (i, j) with the public card b,
+        # indexed by [b, i, j]
+        deal = counts[:, None] / num_cards * (counts[None, :] - eye) / (num_cards - 1)
+        public = (counts[:, None, None] - eye[:, :, None] - eye[:, None, :]) / (num_cards - 2)
+        weights = [deal[None], np.maximum(public, 0) * deal[None]]
+
+        # Showdown results of player 0 against player 1 for each public card
+        showdown = np.zeros((num_ranks, num_ranks, num_ranks))
+        for b in range(num_ranks):
+            for i in range(num_ranks):
+                for j in range(num_ranks):
+                    showdown[b, i, j] = self._judge(RANKS[b], RANKS[i], RANKS[j])
+
+        # The matrices are indexed by [board, player's card, opponent's card]
+        self._fold_matrices = [[w, w.transpose(0, 2, 1)] for w in weights]
+        self._showdown_matrix = [weights[1] * showdown, -(weights[1] * showdown).transpose(0, 2, 1)]
+
+    def terminal_values(self, node, player_id, opponent_range):
+        ''' Compute the counterfactual values of a player at a terminal node
+
+        Args:
+            node (PublicNode): The terminal node
+            player_id (int): The player
+            opponent_range (numpy.array): (boards, ranks) reach probabilities of the opponent
+
+        Returns:
+            (numpy.array): (boards, ranks) counterfactual values, in big blinds
+        '''
+        if node.folded is not None:
+            if node.folded == player_id:
+                payoff = -node.chips[player_id]
+            else:
+                payoff = node.chips[1 - player_id]
+            matrix = self._fold_matrices[node.round_counter][player_id] * payoff
+        else:
+            matrix = self._showdown_matrix[player_id] * node.chips[player_id]
+        return (matrix @ opponent_range[..., None])[..., 0] / self.big_blind
+
+    def expected_payoffs(self, get_policy):
+        ''' Compute the expected payoff of each player when both players follow a policy
+
+        Args:
+            get_policy (function): Maps a decision node to its action probabilities
+
+        Returns:
+            (numpy.array): The payoffs of the small blind and of the big blind, in big blinds
+        '''
+        def evaluate(node, ranges):
+            if node.kind == 'terminal':
+                return (ranges[0] * self.terminal_values(node, 0, ranges[1])).sum()
+            if node.kind == 'chance':
+                return evaluate(node.children[0], [np.repeat(r, len(RANKS), axis=0) for r in ranges])
+            probs = get_policy(node)
+            value = 0
+            for a, child in enumerate(node.children):
+                child_ranges = list(ranges)
+                child_ranges[node.player] = ranges[node.player] * probs[..., a]
+                value += evaluate(child, child_ranges)
+            return value
+
+        value = evaluate(self.root, [np.ones((1, len(RANKS))), np.ones((1, len(RANKS)))])
+        return np.array([value, -value])
+
+    def best_response_value(self, player_id, get_policy):
+        ''' Compute the expected payoff of a best response of a player against
+        the policy of the other player, in a single pass over the public tree
+
+        Args:
+            player_id (int): The best responding player, 0 for the small blind
+            get_policy (function): Maps a decision node to its action probabilities
+
+        Returns:
+            (float): The payoff of the best response, in big blinds
+        '''
+        def traverse(node, opponent_range):
+            if node.kind == 'terminal':
+                return self.terminal_values(node, player_id, opponent_range)
+            if node.kind == 'chance':
+                return traverse(node.children[0], np.repeat(opponent_range, len(RANKS), axis=0)).sum(axis=0, keepdims=True)
+            if node.player == player_id:
+                return np.max([traverse(child, opponent_range) for child in node.children], axis=0)
+            probs = get_policy(node)
+            return sum(traverse(child, opponent_range * probs[..., a]) for a, child in enumerate(node.children))
+
+        return float(traverse(self.root, np.ones((1, len(RANKS)))).sum())
+
+    def exploitability(self, get_policy):
+        ''' Compute the exploitability of a policy that plays both positions, i.e.,
+        the expected gain of a best response per game, averaged over the positions.
+        It is zero for a Nash equilibrium.
+
+        Args:
+            get_policy (function): Maps a decision node to its action probabilities
+
+        Returns:
+            (float): The exploitability, in big blinds per game
+        '''
+        return (self.best_response_value(0, get_policy) + self.best_response_value(1, get_policy)) / 2
+
+    def get_state(self, node, board, rank):
+        ''' Get the state of the game at an information set, in the format of
+        the states of `LeducholdemGame`
+
+        Args:
+            node (PublicNode): The decision node
+            board (int): The index of the public card, ignored before the public card
+            rank (int): The index of the card of the acting player
+
+        Returns:
+            (dict): The state of the acting player
+        '''
+        state = {}
+        state['hand'] = Card('S', RANKS[rank]).get_index()
+        state['public_card'] = Card('H', RANKS[board]).get_index() if node.round_counter > 0 else None
+        state['all_chips'] = list(node.chips)
+        state['my_chips'] = node.chips[node.player]
+        state['legal_actions'] = [ACTIONS[a] for a in node.actions]
+        state['current_player'] = node.player
+        return state
+
+    def _init_nodes(self, node, num_boards=1):
+        ''' Collect the decision nodes and record their number of boards
+        '''
+        if node.kind == 'chance':
+            num_boards = len(RANKS)
+        node.num_boards = num_boards
+        if node.kind == 'decision':
+            self.nodes.append(node)
+        for child in node.children or []:
+            self._init_nodes(child, num_boards)
+
+    @staticmethod
+    def _judge(public_rank, rank, opponent_rank):
+        ''' Judge a showdown with the judger of the game
+
+        Returns:
+            (int): 1 if the player wins, -1 if the opponent wins, 0 for a tie
+        '''
+        players = [Player(i, None) for i in range(2)]
+        for player, player_rank, suit in zip(players, [rank, opponent_rank], ['S', 'H']):
+            player.hand = Card(suit, player_rank)
+            player.in_chips = 1
+        return int(np.sign(Judger.judge_game(players, Card('S', public_rank))[0]))
+
+class LeducCFRSolver(object):
+    ''' Solve two-player Leduc Hold'em with full-width CFR+ on range vectors.
+    See the paper https://arxiv.org/abs/1407.5042 for CFR+.
+
+    The regrets are floored at zero and the updates of the players
+    alternate, as in CFR+. The average policy is weighted linearly by the
+    iteration. With `plus=False`, the regrets are not floored.
+    '''
+
+    def __init__(self, model_path='./leduc_cfr_model', plus=True):
+        ''' Build the public tree and allocate the regrets and the average
+        policy of its decision nodes
+
+        Args:
+            model_path (str): The path of the saved model, in the format of `CFRAgent`
+            plus (boolean): Floor the regrets at zero, as in CFR+
+        '''
+        self.model_path = model_path
+        self.plus = plus
+        self.iteration = 0
+
+        self.tree = LeducPublicTree()
+        for node in self.tree.nodes:
+            shape = (node.num_boards, len(RANKS), len(node.actions))
+            node.regrets = np.zeros(shape)
+            node.average_policy = np.zeros(shape)
+
+    def train(self):
+        ''' Do one iteration of CFR+
+        '''
+        self.iteration += 1
+        for player_id in range(2):
+            ranges = np.ones((1, len(RANKS)))
+            self.traverse(self.tree.root, player_id, ranges, ranges)
+
+    def traverse(self, node, player_id, player_range, opponent_range):
+        ''' Compute the counterfactual values of a player and update the
+        regrets and the average policy of that player in a subtree
+
+        Args:
+            node (PublicNode): The root of the subtree
+            player_id (int): The updated player
+            player_range (numpy.array): (boards, ranks) reach probabilities of the player
+            opponent_range (numpy.array): (boards, ranks) reach probabilities of the opponent
+
+        Returns:
+            (numpy.array): (boards, ranks) counterfactual values of the player
+        '''
+        if node.kind == 'terminal':
+            return self.tree.terminal_values(node, player_id, opponent_range)
+
+        if node.kind == 'chance':
+            num_boards = len(RANKS)
+            values = self.traverse(node.children[0], player_id,
+                                   np.repeat(player_range, num_boards, axis=0),
+                                   np.repeat(opponent_range, num_boards, axis=0))
+            return values.sum(axis=0, keepdims=True)
+
+        policy = self.current_policy(node)
+        if node.player != player_id:
+            values = 0
+            for a, child in enumerate(node.children):
+                values = values + self.traverse(child, player_id, player_range, opponent_range * policy[..., a])
+            return values
+
+        action_values = np.stack([self.traverse(child, player_id, player_range * policy[..., a], opponent_range)
+                                  for a, child in enumerate(node.children)], axis=-1)
+        values = (policy * action_values).sum(axis=-1)
+        node.regrets += action_values - values[..., None]
+        if self.plus:
+            np.maximum(node.regrets, 0, out=node.regrets)
+        node.average_policy += self.iteration * player_range[..., None] * policy
+        return values
+
+    @staticmethod
+    def current_policy(node):
+        ''' Compute the policy of a decision node by regret matching
+
+        Args:
+            node (PublicNode): The decision node
+
+        Returns:
+            (numpy.array): (boards, ranks, actions) action probabilities
+        '''
+        positive_regrets = np.maximum(node.regrets, 0)
+        sums = positive_regrets.sum(axis=-1, keepdims=True)
+        return np.where(sums > 0, positive_regrets / np.where(sums > 0, sums, 1), 1.0 / len(node.actions))
+
+    @staticmethod
+    def average_policy(node):
+        ''' Get the normalized average policy of a decision node
+
+        Args:
+            node (PublicNode): The decision node
+
+        Returns:
+            (numpy.array): (boards, ranks, actions) action probabilities
+        '''
+        sums = node.average_policy.sum(axis=-1, keepdims=True)
+        return np.where(sums > 0, node.average_policy / np.where(sums > 0, sums, 1), 1.0 / len(node.actions))
+
+    def expected_payoffs(self, policy='average_policy'):
+        ''' Compute the expected payoff of each player, in big blinds,
+        when both players follow a policy of the solver
+
+        Args:
+            policy (str): 'policy' for the current policy, or 'average_policy'
+
+        Returns:
+            (numpy.array): The payoffs of the small blind and of the big blind
+        '''
+        return self.tree.expected_payoffs(self._get_policy(policy))
+
+    def exploitability(self, policy='average_policy'):
+        ''' Compute the exploitability of a policy of the solver, see
+        `LeducPublicTree.exploitability`
+
+        Args:
+            policy (str): 'policy' for the current policy, or 'average_policy'
+
+        Returns:
+            (float): The exploitability, in big blinds per game
+        '''
+        return self.tree.exploitability(self._get_policy(policy))
+
+    def to_table(self):
+        ''' Export the solved policy as an `InfoSetTable` keyed by the
+        observations of the environment. The observations do not include the
+        betting history, so the information sets that share an observation
+        are merged by summing their regrets and accumulated average policies.
+
+        Returns:
+            (InfoSetTable): The table
+        '''
+        env = rlcard.make('leduc-holdem')
+        table = InfoSetTable()
+        for node in self.tree.nodes:
+            order = np.argsort(node.actions)
+            legal_actions = np.asarray(node.actions)[order]
+            for b in range(node.num_boards):
+                for h in range(len(RANKS)):
+                    obs = env._extract_state(self.tree.get_state(node, b, h))['obs']
+                    _, positions = table.get_positions(table.hash_key(obs), legal_actions)
+                    table.regrets[positions] += node.regrets[b, h, order]
+                    table.average_policy[positions] += node.average_policy[b, h, order]
+        table.regret_matching(plus=self.plus)
+        return table
+
+    def save(self):
+        ''' Save the model in the format of `CFRAgent`
+        '''
+        if not os.path.exists(self.model_path):
+            os.makedirs(self.model_path)
+
+        self.to_table().save(self.model_path)
+        _save_array(os.path.join(self.model_path, 'iteration.npy'), self.iteration)
+
+    def _get_policy(self, policy):
+        ''' Get the function that computes a policy of the solver at a node
+        '''
+        if policy == 'policy':
+            return self.current_policy
+        return self.average_policy
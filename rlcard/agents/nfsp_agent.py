@@ -61,6 +61,10 @@ class NFSPAgent(object):
                  q_batch_size=32,
                  q_train_every=1,
                  q_mlp_layers=None,
+                 q_prioritized_replay=False,
+                 q_prioritized_replay_alpha=0.6,
+                 q_prioritized_replay_beta_start=0.4,
+                 q_prioritized_replay_beta_decay_steps=int(1e6),
                  evaluate_with='average_policy',
                  device=None):
         ''' Initialize the NFSP agent.
@@ -88,6 +92,10 @@ class NFSPAgent(object):
             q_batch_size (int): The batch size of inner DQN agent.
             q_train_step (int): Train the model every X steps.
             q_mlp_layers (list): The layer sizes of inner DQN agent.
+            q_prioritized_replay (boolean): Whether inner DQN agent uses prioritized replay.
+            q_prioritized_replay_alpha (float): The prioritization exponent of inner DQN agent.
+            q_prioritized_replay_beta_start (float): The initial importance-sampling exponent of inner DQN agent.
+            q_prioritized_replay_beta_decay_steps (int): The beta annealing steps of inner DQN agent.
             device (torch.device): Whether to use the cpu or gpu
         '''
         self.use_raw = False
@@ -101,6 +109,11 @@ class NFSPAgent(object):
         self._min_buffer_size_to_learn = min_buffer_size_to_learn
 
         self._reservoir_buffer = ReservoirBuffer(reservoir_buffer_capacity)
+        # The best response transitions that are not yet in the reservoir buffer.
+        # They are added in batches of `batch_size`, and when feeding, training
+        # the average policy or sampling the policy of the next episode
+        self._pending_states = []
+        self._pending_actions = []
         self._prev_timestep = None
         self._prev_action = None
         self.evaluate_with = evaluate_with
@@ -120,7 +133,8 @@ class NFSPAgent(object):
         self._rl_agent = DQNAgent(q_replay_memory_size, q_replay_memory_init_size, \
             q_update_target_estimator_every, q_discount_factor, q_epsilon_start, q_epsilon_end, \
             q_epsilon_decay_steps, q_batch_size, num_actions, state_shape, q_train_every, q_mlp_layers, \
-            rl_learning_rate, device)
+            rl_learning_rate, device, q_prioritized_replay, q_prioritized_replay_alpha, \
+            q_prioritized_replay_beta_start, q_prioritized_replay_beta_decay_steps)
 
         # Build the average policy supervised model
         self._build_model()
@@ -152,6 +166,24 @@ class NFSPAgent(object):
             ts (list): A list of 5 elements that represent the transition.
         '''
         self._rl_agent.feed(ts)
+        self._add_transitions()
+        self._count_transition()
+
+    def feed_batch(self, transitions):
+        ''' Feed a batch of transitions to inner RL agent
+
+        Args:
+            transitions (Transitions): the arrays of the transitions, as returned by
+              `reorganize` for trajectories recorded with `columnar=True`
+        '''
+        self._rl_agent.feed_batch(transitions)
+        self._add_transitions()
+        for _ in range(len(transitions.action)):
+            self._count_transition()
+
+    def _count_transition(self):
+        ''' Count a fed transition and train the average policy every `train_every` transitions
+        '''
         self.total_t += 1
         if self.total_t>0 and len(self._reservoir_buffer) >= self._min_buffer_size_to_learn and self.total_t%self._train_every == 0:
             sl_loss  = self.train_sl()
@@ -160,6 +192,9 @@ class NFSPAgent(object):
     def step(self, state):
         ''' Returns the action to be taken.
 
+        In best response mode, the state and the action are added to the
+        reservoir buffer later, in a batch of pending transitions.
+
         Args:
             state (dict): The current state
 
@@ -170,9 +205,10 @@ class NFSPAgent(object):
         legal_actions = list(state['legal_actions'].keys())
         if self._mode == 'best_response':
             action = self._rl_agent.step(state)
-            one_hot = np.zeros(self._num_actions)
-            one_hot[action] = 1
-            self._add_transition(obs, one_hot)
+            self._pending_states.append(obs)
+            self._pending_actions.append(action)
+            if len(self._pending_actions) >= self._batch_size:
+                self._add_transitions()
 
         elif self._mode == 'average_policy':
             probs = self._act(obs)
@@ -194,20 +230,48 @@ class NFSPAgent(object):
         if self.evaluate_with == 'best_response':
             action, info = self._rl_agent.eval_step(state)
         elif self.evaluate_with == 'average_policy':
-            obs = state['obs']
-            legal_actions = list(state['legal_actions'].keys())
-            probs = self._act(obs)
-            probs = remove_illegal(probs, legal_actions)
-            action = np.random.choice(len(probs), p=probs)
+            action, probs = self._average_policy_action(state)
             info = {}
-            info['probs'] = {state['raw_legal_actions'][i]: float(probs[list(state['legal_actions'].keys())[i]]) for i in range(len(state['legal_actions']))}
+            info['probs'] = {raw_action: float(probs[action_id]) for raw_action, action_id in zip(state['raw_legal_actions'], state['legal_actions'])}
         else:
             raise ValueError("'evaluate_with' should be either 'average_policy' or 'best_response'.")
         return action, info
 
+    def eval_action(self, state):
+        ''' Use the average policy for evaluation purpose, without the information of `eval_step`
+
+        Args:
+            state (dict): The current state.
+
+        Returns:
+            action (int): An action id.
+        '''
+        if self.evaluate_with == 'best_response':
+            return self._rl_agent.eval_action(state)
+        elif self.evaluate_with == 'average_policy':
+            return self._average_policy_action(state)[0]
+        raise ValueError("'evaluate_with' should be either 'average_policy' or 'best_response'.")
+
+    def _average_policy_action(self, state):
+        ''' Sample an action from the average policy
+
+        Args:
+            state (dict): The current state.
+
+        Returns:
+            action (int): An action id.
+            probs (numpy.array): The probabilities of the legal actions
+        '''
+        legal_actions = list(state['legal_actions'].keys())
+        probs = self._act(state['obs'])
+        probs = remove_illegal(probs, legal_actions)
+        action = np.random.choice(len(probs), p=probs)
+        return action, probs
+
     def sample_episode_policy(self):
         ''' Sample average/best_response policy
         '''
+        self._add_transitions()
         if np.random.rand() < self._anticipatory_param:
             self._mode = 'best_response'
         else:
@@ -232,19 +296,20 @@ class NFSPAgent(object):
 
         return action_probs
 
-    def _add_transition(self, state, probs):
-        ''' Adds the new transition to the reservoir buffer.
-
-        Transitions are in the form (state, probs).
+    def _add_transitions(self):
+        ''' Adds the pending best response transitions to the reservoir buffer
+        in a single batch.
 
-        Args:
-            state (numpy.array): The state.
-            probs (numpy.array): The probabilities of each action.
+        Transitions are in the form (state, probs), where probs is the one-hot
+        encoding of the action taken in the state.
         '''
-        transition = Transition(
-                info_state=state,
-                action_probs=probs)
-        self._reservoir_buffer.add(transition)
+        if not self._pending_actions:
+            return
+        probs = np.zeros((len(self._pending_actions), self._num_actions))
+        probs[np.arange(len(self._pending_actions)), self._pending_actions] = 1
+        self._reservoir_buffer.add_batch(np.array(self._pending_states), probs)
+        self._pending_states = []
+        self._pending_actions = []
 
     def train_sl(self):
         ''' Compute the loss on sampled transitions and perform a avg-network update.
@@ -255,22 +320,21 @@ class NFSPAgent(object):
         Returns:
             loss (float): The average loss obtained on this batch of transitions or `None`.
         '''
+        self._add_transitions()
         if (len(self._reservoir_buffer) < self._batch_size or
                 len(self._reservoir_buffer) < self._min_buffer_size_to_learn):
             return None
 
         transitions = self._reservoir_buffer.sample(self._batch_size)
-        info_states = [t.info_state for t in transitions]
-        action_probs = [t.action_probs for t in transitions]
 
         self.policy_network_optimizer.zero_grad()
         self.policy_network.train()
 
         # (batch, state_size)
-        info_states = torch.from_numpy(np.array(info_states)).float().to(self.device)
+        info_states = torch.from_numpy(transitions.info_state).float().to(self.device)
 
         # (batch, num_actions)
-        eval_action_probs = torch.from_numpy(np.array(action_probs)).float().to(self.device)
+        eval_action_probs = torch.from_numpy(transitions.action_probs).to(self.device)
 
         # (batch, num_actions)
         log_forecast_action_probs = self.policy_network(info_states)
@@ -337,8 +401,9 @@ class AveragePolicyNetwork(nn.Module):
 class ReservoirBuffer(object):
     ''' Allows uniform sampling over a stream of data.
 
-    This class supports the storage of arbitrary elements, such as observation
-    tensors, integer actions, etc.
+    The observations and action probabilities are stored in two arrays
+    that are preallocated with the full capacity when the first transition
+    is added, so the buffer has no per-transition object overhead.
 
     See https://en.wikipedia.org/wiki/Reservoir_sampling for more details.
     '''
@@ -347,23 +412,73 @@ class ReservoirBuffer(object):
         ''' Initialize the buffer.
         '''
         self._reservoir_buffer_capacity = reservoir_buffer_capacity
-        self._data = []
+        self._info_states = None
+        self._action_probs = None
+        self._size = 0
         self._add_calls = 0
 
+    def _allocate(self, info_state, action_probs):
+        ''' Allocate the storage based on the shape of the first transition.
+
+        Args:
+            info_state (numpy.array): An observation. Its dtype is kept.
+            action_probs (numpy.array): The probabilities of each action.
+        '''
+        info_state = np.asarray(info_state)
+        action_probs = np.asarray(action_probs)
+        self._info_states = np.empty((self._reservoir_buffer_capacity,) + info_state.shape, dtype=info_state.dtype)
+        self._action_probs = np.empty((self._reservoir_buffer_capacity,) + action_probs.shape, dtype=np.float32)
+
     def add(self, element):
         ''' Potentially adds `element` to the reservoir buffer.
 
         Args:
-            element (object): data to be added to the reservoir buffer.
+            element (Transition): data to be added to the reservoir buffer.
         '''
-        if len(self._data) < self._reservoir_buffer_capacity:
-            self._data.append(element)
+        if self._info_states is None:
+            self._allocate(element.info_state, element.action_probs)
+        if self._size < self._reservoir_buffer_capacity:
+            idx = self._size
+            self._size += 1
         else:
             idx = np.random.randint(0, self._add_calls + 1)
-            if idx < self._reservoir_buffer_capacity:
-                self._data[idx] = element
+        if idx < self._reservoir_buffer_capacity:
+            self._info_states[idx] = element.info_state
+            self._action_probs[idx] = element.action_probs
         self._add_calls += 1
 
+    def add_batch(self, info_states, action_probs):
+        ''' Potentially adds a batch of transitions to the reservoir buffer.
+        This is equivalent to calling `add` on each transition in order.
+
+        Args:
+            info_states (numpy.array): (batch, state_shape) observations.
+            action_probs (numpy.array): (batch, num_actions) action probabilities.
+        '''
+        info_states = np.asarray(info_states)
+        action_probs = np.asarray(action_probs)
+        num_elements = len(info_states)
+        if num_elements == 0:
+            return
+        if self._info_states is None:
+            self._allocate(info_states[0], action_probs[0])
+
+        # Fill the free slots first
+        num_fill = min(self._reservoir_buffer_capacity - self._size, num_elements)
+        self._info_states[self._size:self._size+num_fill] = info_states[:num_fill]
+        self._action_probs[self._size:self._size+num_fill] = action_probs[:num_fill]
+        self._size += num_fill
+
+        # The k-th call replaces a uniform slot in [0, k] if it falls in the buffer.
+        # When several elements draw the same slot, the last one is kept.
+        if num_fill < num_elements:
+            calls = self._add_calls + np.arange(num_fill, num_elements)
+            indices = (np.random.random_sample(len(calls)) * (calls + 1)).astype(np.int64)
+            kept = indices < self._reservoir_buffer_capacity
+            self._info_states[indices[kept]] = info_states[num_fill:][kept]
+            self._action_probs[indices[kept]] = action_probs[num_fill:][kept]
+        self._add_calls += num_elements
+
     def sample(self, num_samples):
         ''' Returns `num_samples` uniformly sampled from the buffer.
 
@@ -371,25 +486,31 @@ class ReservoirBuffer(object):
             num_samples (int): The number of samples to draw.
 
         Returns:
-            An iterable over `num_samples` random elements of the buffer.
+            A Transition whose fields are (num_samples, ...) arrays that can be
+            handed to `torch.from_numpy` without copying.
 
         Raises:
             ValueError: If there are less than `num_samples` elements in the buffer
         '''
-        if len(self._data) < num_samples:
+        if self._size < num_samples:
             raise ValueError("{} elements could not be sampled from size {}".format(
-                    num_samples, len(self._data)))
-        return random.sample(self._data, num_samples)
+                    num_samples, self._size))
+        indices = np.array(random.sample(range(self._size), num_samples), dtype=np.int64)
+        return Transition(
+                info_state=self._info_states[indices],
+                action_probs=self._action_probs[indices])
 
     def clear(self):
         ''' Clear the buffer
         '''
-        self._data = []
+        self._size = 0
         self._add_calls = 0
 
     def __len__(self):
-        return len(self._data)
+        return self._size
 
     def __iter__(self):
-        return iter(self._data)
-
+        for idx in range(self._size):
+            yield Transition(
+                    info_state=self._info_states[idx],
+                    action_probs=self._action_probs[idx])
@@ -11,6 +11,9 @@ class NFSPAgentPettingZoo(NFSPAgent):
     def eval_step(self, state):
         return super().eval_step(wrap_state(state))
 
+    def eval_action(self, state):
+        return super().eval_action(wrap_state(state))
+
     def feed(self, ts):
         state, action, reward, next_state, done = tuple(ts)
         state = wrap_state(state)
@@ -26,6 +29,9 @@ class DQNAgentPettingZoo(DQNAgent):
     def eval_step(self, state):
         return super().eval_step(wrap_state(state))
 
+    def eval_action(self, state):
+        return super().eval_action(wrap_state(state))
+
     def feed(self, ts):
         state, action, reward, next_state, done = tuple(ts)
         state = wrap_state(state)
@@ -42,6 +42,17 @@ class RandomAgent(object):
             probs[i] = 1/len(state['legal_actions'])
 
         info = {}
-        info['probs'] = {state['raw_legal_actions'][i]: probs[list(state['legal_actions'].keys())[i]] for i in range(len(state['legal_actions']))}
+        info['probs'] = {raw_action: probs[action] for raw_action, action in zip(state['raw_legal_actions'], state['legal_actions'])}
 
         return self.step(state), info
+
+    def eval_action(self, state):
+        ''' Predict the action given the current state for evaluation, without the information of `eval_step`
+
+        Args:
+            state (dict): An dictionary that represents the current state
+
+        Returns:
+            action (int): The action predicted (randomly chosen) by the random agent
+        '''
+        return self.step(state)
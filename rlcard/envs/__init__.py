@@ -1,6 +1,6 @@
 ''' Register new environments
 '''
-from rlcard.envs.env import Env
+from rlcard.envs.env import Env, LazyState
 from rlcard.envs.registration import register, make
 
 register(
@@ -1,4 +1,4 @@
-from collections import Counter, OrderedDict
+from collections import OrderedDict
 import numpy as np
 
 from rlcard.envs import Env
@@ -16,6 +16,8 @@ class DoudizhuEnv(Env):
         self._cards2str_with_suit = cards2str_with_suit
         self._ACTION_2_ID = ACTION_2_ID
         self._ID_2_ACTION = ID_2_ACTION
+        self._PASS_ID = ACTION_2_ID['pass']
+        self._action_features = get_action_features()
         
         self.name = 'doudizhu'
         self.game = Game()
@@ -38,13 +40,13 @@ class DoudizhuEnv(Env):
                 last_action = state['trace'][-2][1]
             else:
                 last_action = state['trace'][-1][1]
-        last_action = _cards2array(last_action)
+        last_action = self._action_features[self._ACTION_2_ID.get(last_action, self._PASS_ID)]
 
-        last_9_actions = _action_seq2array(_process_action_seq(state['trace']))
+        last_9_actions = self._action_seq2array(_process_action_seq(state['trace']))
 
         if state['self'] == 0: # landlord
-            landlord_up_played_cards = _cards2array(state['played_cards'][2])
-            landlord_down_played_cards = _cards2array(state['played_cards'][1])
+            landlord_up_played_cards = _counts2array(state['played_counts'][2])
+            landlord_down_played_cards = _counts2array(state['played_counts'][1])
             landlord_up_num_cards_left = _get_one_hot_array(state['num_cards_left'][2], 17) 
             landlord_down_num_cards_left = _get_one_hot_array(state['num_cards_left'][1], 17)
             obs = np.concatenate((current_hand,
@@ -56,20 +58,20 @@ class DoudizhuEnv(Env):
                                   landlord_up_num_cards_left,
                                   landlord_down_num_cards_left))
         else:
-            landlord_played_cards = _cards2array(state['played_cards'][0])
+            landlord_played_cards = _counts2array(state['played_counts'][0])
             for i, action in reversed(state['trace']):
                 if i == 0:
                     last_landlord_action = action
-            last_landlord_action = _cards2array(last_landlord_action)
+            last_landlord_action = self._action_features[self._ACTION_2_ID[last_landlord_action]]
             landlord_num_cards_left = _get_one_hot_array(state['num_cards_left'][0], 20)
 
             teammate_id = 3 - state['self']
-            teammate_played_cards = _cards2array(state['played_cards'][teammate_id])
+            teammate_played_cards = _counts2array(state['played_counts'][teammate_id])
             last_teammate_action = 'pass'
             for i, action in reversed(state['trace']):
                 if i == teammate_id:
                     last_teammate_action = action
-            last_teammate_action = _cards2array(last_teammate_action)
+            last_teammate_action = self._action_features[self._ACTION_2_ID[last_teammate_action]]
             teammate_num_cards_left = _get_one_hot_array(state['num_cards_left'][teammate_id], 17)
             obs = np.concatenate((current_hand,
                                   others_hand,
@@ -114,7 +116,8 @@ class DoudizhuEnv(Env):
             legal_actions (list): a list of legal actions' id
         '''
         legal_actions = self.game.state['actions']
-        legal_actions = {self._ACTION_2_ID[action]: _cards2array(action) for action in legal_actions}
+        legal_actions = {action_id: self._action_features[action_id]
+                         for action_id in map(self._ACTION_2_ID.__getitem__, legal_actions)}
         return legal_actions
 
     def get_perfect_information(self):
@@ -137,32 +140,55 @@ class DoudizhuEnv(Env):
         Returns:
             (numpy.array): The action features
         '''
-        return _cards2array(self._decode_action(action))
-
-Card2Column = {'3': 0, '4': 1, '5': 2, '6': 3, '7': 4, '8': 5, '9': 6, 'T': 7,
-               'J': 8, 'Q': 9, 'K': 10, 'A': 11, '2': 12}
-
-NumOnes2Array = {0: np.array([0, 0, 0, 0]),
-                 1: np.array([1, 0, 0, 0]),
-                 2: np.array([1, 1, 0, 0]),
-                 3: np.array([1, 1, 1, 0]),
-                 4: np.array([1, 1, 1, 1])}
+        return self._action_features[action].copy()
+
+    def _action_seq2array(self, action_seq_list):
+        # The empty actions before the start of the game are encoded as 'pass'
+        action_ids = [self._ACTION_2_ID.get(cards, self._PASS_ID) for cards in action_seq_list]
+        return self._action_features[action_ids].flatten()
+
+# The rank of each character of the cards, in the order of CARD_RANK_STR
+_CHAR2RANK = np.full(256, 15, dtype=np.int64)
+for _rank, _char in enumerate('3456789TJQKA2BR'):
+    _CHAR2RANK[ord(_char)] = _rank
+
+# The features of 0 to 4 cards of a rank
+NumOnes2Array = np.array([[0, 0, 0, 0],
+                          [1, 0, 0, 0],
+                          [1, 1, 0, 0],
+                          [1, 1, 1, 0],
+                          [1, 1, 1, 1]], dtype=np.int8)
+
+_ACTION_FEATURES = None
+
+def _counts2array(counts):
+    ''' Encode the counts of the ranks, with the counts of the jokers in the last two columns '''
+    features = np.empty(counts.shape[:-1] + (54,), dtype=np.int8)
+    features[..., :52] = NumOnes2Array[counts[..., :13]].reshape(counts.shape[:-1] + (52,))
+    features[..., 52:] = np.minimum(counts[..., 13:15], 1)
+    return features
 
 def _cards2array(cards):
     if cards == 'pass':
         return np.zeros(54, dtype=np.int8)
+    ranks = _CHAR2RANK[np.frombuffer(cards.encode(), dtype=np.uint8)]
+    return _counts2array(np.bincount(ranks, minlength=16)[:15])
 
-    matrix = np.zeros([4, 13], dtype=np.int8)
-    jokers = np.zeros(2, dtype=np.int8)
-    counter = Counter(cards)
-    for card, num_times in counter.items():
-        if card == 'B':
-            jokers[0] = 1
-        elif card == 'R':
-            jokers[1] = 1
-        else:
-            matrix[:, Card2Column[card]] = NumOnes2Array[num_times]
-    return np.concatenate((matrix.flatten('F'), jokers))
+def get_action_features():
+    ''' Get the features of all the actions, indexed by action id. They are
+    built once from the packed counts of the actions, and are read-only.
+
+    Returns:
+        (numpy.array): The (number of actions, 54) features
+    '''
+    global _ACTION_FEATURES
+    if _ACTION_FEATURES is None:
+        from rlcard.games.doudizhu.utils import get_tables
+        masks = np.asarray(get_tables()['masks'])
+        counts = (masks[:, None] >> (4 * np.arange(15))) & 15
+        _ACTION_FEATURES = _counts2array(counts)
+        _ACTION_FEATURES.setflags(write=False)
+    return _ACTION_FEATURES
 
 def _get_one_hot_array(num_left_cards, max_num_cards):
     one_hot = np.zeros(max_num_cards, dtype=np.int8)
@@ -170,13 +196,6 @@ def _get_one_hot_array(num_left_cards, max_num_cards):
 
     return one_hot
 
-def _action_seq2array(action_seq_list):
-    action_seq_array = np.zeros((len(action_seq_list), 54), np.int8)
-    for row, cards in enumerate(action_seq_list):
-        action_seq_array[row, :] = _cards2array(cards)
-    action_seq_array = action_seq_array.flatten()
-    return action_seq_array
-
 def _process_action_seq(sequence, length=9):
     sequence = [action[1] for action in sequence[-length:]]
     if len(sequence) < length:
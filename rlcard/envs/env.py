@@ -1,5 +1,50 @@
+from collections.abc import Mapping
+
 from rlcard.utils import *
 
+class LazyState(Mapping):
+    ''' A state returned by an environment created with `lazy_state`. The
+    state is extracted on the first access to any of its fields, such as
+    `obs`, `legal_actions` or `raw_obs`, and cached. It must be read before
+    the environment steps again, since it is extracted from the current game.
+    '''
+    __slots__ = ('_env', '_raw_state', '_player_id', '_version', '_state')
+
+    def __init__(self, env, raw_state, player_id):
+        ''' Initialize
+
+        Args:
+            env (Env): The environment
+            raw_state (dict): The raw state from the game, or None to get it from the game when extracting
+            player_id (int): The id of the player of the state
+        '''
+        self._env = env
+        self._raw_state = raw_state
+        self._player_id = player_id
+        self._version = env._state_version
+        self._state = None
+
+    def _extract(self):
+        if self._state is None:
+            if self._version != self._env._state_version:
+                raise RuntimeError('The lazy state is read after the environment has moved on, '
+                                   'it must be read before the next reset, step or step_back')
+            if self._raw_state is None:
+                self._state = self._env.get_state(self._player_id)
+            else:
+                self._state = self._env._extract_state(self._raw_state)
+            self._env = self._raw_state = None
+        return self._state
+
+    def __getitem__(self, key):
+        return self._extract()[key]
+
+    def __iter__(self):
+        return iter(self._extract())
+
+    def __len__(self):
+        return len(self._extract())
+
 class Env(object):
     '''
     The base Env class. For all the environments in RLCard,
@@ -15,6 +60,10 @@ class Env(object):
                 'seed' (int) - A environment local random seed.
                 'allow_step_back' (boolean) - True if allowing
                  step_back.
+                'lazy_state' (boolean) - True if reset, step and step_back
+                 return a LazyState, which is extracted only when it is read.
+                 This saves the extraction for callers that only need the
+                 next player, such as CFR traversals.
                 There can be some game specific configurations, e.g., the
                 number of players in the game. These fields should start with
                 'game_', e.g., 'game_num_players' which specify the number of
@@ -25,7 +74,10 @@ class Env(object):
                 TODO: Support more game configurations in the future.
         '''
         self.allow_step_back = self.game.allow_step_back = config['allow_step_back']
+        self.lazy_state = self.game.lazy_state = config['lazy_state']
         self.action_recorder = []
+        # Incremented whenever the game moves, so that lazy states can tell they are outdated
+        self._state_version = 0
 
         # Game specific configurations
         # Currently only support blackjack、limit-holdem、no-limit-holdem
@@ -60,7 +112,8 @@ class Env(object):
         '''
         state, player_id = self.game.init_game()
         self.action_recorder = []
-        return self._extract_state(state), player_id
+        self._state_version += 1
+        return self._wrap_state(state, player_id), player_id
 
     def step(self, action, raw_action=False):
         ''' Step forward
@@ -75,15 +128,9 @@ class Env(object):
                 (dict): The next state
                 (int): The ID of the next player
         '''
-        if not raw_action:
-            action = self._decode_action(action)
-
-        self.timestep += 1
-        # Record the action for human interface
-        self.action_recorder.append((self.get_player_id(), action))
-        next_state, player_id = self.game.step(action)
+        next_state, player_id = self._step_game(action, raw_action)
 
-        return self._extract_state(next_state), player_id
+        return self._wrap_state(next_state, player_id), player_id
 
     def step_back(self):
         ''' Take one step backward.
@@ -101,8 +148,11 @@ class Env(object):
 
         if not self.game.step_back():
             return False
+        self._state_version += 1
 
         player_id = self.get_player_id()
+        if self.lazy_state:
+            return LazyState(self, None, player_id), player_id
         state = self.get_state(player_id)
 
         return state, player_id
@@ -117,12 +167,14 @@ class Env(object):
         '''
         self.agents = agents
 
-    def run(self, is_training=False):
+    def run(self, is_training=False, columnar=False):
         '''
         Run a complete game, either for evaluation or training RL agent.
 
         Args:
             is_training (boolean): True if for training purpose.
+            columnar (boolean): True to record the trajectories as Trajectory objects,
+              which keep only the observations, actions and legal actions in arrays
 
         Returns:
             (tuple) Tuple containing:
@@ -133,11 +185,17 @@ class Env(object):
         Note: The trajectories are 3-dimension list. The first dimension is for different players.
               The second dimension is for different transitions. The third dimension is for the contents of each transiton
         '''
-        trajectories = [[] for _ in range(self.num_players)]
+        if columnar:
+            trajectories = [Trajectory(self.num_actions) for _ in range(self.num_players)]
+        else:
+            trajectories = [[] for _ in range(self.num_players)]
         state, player_id = self.reset()
 
         # Loop to play the game
-        trajectories[player_id].append(state)
+        if columnar:
+            trajectories[player_id].add_state(state)
+        else:
+            trajectories[player_id].append(state)
         while not self.is_over():
             # Agent plays
             if not is_training:
@@ -148,7 +206,10 @@ class Env(object):
             # Environment steps
             next_state, next_player_id = self.step(action, self.agents[player_id].use_raw)
             # Save action
-            trajectories[player_id].append(action)
+            if columnar:
+                trajectories[player_id].add_action(action)
+            else:
+                trajectories[player_id].append(action)
 
             # Set the state and player
             state = next_state
@@ -156,18 +217,46 @@ class Env(object):
 
             # Save state.
             if not self.game.is_over():
-                trajectories[player_id].append(state)
+                if columnar:
+                    trajectories[player_id].add_state(state)
+                else:
+                    trajectories[player_id].append(state)
 
         # Add a final state to all the players
         for player_id in range(self.num_players):
             state = self.get_state(player_id)
-            trajectories[player_id].append(state)
+            if columnar:
+                trajectories[player_id].add_state(state)
+                trajectories[player_id].finish()
+            else:
+                trajectories[player_id].append(state)
 
         # Payoffs
         payoffs = self.get_payoffs()
 
         return trajectories, payoffs
 
+    def play(self):
+        '''
+        Play a complete game for evaluation. Unlike `run`, no trajectories are
+        recorded, the states are not extracted once the game is over, and the
+        agents that have an `eval_action` method predict their actions without
+        the information returned by `eval_step`.
+
+        Returns:
+            (list): A list payoffs. Each entry corresponds to one player.
+        '''
+        eval_actions = [getattr(agent, 'eval_action', None) or (lambda state, agent=agent: agent.eval_step(state)[0])
+                        for agent in self.agents]
+        state, player_id = self.reset()
+        while not self.is_over():
+            action = eval_actions[player_id](state)
+            next_state, player_id = self._step_game(action, self.agents[player_id].use_raw)
+            if not self.is_over():
+                state = self._wrap_state(next_state, player_id)
+
+        return self.get_payoffs()
+
     def is_over(self):
         ''' Check whether the curent game is over
 
@@ -230,6 +319,31 @@ class Env(object):
         self.game.np_random = self.np_random
         return seed
 
+    def _step_game(self, action, raw_action):
+        ''' Step the game without extracting the next state
+
+        Returns:
+            (tuple): The raw next state and the ID of the next player
+        '''
+        if not raw_action:
+            action = self._decode_action(action)
+
+        self.timestep += 1
+        # Record the action for human interface
+        self.action_recorder.append((self.get_player_id(), action))
+        next_state, player_id = self.game.step(action)
+        self._state_version += 1
+        return next_state, player_id
+
+    def _wrap_state(self, state, player_id):
+        ''' Extract the raw state from the game, or defer it with `lazy_state`.
+        With `lazy_state`, games may skip building the raw state and return None,
+        in which case it is taken from the game when extracting.
+        '''
+        if self.lazy_state:
+            return LazyState(self, state, player_id)
+        return self._extract_state(state)
+
     def _extract_state(self, state):
         ''' Extract useful information from state for RL. Must be implemented in the child class.
 
@@ -3,6 +3,7 @@ import importlib
 # Default Config
 DEFAULT_CONFIG = {
         'allow_step_back': False,
+        'lazy_state': False,
         'seed': None,
         }
 
@@ -18,8 +19,15 @@ class EnvSpec(object):
             entry_point (string): A string the indicates the location of the envronment class
         '''
         self.env_id = env_id
-        mod_name, class_name = entry_point.split(':')
-        self._entry_point = getattr(importlib.import_module(mod_name), class_name)
+        self._mod_name, self._class_name = entry_point.split(':')
+        self._entry_point = None
+
+    def _load_entry_point(self):
+        ''' Import the environment class on first use, so that registering does not import every game
+        '''
+        if self._entry_point is None:
+            self._entry_point = getattr(importlib.import_module(self._mod_name), self._class_name)
+        return self._entry_point
 
     def make(self, config=DEFAULT_CONFIG):
         ''' Instantiates an instance of the environment
@@ -28,7 +36,7 @@ class EnvSpec(object):
             env (Env): An instance of the environemnt
             config (dict): A dictionary of the environment settings
         '''
-        env = self._entry_point(config)
+        env = self._load_entry_point()(config)
         return env
 
 class EnvRegistry(object):
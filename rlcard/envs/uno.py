@@ -4,7 +4,7 @@ from collections import OrderedDict
 from rlcard.envs import Env
 from rlcard.games.uno import Game
 from rlcard.games.uno.utils import encode_hand, encode_target
-from rlcard.games.uno.utils import ACTION_SPACE, ACTION_LIST
+from rlcard.games.uno.utils import ACTION_LIST
 from rlcard.games.uno.utils import cards2list
 
 DEFAULT_GAME_CONFIG = {
@@ -45,9 +45,7 @@ class UnoEnv(Env):
         return ACTION_LIST[np.random.choice(legal_ids)]
 
     def _get_legal_actions(self):
-        legal_actions = self.game.get_legal_actions()
-        legal_ids = {ACTION_SPACE[action]: None for action in legal_actions}
-        return OrderedDict(legal_ids)
+        return OrderedDict.fromkeys(self.game.get_legal_action_ids())
 
     def get_perfect_information(self):
         ''' Get the perfect information of the current state
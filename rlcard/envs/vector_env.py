@@ -0,0 +1,252 @@
+''' Run several copies of an environment in worker processes
+
+Each worker process hosts several environments and writes their
+observations, legal action masks, current players, payoffs and dones into
+arrays in shared memory, so that only short commands go through the pipes.
+Since the players of a game can observe states of different shapes, there
+is one observation buffer per player, and the observation of an
+environment is written into the buffer of its current player.
+'''
+import ctypes
+import multiprocessing as mp
+import traceback
+
+import numpy as np
+
+import rlcard
+
+class VectorEnv(object):
+    ''' A batch of environments of the same game stepped in parallel.
+    A game that is over is reset automatically, after its payoffs are
+    written, so that every environment always has a current player.
+
+    The returned arrays are views of the shared memory. They are
+    overwritten by the next `reset` or `step`, and should be copied
+    if they are kept.
+    '''
+
+    def __init__(self, env_id, num_envs, config={}, num_workers=None, context=None):
+        ''' Initialize
+
+        Args:
+            env_id (string): The name of the registered environment
+            num_envs (int): The number of environments
+            config (dict): The config of the environments. With a seed,
+              environment i is seeded with seed + i
+            num_workers (int): The number of worker processes, by default
+              the number of CPUs but at most one per environment
+            context (string): The multiprocessing start method, by default
+              that of the platform
+        '''
+        self.env_id = env_id
+        self.num_envs = num_envs
+        if num_workers is None:
+            num_workers = mp.cpu_count()
+        self.num_workers = min(num_workers, num_envs)
+
+        # Get the shapes and the type of the observations from an environment in this process
+        env = rlcard.make(env_id, config)
+        state, _ = env.reset()
+        self.num_players = env.num_players
+        self.num_actions = env.num_actions
+        self.state_shape = env.state_shape
+        obs_dtype = np.asarray(state['obs']).dtype
+
+        ctx = mp.get_context(context)
+        shapes = {
+            'obs': [(num_envs,) + tuple(self.state_shape[player_id]) for player_id in range(self.num_players)],
+            'legal_actions': (num_envs, self.num_actions),
+            'player_ids': (num_envs,),
+            'payoffs': (num_envs, self.num_players),
+            'dones': (num_envs,),
+            'actions': (num_envs,),
+        }
+        dtypes = {
+            'obs': [obs_dtype] * self.num_players,
+            'legal_actions': np.bool_,
+            'player_ids': np.int64,
+            'payoffs': np.float64,
+            'dones': np.bool_,
+            'actions': np.int64,
+        }
+        self._buffers = {}
+        for name, shape in shapes.items():
+            if name == 'obs':
+                self._buffers[name] = [_create_buffer(ctx, shape, dtype) for shape, dtype in zip(shape, dtypes[name])]
+            else:
+                self._buffers[name] = _create_buffer(ctx, shape, dtypes[name])
+        self._arrays = {name: _as_array(buffer) for name, buffer in self._buffers.items()}
+
+        self._pipes = []
+        self._processes = []
+        for env_indices in np.array_split(np.arange(num_envs), self.num_workers):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(env_id, config, env_indices.tolist(), self._buffers, child_pipe),
+                daemon=True)
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+        self._waiting = False
+        self.closed = False
+
+    def reset(self):
+        ''' Start new games in all the environments
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (list): The observations by player, each of shape (num_envs, *state_shape[player_id]).
+                  Row i of the array of player p is the observation of environment i if p is its current player
+                (numpy.array): (num_envs, num_actions) boolean masks of the legal actions
+                (numpy.array): (num_envs,) ids of the current players
+        '''
+        self._send(('reset', None))
+        self._receive()
+        return self._arrays['obs'], self._arrays['legal_actions'], self._arrays['player_ids']
+
+    def step_async(self, actions):
+        ''' Send the actions of the current players to the workers without waiting
+
+        Args:
+            actions (numpy.array): (num_envs,) ids of the actions of the current players
+        '''
+        self._arrays['actions'][:] = actions
+        self._send(('step', None))
+
+    def step_wait(self):
+        ''' Wait for the step sent by `step_async`
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (list): The observations by player, as in `reset`
+                (numpy.array): (num_envs, num_actions) boolean masks of the legal actions
+                (numpy.array): (num_envs,) ids of the current players
+                (numpy.array): (num_envs, num_players) payoffs of the games that are over
+                (numpy.array): (num_envs,) True for the environments whose game is over,
+                  and that have been reset
+        '''
+        self._receive()
+        return (self._arrays['obs'], self._arrays['legal_actions'], self._arrays['player_ids'],
+                self._arrays['payoffs'], self._arrays['dones'])
+
+    def step(self, actions):
+        ''' Step all the environments, resetting those whose game is over
+
+        Args:
+            actions (numpy.array): (num_envs,) ids of the actions of the current players
+
+        Returns:
+            (tuple): The same as `step_wait`
+        '''
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        ''' Stop the worker processes
+        '''
+        if self.closed:
+            return
+        if self._waiting:
+            self._receive()
+        for pipe in self._pipes:
+            pipe.send(('close', None))
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for pipe in self._pipes:
+            pipe.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _send(self, command):
+        if self.closed:
+            raise RuntimeError('The vector environment is closed')
+        for pipe in self._pipes:
+            pipe.send(command)
+        self._waiting = True
+
+    def _receive(self):
+        errors = [message for message in (pipe.recv() for pipe in self._pipes) if message is not None]
+        self._waiting = False
+        if errors:
+            self.close()
+            raise RuntimeError('Exception in worker process:\n{}'.format(errors[0]))
+
+def _create_buffer(ctx, shape, dtype):
+    ''' Allocate a shared-memory buffer for an array
+
+    Returns:
+        (tuple): The raw array, shape and dtype, which can be passed to the worker processes
+    '''
+    dtype = np.dtype(dtype)
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    return ctx.RawArray(ctypes.c_byte, size), shape, dtype.str
+
+def _as_array(buffer):
+    ''' Get the numpy view of a buffer made by `_create_buffer`, or of a list of them
+    '''
+    if isinstance(buffer, list):
+        return [_as_array(b) for b in buffer]
+    raw, shape, dtype = buffer
+    return np.frombuffer(raw, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+def _worker(env_id, config, env_indices, buffers, pipe):
+    ''' The loop of a worker process hosting the environments `env_indices`
+    '''
+    try:
+        arrays = {name: _as_array(buffer) for name, buffer in buffers.items()}
+        envs = []
+        for index in env_indices:
+            env_config = dict(config)
+            if env_config.get('seed') is not None:
+                env_config['seed'] = env_config['seed'] + index
+            envs.append(rlcard.make(env_id, env_config))
+
+        def write(index, state, player_id):
+            obs = arrays['obs'][player_id]
+            obs[index] = np.reshape(state['obs'], obs.shape[1:])
+            legal_actions = arrays['legal_actions'][index]
+            legal_actions[:] = False
+            legal_actions[list(state['legal_actions'])] = True
+            arrays['player_ids'][index] = player_id
+
+        while True:
+            command, _ = pipe.recv()
+            try:
+                if command == 'reset':
+                    for index, env in zip(env_indices, envs):
+                        state, player_id = env.reset()
+                        write(index, state, player_id)
+                elif command == 'step':
+                    for index, env in zip(env_indices, envs):
+                        state, player_id = env.step(int(arrays['actions'][index]))
+                        done = env.is_over()
+                        arrays['dones'][index] = done
+                        if done:
+                            arrays['payoffs'][index] = env.get_payoffs()
+                            state, player_id = env.reset()
+                        else:
+                            arrays['payoffs'][index] = 0
+                        write(index, state, player_id)
+                elif command == 'close':
+                    break
+                pipe.send(None)
+            except Exception:
+                pipe.send(traceback.format_exc())
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        # Reported as the reply to the next command
+        pipe.send(traceback.format_exc())
+    finally:
+        pipe.close()
@@ -28,6 +28,9 @@ class BlackjackDealer:
 
         Args:
             player_id (int): the target player's id
+
+        Returns:
+            idx (int): the position of the card in the deck
         '''
         idx = self.np_random.choice(len(self.deck))
         card = self.deck[idx]
@@ -35,3 +38,15 @@ class BlackjackDealer:
             self.deck.pop(idx)
         # card = self.deck.pop()
         player.hand.append(card)
+        return idx
+
+    def return_card(self, player, idx):
+        ''' Take back the last card distributed to the player
+
+        Args:
+            player (object): the player the card was distributed to
+            idx (int): the position of the card in the deck, as returned by deal_card
+        '''
+        card = player.hand.pop()
+        if self.num_decks != 0:
+            self.deck.insert(idx, card)
@@ -1,4 +1,3 @@
-from copy import deepcopy
 import numpy as np
 
 from rlcard.games.blackjack import Dealer
@@ -64,22 +63,22 @@ class BlackjackGame:
             int: next plater's id
         '''
         if self.allow_step_back:
-            p = deepcopy(self.players[self.game_pointer])
-            d = deepcopy(self.dealer)
-            w = deepcopy(self.winner)
-            self.history.append((d, p, w))
+            # Record what the action can change, the dealt cards are appended by _deal_card
+            p = self.players[self.game_pointer]
+            self.history.append((self.game_pointer, p.status, p.score, self.dealer.status, self.dealer.score,
+                                 dict(self.winner), []))
 
         next_state = {}
         # Play hit
         if action != "stand":
-            self.dealer.deal_card(self.players[self.game_pointer])
+            self._deal_card(self.players[self.game_pointer])
             self.players[self.game_pointer].status, self.players[self.game_pointer].score = self.judger.judge_round(
                 self.players[self.game_pointer])
             if self.players[self.game_pointer].status == 'bust':
                 # game over, set up the winner, print out dealer's hand # If bust, pass the game pointer
                 if self.game_pointer >= self.num_players - 1:
                     while self.judger.judge_score(self.dealer.hand) < 17:
-                        self.dealer.deal_card(self.dealer)
+                        self._deal_card(self.dealer)
                     self.dealer.status, self.dealer.score = self.judger.judge_round(self.dealer)
                     for i in range(self.num_players):
                         self.judger.judge_game(self, i) 
@@ -93,7 +92,7 @@ class BlackjackGame:
                 self.players[self.game_pointer])
             if self.game_pointer >= self.num_players - 1:
                 while self.judger.judge_score(self.dealer.hand) < 17:
-                    self.dealer.deal_card(self.dealer)
+                    self._deal_card(self.dealer)
                 self.dealer.status, self.dealer.score = self.judger.judge_round(self.dealer)
                 for i in range(self.num_players):
                     self.judger.judge_game(self, i) 
@@ -130,10 +129,24 @@ class BlackjackGame:
         '''
         #while len(self.history) > 0:
         if len(self.history) > 0:
-            self.dealer, self.players[self.game_pointer], self.winner = self.history.pop()
+            self.game_pointer, status, score, self.dealer.status, self.dealer.score, self.winner, dealt = self.history.pop()
+            self.players[self.game_pointer].status = status
+            self.players[self.game_pointer].score = score
+            for player, idx in reversed(dealt):
+                self.dealer.return_card(player, idx)
             return True
         return False
 
+    def _deal_card(self, player):
+        ''' Deal a card to the player, and record it for stepping back
+
+        Args:
+            player (object): the player or the dealer
+        '''
+        idx = self.dealer.deal_card(player)
+        if self.allow_step_back:
+            self.history[-1][-1].append((player, idx))
+
     def get_num_players(self):
         ''' Return the number of players in blackjack
 
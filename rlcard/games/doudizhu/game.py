@@ -1,11 +1,9 @@
 # -*- coding: utf-8 -*-
 ''' Implement Doudizhu Game class
 '''
-import functools
-from heapq import merge
 import numpy as np
 
-from rlcard.games.doudizhu.utils import cards2str, doudizhu_sort_card, CARD_RANK_STR
+from rlcard.games.doudizhu.utils import cards2str, CARD_RANK_STR, CARD_RANK_STR_INDEX
 from rlcard.games.doudizhu import Player
 from rlcard.games.doudizhu import Round
 from rlcard.games.doudizhu import Judger
@@ -17,8 +15,10 @@ class DoudizhuGame:
     '''
     def __init__(self, allow_step_back=False):
         self.allow_step_back = allow_step_back
+        self.lazy_state = False
         self.np_random = np.random.RandomState()
         self.num_players = 3
+        self._state = None
 
     def init_game(self):
         ''' Initialize players and state.
@@ -46,7 +46,7 @@ class DoudizhuGame:
 
         # get state of first player
         player_id = self.round.current_player
-        self.state = self.get_state(player_id)
+        self._state = None
 
         return self.state, player_id
 
@@ -74,11 +74,12 @@ class DoudizhuGame:
         next_id = (player.player_id+1) % len(self.players)
         self.round.current_player = next_id
 
-        # get next state
-        state = self.get_state(next_id)
-        self.state = state
+        # get next state, which is left to the env with lazy_state
+        self._state = None
+        if self.lazy_state:
+            return None, next_id
 
-        return state, next_id
+        return self.state, next_id
 
     def step_back(self):
         ''' Return to the previous state of the game
@@ -104,9 +105,17 @@ class DoudizhuGame:
         if (cards != 'pass'):
             self.judger.restore_playable_cards(player_id)
 
-        self.state = self.get_state(self.round.current_player)
+        self._state = None
         return True
 
+    @property
+    def state(self):
+        ''' The state of the current player, built on first access after each move
+        '''
+        if self._state is None:
+            self._state = self.get_state(self.round.current_player)
+        return self._state
+
     def get_state(self, player_id):
         ''' Return player's state
 
@@ -165,5 +174,6 @@ class DoudizhuGame:
     def _get_others_current_hand(self, player):
         player_up = self.players[(player.player_id+1) % len(self.players)]
         player_down = self.players[(player.player_id-1) % len(self.players)]
-        others_hand = merge(player_up.current_hand, player_down.current_hand, key=functools.cmp_to_key(doudizhu_sort_card))
-        return cards2str(others_hand)
+        # The hands are sorted, so the cards are sorted by rank
+        others_hand = cards2str(player_up.current_hand) + cards2str(player_down.current_hand)
+        return ''.join(sorted(others_hand, key=CARD_RANK_STR_INDEX.__getitem__))
@@ -7,7 +7,7 @@ from itertools import combinations
 from bisect import bisect_left
 
 from rlcard.games.doudizhu.utils import CARD_RANK_STR, CARD_RANK_STR_INDEX
-from rlcard.games.doudizhu.utils import cards2str, contains_cards
+from rlcard.games.doudizhu.utils import cards2str, cards2mask, contains_masks, get_cards_masks
 
 
 
@@ -260,12 +260,14 @@ class DoudizhuJudger:
     def __init__(self, players, np_random):
         ''' Initilize the Judger class for Dou Dizhu
         '''
-        self.playable_cards = [set() for _ in range(3)]
+        # The playable cards are kept in sorted dicts rather than sets, so that
+        # their order does not depend on the hash seed of the process
+        self.playable_cards = [{} for _ in range(3)]
         self._recorded_removed_playable_cards = [[] for _ in range(3)]
         for player in players:
             player_id = player.player_id
             current_hand = cards2str(player.current_hand)
-            self.playable_cards[player_id] = self.playable_cards_from_hand(current_hand)
+            self.playable_cards[player_id] = dict.fromkeys(sorted(self.playable_cards_from_hand(current_hand)))
 
     def calc_playable_cards(self, player):
         ''' Recalculate all legal cards the player can play according to his
@@ -279,8 +281,6 @@ class DoudizhuJudger:
         Returns:
             list: list of string of playable cards
         '''
-        removed_playable_cards = []
-
         player_id = player.player_id
         current_hand = cards2str(player.current_hand)
         missed = None
@@ -289,21 +289,16 @@ class DoudizhuJudger:
                 missed = single
                 break
 
-        playable_cards = self.playable_cards[player_id].copy()
-
         if missed is not None:
             position = player.singles.find(missed)
             player.singles = player.singles[position+1:]
-            for cards in playable_cards:
-                if missed in cards or (not contains_cards(current_hand, cards)):
-                    removed_playable_cards.append(cards)
-                    self.playable_cards[player_id].remove(cards)
-        else:
-            for cards in playable_cards:
-                if not contains_cards(current_hand, cards):
-                    #del self.playable_cards[player_id][cards]
-                    removed_playable_cards.append(cards)
-                    self.playable_cards[player_id].remove(cards)
+
+        # Test all the playable cards against the hand at once
+        playable_cards = list(self.playable_cards[player_id])
+        contained = contains_masks(cards2mask(current_hand), get_cards_masks(playable_cards))
+        removed_playable_cards = [playable_cards[i] for i in np.flatnonzero(~contained)]
+        for cards in removed_playable_cards:
+            del self.playable_cards[player_id][cards]
         self._recorded_removed_playable_cards[player_id].append(removed_playable_cards)
         return self.playable_cards[player_id]
 
@@ -314,7 +309,8 @@ class DoudizhuJudger:
             player_id: The id of the player whose playable_cards need to be restored
         '''
         removed_playable_cards = self._recorded_removed_playable_cards[player_id].pop()
-        self.playable_cards[player_id].update(removed_playable_cards)
+        if removed_playable_cards:
+            self.playable_cards[player_id] = dict.fromkeys(sorted([*self.playable_cards[player_id], *removed_playable_cards]))
 
     def get_playable_cards(self, player):
         ''' Provide all legal cards the player can play according to his
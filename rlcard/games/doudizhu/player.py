@@ -49,6 +49,7 @@ class DoudizhuPlayer:
         state['landlord'] = public['landlord']
         state['trace'] = public['trace'].copy()
         state['played_cards'] = public['played_cards']
+        state['played_counts'] = public['played_counts']
         state['self'] = self.player_id
         state['current_hand'] = cards2str(self._current_hand)
         state['others_hand'] = others_hands
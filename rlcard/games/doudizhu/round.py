@@ -36,19 +36,28 @@ class DoudizhuRound:
         self.current_player = landlord_id
         self.public = {'deck': self.deck_str, 'seen_cards': self.seen_cards,
                        'landlord': self.landlord_id, 'trace': self.trace,
-                       'played_cards': ['' for _ in range(len(players))]}
+                       'played_cards': ['' for _ in range(len(players))],
+                       'played_counts': [counts.copy() for counts in self.played_cards]}
 
     @staticmethod
     def cards_ndarray_to_str(ndarray_cards):
         result = []
         for cards in ndarray_cards:
-            _result = []
-            for i, _ in enumerate(cards):
-                if cards[i] != 0:
-                    _result.extend([CARD_RANK_STR[i]] * cards[i])
-            result.append(''.join(_result))
+            result.append(''.join([CARD_RANK_STR[i] * n for i, n in enumerate(cards.tolist())]))
         return result
 
+    def _update_played_cards(self, player_id):
+        ''' Update the played cards of a player and their counts by rank from
+        the counts of the played cards, which are kept incrementally. The
+        lists are replaced, as the states of the players refer to them.
+        '''
+        played_cards = list(self.public['played_cards'])
+        played_cards[player_id] = self.cards_ndarray_to_str([self.played_cards[player_id]])[0]
+        self.public['played_cards'] = played_cards
+        played_counts = list(self.public['played_counts'])
+        played_counts[player_id] = self.played_cards[player_id].copy()
+        self.public['played_counts'] = played_counts
+
     def update_public(self, action):
         ''' Update public trace and played cards
 
@@ -62,7 +71,7 @@ class DoudizhuRound:
                 if self.current_player == 0 and c in self.seen_cards:
                     self.seen_cards = self.seen_cards.replace(c, '') 
                     self.public['seen_cards'] = self.seen_cards
-            self.public['played_cards'] = self.cards_ndarray_to_str(self.played_cards)
+            self._update_played_cards(self.current_player)
 
     def proceed_round(self, player, action):
         ''' Call other Classes's functions to keep one round running
@@ -92,7 +101,7 @@ class DoudizhuRound:
             for card in cards:
                 # self.played_cards.remove(card)
                 self.played_cards[player_id][CARD_RANK_STR_INDEX[card]] -= 1
-            self.public['played_cards'] = self.cards_ndarray_to_str(self.played_cards)
+            self._update_played_cards(player_id)
         greater_player_id = self.find_last_greater_player_id_in_trace()
         if (greater_player_id is not None):
             self.greater_player = players[greater_player_id]
@@ -2,40 +2,161 @@
 '''
 import os
 import json
+import hashlib
 from collections import OrderedDict
 import threading
 import collections
 
+import numpy as np
+
 import rlcard
 
 # Read required docs
 ROOT_PATH = rlcard.__path__[0]
+JSONDATA_PATH = os.path.join(ROOT_PATH, 'games/doudizhu/jsondata')
+
+# The action space and the card types are parsed from jsondata once and
+# cached as arrays indexed by action id. The arrays are memory-mapped, so the
+# processes of the actors share them, and the tables below are only built
+# from them when they are first used.
+# The cache is kept in the user cache directory, or in RLCARD_CACHE_DIR, under
+# a directory named after the format version of the arrays and a hash of the
+# source files, so that arrays of other sources or versions are never loaded
+CACHE_VERSION = 1
+CACHE_DIR = os.environ.get('RLCARD_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'rlcard')
+CACHE_ARRAYS = ('actions', 'type_names', 'types', 'weights', 'card_type_order', 'masks')
+SOURCE_FILES = ('action_space.txt', 'card_type.json')
+_TABLES = None
+
+def get_cache_path():
+    ''' Get the cache directory of the arrays of the current jsondata,
+    extracting jsondata if needed
+
+    Returns:
+        string: The path of the directory
+    '''
+    if not all(os.path.isfile(os.path.join(JSONDATA_PATH, name)) for name in SOURCE_FILES):
+        import zipfile
+        with zipfile.ZipFile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata.zip'),"r") as zip_ref:
+            zip_ref.extractall(os.path.join(ROOT_PATH, 'games/doudizhu/'))
+    digest = hashlib.sha1()
+    for name in SOURCE_FILES:
+        with open(os.path.join(JSONDATA_PATH, name), 'rb') as f:
+            digest.update(f.read())
+    return os.path.join(CACHE_DIR, 'doudizhu', 'v{}-{}'.format(CACHE_VERSION, digest.hexdigest()[:16]))
+
+def _build_cache(cache_path):
+    ''' Parse jsondata into the cached arrays and save them
+
+    Args:
+        cache_path (string): The directory of the cached arrays
+
+    Returns:
+        dict: The arrays
+    '''
+    # Action space, the last action is 'pass'
+    with open(os.path.join(JSONDATA_PATH, 'action_space.txt'), 'r') as f:
+        actions = f.readline().strip().split()
+    action_ids = {action: i for i, action in enumerate(actions)}
+
+    # a map of card to its type, where every card has a single type. The
+    # map of type to its cards follows the order of the cards in it
+    with open(os.path.join(JSONDATA_PATH, 'card_type.json'), 'r') as f:
+        card_type = json.load(f, object_pairs_hook=OrderedDict)
+    type_names = list(OrderedDict.fromkeys(types[0][0] for types in card_type.values()))
+    type_ids = {name: i for i, name in enumerate(type_names)}
+    types = np.full(len(actions), -1, dtype=np.int8)
+    weights = np.full(len(actions), -1, dtype=np.int8)
+    for cards, card_types in card_type.items():
+        (card_type_name, weight), = card_types
+        types[action_ids[cards]] = type_ids[card_type_name]
+        weights[action_ids[cards]] = int(weight)
+
+    arrays = {
+        'actions': np.array(actions),
+        'type_names': np.array(type_names),
+        'types': types,
+        'weights': weights,
+        'card_type_order': np.array([action_ids[cards] for cards in card_type], dtype=np.int32),
+        'masks': np.array([cards2mask(action) if action != 'pass' else 0 for action in actions], dtype=np.int64),
+    }
+    try:
+        os.makedirs(cache_path, exist_ok=True)
+        for name, array in arrays.items():
+            # Write to a temporary file first, as several processes may build the cache at once
+            tmp_path = os.path.join(cache_path, '{}.{}.npy'.format(name, os.getpid()))
+            np.save(tmp_path, array)
+            os.replace(tmp_path, os.path.join(cache_path, name + '.npy'))
+    except OSError:
+        # The cache directory may be read-only, then the arrays are only used in this process
+        pass
+    return arrays
+
+def get_tables():
+    ''' Load the cached arrays of the action space, or build them
+
+    Returns:
+        dict: The arrays. 'actions' are the actions by id, and 'types',
+          'weights' and 'masks' the index in 'type_names', the weight and
+          the packed counts of the actions, -1 and 0 for 'pass'.
+          'card_type_order' is the order of the actions in CARD_TYPE
+    '''
+    global _TABLES
+    if _TABLES is None:
+        _TABLES = _load_tables()
+    return _TABLES
 
-if not os.path.isfile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/action_space.txt')) \
-        or not os.path.isfile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/card_type.json')) \
-        or not os.path.isfile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/type_card.json')):
-    import zipfile
-    with zipfile.ZipFile(os.path.join(ROOT_PATH, 'games/doudizhu/jsondata.zip'),"r") as zip_ref:
-        zip_ref.extractall(os.path.join(ROOT_PATH, 'games/doudizhu/'))
-
-# Action space
-action_space_path = os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/action_space.txt')
-with open(action_space_path, 'r') as f:
-    ID_2_ACTION = f.readline().strip().split()
-    ACTION_2_ID = {}
-    for i, action in enumerate(ID_2_ACTION):
-        ACTION_2_ID[action] = i
-
-# a map of card to its type. Also return both dict and list to accelerate
-card_type_path = os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/card_type.json')
-with open(card_type_path, 'r') as f:
-    data = json.load(f, object_pairs_hook=OrderedDict)
+def _load_tables():
+    ''' Memory-map the cached arrays of the current jsondata, or build them
+    '''
+    cache_path = get_cache_path()
+    try:
+        return {name: np.load(os.path.join(cache_path, name + '.npy'), mmap_mode='r') for name in CACHE_ARRAYS}
+    except (OSError, ValueError):
+        return _build_cache(cache_path)
+
+def _build_action_space():
+    global ID_2_ACTION, ACTION_2_ID
+    ID_2_ACTION = get_tables()['actions'].tolist()
+    ACTION_2_ID = {action: i for i, action in enumerate(ID_2_ACTION)}
+
+def _build_card_type():
+    ''' a map of card to its type. Also return both dict and list to accelerate '''
+    global CARD_TYPE
+    tables = get_tables()
+    actions = _get_table('ID_2_ACTION')
+    type_names = tables['type_names'].tolist()
+    types, weights = tables['types'].tolist(), tables['weights'].tolist()
+    data = OrderedDict()
+    for i in tables['card_type_order'].tolist():
+        data[actions[i]] = [[type_names[types[i]], str(weights[i])]]
     CARD_TYPE = (data, list(data), set(data))
 
-# a map of type to its cards
-type_card_path = os.path.join(ROOT_PATH, 'games/doudizhu/jsondata/type_card.json')
-with open(type_card_path, 'r') as f:
-    TYPE_CARD = json.load(f, object_pairs_hook=OrderedDict)
+def _build_type_card():
+    ''' a map of type to its cards '''
+    global TYPE_CARD
+    TYPE_CARD = OrderedDict()
+    for cards, ((card_type, weight),) in _get_table('CARD_TYPE')[0].items():
+        TYPE_CARD.setdefault(card_type, OrderedDict()).setdefault(weight, []).append(cards)
+
+_LAZY_TABLES = {
+    'ID_2_ACTION': _build_action_space,
+    'ACTION_2_ID': _build_action_space,
+    'CARD_TYPE': _build_card_type,
+    'TYPE_CARD': _build_type_card,
+}
+
+def _get_table(name):
+    if name not in globals():
+        _LAZY_TABLES[name]()
+    return globals()[name]
+
+def __getattr__(name):
+    ''' Build the tables of the action space when they are first used '''
+    if name in _LAZY_TABLES:
+        return _get_table(name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
 
 # rank list of solo character of cards
 CARD_RANK_STR = ['3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K',
@@ -192,6 +313,85 @@ def contains_cards(candidate, target):
         return False
     return True
 
+# The counts of the 15 ranks are packed into 4-bit fields of an integer.
+# Since a count is at most 4, a field of the hand with its highest bit set
+# minus the same field of a move keeps the bit set exactly when the hand has
+# enough cards of that rank, and no field borrows from the next one
+_GUARD_BITS = sum(8 << (4 * i) for i in range(len(CARD_RANK_STR)))
+_GT_CANDIDATES = {}
+
+def cards2mask(cards):
+    ''' Get the packed counts of cards
+
+    Args:
+        cards (string): A string representing the cards
+
+    Returns:
+        int: The counts of the cards in 4-bit fields, from rank 3 in the lowest bits
+    '''
+    mask = 0
+    for card in cards:
+        mask += 1 << (4 * CARD_RANK_STR_INDEX[card])
+    return mask
+
+def contains_masks(candidate_mask, target_masks):
+    ''' Check if the cards of the candidate contain the cards of the targets,
+    all given as packed counts.
+
+    Args:
+        candidate_mask (int): The packed counts of the candidate
+        target_masks (int or numpy.array): The packed counts of the targets
+
+    Returns:
+        boolean or numpy.array of booleans
+    '''
+    return ((candidate_mask | _GUARD_BITS) - target_masks) & _GUARD_BITS == _GUARD_BITS
+
+def get_cards_masks(cards_list):
+    ''' Get the packed counts of playable cards
+
+    Args:
+        cards_list (list): list of string of playable cards
+
+    Returns:
+        numpy.array: The packed counts of the cards
+    '''
+    action_ids = _get_table('ACTION_2_ID')
+    ids = np.fromiter((action_ids[cards] for cards in cards_list), dtype=np.int64, count=len(cards_list))
+    return get_tables()['masks'][ids]
+
+def _get_gt_candidates(target_id):
+    ''' Get the candidates greater than the played cards, i.e., the cards of
+    the same type with greater weights, and the bombs and the rocket greater
+    than them, in the order of CARD_TYPE. They are indexed by the type and the
+    weight of the played cards.
+
+    Args:
+        target_id (int): The action id of the played cards
+
+    Returns:
+        tuple: The list of string of the candidates and their packed counts
+    '''
+    tables = get_tables()
+    key = (int(tables['types'][target_id]), int(tables['weights'][target_id]))
+    if key not in _GT_CANDIDATES:
+        type_names = tables['type_names'].tolist()
+        type_dict = {type_names[key[0]]: key[1]}
+        # Nothing is greater than the rocket
+        if 'rocket' in type_dict:
+            type_dict = {}
+        else:
+            type_dict['rocket'] = -1
+            if 'bomb' not in type_dict:
+                type_dict['bomb'] = -1
+        order = tables['card_type_order']
+        types, weights = tables['types'][order], tables['weights'][order]
+        ids = np.concatenate([order[(types == type_names.index(card_type)) & (weights > weight)]
+                              for card_type, weight in type_dict.items()] + [np.zeros(0, dtype=order.dtype)])
+        actions = _get_table('ID_2_ACTION')
+        _GT_CANDIDATES[key] = ([actions[i] for i in ids], tables['masks'][ids])
+    return _GT_CANDIDATES[key]
+
 def encode_cards(plane, cards):
     ''' Encode cards and represerve it into plane.
 
@@ -238,25 +438,9 @@ def get_gt_cards(player, greater_player):
     '''
     # add 'pass' to legal actions
     gt_cards = ['pass']
-    current_hand = cards2str(player.current_hand)
-    target_cards = greater_player.played_cards
-    target_types = CARD_TYPE[0][target_cards]
-    type_dict = {}
-    for card_type, weight in target_types:
-        if card_type not in type_dict:
-            type_dict[card_type] = weight
-    if 'rocket' in type_dict:
-        return gt_cards
-    type_dict['rocket'] = -1
-    if 'bomb' not in type_dict:
-        type_dict['bomb'] = -1
-    for card_type, weight in type_dict.items():
-        candidate = TYPE_CARD[card_type]
-        for can_weight, cards_list in candidate.items():
-            if int(can_weight) > int(weight):
-                for cards in cards_list:
-                    # TODO: improve efficiency
-                    if cards not in gt_cards and contains_cards(current_hand, cards):
-                        # if self.contains_cards(current_hand, cards):
-                        gt_cards.append(cards)
+    current_mask = cards2mask(cards2str(player.current_hand))
+    target_id = _get_table('ACTION_2_ID')[greater_player.played_cards]
+    cards_list, masks = _get_gt_candidates(target_id)
+    for i in np.flatnonzero(contains_masks(current_mask, masks)):
+        gt_cards.append(cards_list[i])
     return gt_cards
@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 from typing import List, Tuple
 
+import functools
+
 from .utils.action_event import *
 from .utils.scorers import GinRummyScorer
 from .utils import melding
@@ -43,10 +45,7 @@ class GinRummyJudge:
             current_player = self.game.get_current_player()
             going_out_deadwood_count = self.game.settings.going_out_deadwood_count
             hand = current_player.hand
-            meld_clusters = current_player.get_meld_clusters()  # improve speed 2020-Apr
-            knock_cards, gin_cards = _get_going_out_cards(meld_clusters=meld_clusters,
-                                                          hand=hand,
-                                                          going_out_deadwood_count=going_out_deadwood_count)
+            knock_cards, gin_cards = get_going_out_cards(hand=hand, going_out_deadwood_count=going_out_deadwood_count)
             if self.game.settings.is_allowed_gin and gin_cards:
                 legal_actions = [GinAction()]
             else:
@@ -105,51 +104,45 @@ def get_going_out_cards(hand: List[Card], going_out_deadwood_count: int) -> Tupl
     '''
     if not len(hand) == 11:
         raise GinRummyProgramError("len(hand) is {}: should be 11.".format(len(hand)))
-    meld_clusters = melding.get_meld_clusters(hand=hand)
-    knock_cards, gin_cards = _get_going_out_cards(meld_clusters=meld_clusters,
-                                                  hand=hand,
-                                                  going_out_deadwood_count=going_out_deadwood_count)
-    return list(knock_cards), list(gin_cards)
+    knock_mask, gin_mask = _get_going_out_masks(hand_mask=utils.get_cards_mask(hand),
+                                                going_out_deadwood_count=going_out_deadwood_count)
+    return utils.get_cards_from_mask(knock_mask), utils.get_cards_from_mask(gin_mask)
 
 
 #
 # private methods
 #
 
-def _get_going_out_cards(meld_clusters: List[List[List[Card]]],
-                         hand: List[Card],
-                         going_out_deadwood_count: int) -> Tuple[List[Card], List[Card]]:
+@functools.lru_cache(maxsize=4096)
+def _get_going_out_masks(hand_mask: int, going_out_deadwood_count: int) -> Tuple[int, int]:
     '''
-    :param meld_clusters
-    :param hand: List[Card] -- must have 11 cards
+    :param hand_mask: int -- mask of a hand of 11 cards
     :param going_out_deadwood_count: int
-    :return List[Card], List[Card: cards in hand that be knocked, cards in hand that can be ginned
+    :return int, int: masks of the cards in hand that be knocked, of the cards in hand that can be ginned
     '''
-    if not len(hand) == 11:
-        raise GinRummyProgramError("len(hand) is {}: should be 11.".format(len(hand)))
-    knock_cards = set()
-    gin_cards = set()
-    for meld_cluster in meld_clusters:
-        meld_cards = [card for meld_pile in meld_cluster for card in meld_pile]
-        hand_deadwood = [card for card in hand if card not in meld_cards]  # hand has 11 cards
-        if len(hand_deadwood) == 0:
+    knock_mask = 0
+    gin_mask = 0
+    for meld_cluster_masks in melding.get_meld_cluster_masks(hand_mask=hand_mask):
+        meld_mask = 0
+        for meld_pile_mask in meld_cluster_masks:
+            meld_mask |= meld_pile_mask
+        deadwood_mask = hand_mask & ~meld_mask
+        if deadwood_mask == 0:
             # all 11 cards are melded;
-            # take gin_card as first card of first 4+ meld;
-            # could also take gin_card as last card of 4+ meld, but won't do this.
-            for meld_pile in meld_cluster:
-                if len(meld_pile) >= 4:
-                    gin_cards.add(meld_pile[0])
+            # take gin_card as lowest card of first 4+ meld
+            for meld_pile_mask in meld_cluster_masks:
+                if bin(meld_pile_mask).count('1') >= 4:
+                    gin_mask |= meld_pile_mask & -meld_pile_mask
                     break
-        elif len(hand_deadwood) == 1:
-            card = hand_deadwood[0]
-            gin_cards.add(card)
+        elif deadwood_mask & (deadwood_mask - 1) == 0:
+            gin_mask |= deadwood_mask
         else:
-            hand_deadwood_values = [utils.get_deadwood_value(card) for card in hand_deadwood]
-            hand_deadwood_count = sum(hand_deadwood_values)
-            max_hand_deadwood_value = max(hand_deadwood_values, default=0)
+            hand_deadwood_count = utils.get_mask_deadwood_count(deadwood_mask)
+            max_hand_deadwood_value = utils.get_mask_max_deadwood_value(deadwood_mask)
             if hand_deadwood_count <= 10 + max_hand_deadwood_value:
-                for card in hand_deadwood:
+                for card in utils.get_cards_from_mask(deadwood_mask):
                     next_deadwood_count = hand_deadwood_count - utils.get_deadwood_value(card)
                     if next_deadwood_count <= going_out_deadwood_count:
-                        knock_cards.add(card)
-    return list(knock_cards), list(gin_cards)
+                        knock_mask |= 1 << utils.get_card_id(card)
+    return knock_mask, gin_mask
+
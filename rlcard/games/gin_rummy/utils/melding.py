@@ -4,7 +4,9 @@
     Date created: 2/12/2020
 '''
 
-from typing import List
+from typing import List, Tuple
+
+import functools
 
 from rlcard.games.base import Card
 
@@ -19,9 +21,47 @@ from rlcard.games.gin_rummy.utils.gin_rummy_error import GinRummyProgramError
 #        meld_piles - a list of meld_pile
 #        meld_cluster - same as meld_piles, but usually with the piles being mutually disjoint
 #        meld_clusters - a list of meld_cluster
+#        meld_mask - a meld_pile as a 52-bit mask of its card_ids
+#        meld_cluster_masks - a meld_cluster as a tuple of meld_masks
 # ===============================================================
 
 
+_rank_mask = 1 | 1 << 13 | 1 << 26 | 1 << 39  # mask of the aces
+
+
+@functools.lru_cache(maxsize=None)
+def _get_run_meld_masks_for_suit(suit_mask: int) -> Tuple[int, ...]:
+    # the run_melds of the 13-bit mask of the ranks of a suit by start and end
+    result = []
+    for start in range(11):
+        for end in range(start + 3, 14):
+            run_mask = ((1 << (end - start)) - 1) << start
+            if run_mask & suit_mask != run_mask:
+                break
+            result.append(run_mask)
+    return tuple(result)
+
+
+def _get_meld_masks(hand_mask: int) -> List[int]:
+    # the run_melds by suit_id, then the set_melds by rank_id, each 4 card set before its 3 card sets
+    result = []
+    suit_masks = [(hand_mask >> (13 * suit_id)) & 0x1fff for suit_id in range(4)]
+    for suit_id, suit_mask in enumerate(suit_masks):
+        if suit_mask:
+            result.extend(run_mask << (13 * suit_id) for run_mask in _get_run_meld_masks_for_suit(suit_mask))
+    s, h, d, c = suit_masks
+    set_ranks_mask = (s & h & (d | c)) | ((s | h) & d & c)  # ranks with at least 3 cards
+    while set_ranks_mask:
+        low_bit = set_ranks_mask & -set_ranks_mask
+        set_ranks_mask ^= low_bit
+        rank_id = low_bit.bit_length() - 1
+        set_mask = hand_mask & (_rank_mask << rank_id)
+        result.append(set_mask)
+        if set_mask == _rank_mask << rank_id:
+            result.extend(set_mask & ~(1 << (rank_id + 13 * suit_id)) for suit_id in range(4))
+    return result
+
+
 def get_meld_clusters(hand: List[Card]) -> List[List[List[Card]]]:
     result = []  # type: List[List[List[Card]]]
     all_run_melds = [frozenset(x) for x in get_all_run_melds(hand)]
@@ -53,17 +93,54 @@ def get_meld_clusters(hand: List[Card]) -> List[List[List[Card]]]:
 def get_best_meld_clusters(hand: List[Card]) -> List[List[List[Card]]]:
     if len(hand) != 10:
         raise GinRummyProgramError("Hand contain {} cards: should be 10 cards.".format(len(hand)))
-    result = []  # type: List[List[List[Card]]]
-    meld_clusters = get_meld_clusters(hand=hand)  # type: List[List[List[Card]]]
-    meld_clusters_count = len(meld_clusters)
-    if meld_clusters_count > 0:
-        deadwood_counts = [utils.get_deadwood_count(hand=hand, meld_cluster=meld_cluster)
-                           for meld_cluster in meld_clusters]
-        best_deadwood_count = min(deadwood_counts)
-        for i in range(meld_clusters_count):
-            if deadwood_counts[i] == best_deadwood_count:
-                result.append(meld_clusters[i])
-    return result
+    _, best_meld_cluster_masks = get_best_meld_cluster_masks(hand_mask=utils.get_cards_mask(hand))
+    return [[utils.get_cards_from_mask(meld_mask) for meld_mask in meld_cluster_masks]
+            for meld_cluster_masks in best_meld_cluster_masks]
+
+
+@functools.lru_cache(maxsize=4096)
+def get_meld_cluster_masks(hand_mask: int) -> Tuple[Tuple[int, ...], ...]:
+    ''' Return the meld clusters of the hand as meld_cluster_masks, with the run_melds before the set_melds.
+        The disjointness of the meld_piles is tested by AND of their masks.
+    '''
+    meld_masks = _get_meld_masks(hand_mask)
+    meld_masks_count = len(meld_masks)
+    result = []
+    for i in range(meld_masks_count):
+        first_meld_mask = meld_masks[i]
+        result.append((first_meld_mask,))
+        for j in range(i + 1, meld_masks_count):
+            second_meld_mask = meld_masks[j]
+            if second_meld_mask & first_meld_mask:
+                continue
+            result.append((first_meld_mask, second_meld_mask))
+            first_second_meld_mask = first_meld_mask | second_meld_mask
+            for k in range(j + 1, meld_masks_count):
+                third_meld_mask = meld_masks[k]
+                if third_meld_mask & first_second_meld_mask:
+                    continue
+                result.append((first_meld_mask, second_meld_mask, third_meld_mask))
+    return tuple(result)
+
+
+@functools.lru_cache(maxsize=65536)
+def get_best_meld_cluster_masks(hand_mask: int) -> Tuple[int, Tuple[Tuple[int, ...], ...]]:
+    ''' Return the least deadwood count of the hand and the meld_cluster_masks having it.
+        The deadwood count is that of the whole hand if it has no meld_cluster.
+    '''
+    best_deadwood_count = utils.get_mask_deadwood_count(hand_mask)
+    best_meld_cluster_masks = []
+    for meld_cluster_masks in get_meld_cluster_masks(hand_mask):
+        meld_mask = 0
+        for meld_pile_mask in meld_cluster_masks:
+            meld_mask |= meld_pile_mask
+        deadwood_count = utils.get_mask_deadwood_count(hand_mask & ~meld_mask)
+        if deadwood_count < best_deadwood_count:
+            best_deadwood_count = deadwood_count
+            best_meld_cluster_masks = [meld_cluster_masks]
+        elif deadwood_count == best_deadwood_count:
+            best_meld_cluster_masks.append(meld_cluster_masks)
+    return best_deadwood_count, tuple(best_meld_cluster_masks)
 
 
 def get_all_run_melds(hand: List[Card]) -> List[List[Card]]:
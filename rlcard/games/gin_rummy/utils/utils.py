@@ -34,6 +34,9 @@ def card_from_card_id(card_id: int) -> Card:
     return Card(rank=rank, suit=suit)
 
 
+_rank_ids = {rank: rank_id for rank_id, rank in enumerate(Card.valid_rank)}
+_suit_ids = {suit: suit_id for suit_id, suit in enumerate(Card.valid_suit)}
+
 # deck is always in order from AS, 2S, ..., AH, 2H, ..., AD, 2D, ..., AC, 2C, ... QC, KC
 _deck = [card_from_card_id(card_id) for card_id in range(52)]  # want this to be read-only
 
@@ -59,11 +62,11 @@ def get_card_id(card: Card) -> int:
 
 
 def get_rank_id(card: Card) -> int:
-    return Card.valid_rank.index(card.rank)
+    return _rank_ids[card.rank]
 
 
 def get_suit_id(card: Card) -> int:
-    return Card.valid_suit.index(card.suit)
+    return _suit_ids[card.suit]
 
 
 def get_deadwood_value(card: Card) -> int:
@@ -105,3 +108,37 @@ def encode_cards(cards: List[Card]) -> np.ndarray:
         card_id = get_card_id(card)
         plane[card_id] = 1
     return plane
+
+
+# a set of cards is also kept as a 52-bit mask with bit card_id set for each card,
+# so that the 13 bits of a suit are at 13 * suit_id
+_suit_deadwood_counts = [0] * (1 << 13)  # deadwood count of the cards of a suit by their 13-bit mask
+for _suit_mask in range(1, 1 << 13):
+    _low_rank_id = (_suit_mask & -_suit_mask).bit_length() - 1
+    _suit_deadwood_counts[_suit_mask] = _suit_deadwood_counts[_suit_mask & (_suit_mask - 1)] + min(_low_rank_id + 1, 10)
+
+
+def get_cards_mask(cards: Iterable[Card]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= 1 << get_card_id(card)
+    return mask
+
+
+def get_cards_from_mask(mask: int) -> List[Card]:
+    result = []  # type: List[Card]
+    while mask:
+        low_bit = mask & -mask
+        result.append(_deck[low_bit.bit_length() - 1])
+        mask ^= low_bit
+    return result
+
+
+def get_mask_deadwood_count(mask: int) -> int:
+    return _suit_deadwood_counts[mask & 0x1fff] + _suit_deadwood_counts[(mask >> 13) & 0x1fff] + \
+        _suit_deadwood_counts[(mask >> 26) & 0x1fff] + _suit_deadwood_counts[mask >> 39]
+
+
+def get_mask_max_deadwood_value(mask: int) -> int:
+    rank_mask = (mask | (mask >> 13) | (mask >> 26) | (mask >> 39)) & 0x1fff
+    return min(rank_mask.bit_length(), 10)
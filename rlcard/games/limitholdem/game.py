@@ -1,4 +1,3 @@
-from copy import deepcopy, copy
 import numpy as np
 
 from rlcard.games.limitholdem import Dealer
@@ -116,15 +115,11 @@ class LimitHoldemGame:
                 (int): next player id
         """
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            rn = copy(self.history_raise_nums)
-            self.history.append((r, b, r_c, d, p, ps, rn))
+            # First record what the action can change. The dealt cards are
+            # the public cards beyond the current ones
+            self.history.append((self.game_pointer, self.round_counter, len(self.public_cards),
+                                 self.history_raise_nums[self.round_counter],
+                                 self.round.get_undo_record(self.players)))
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -163,8 +158,12 @@ class LimitHoldemGame:
             (bool): True if the game steps back successfully
         """
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, \
-                self.players, self.history_raises_nums = self.history.pop()
+            self.game_pointer, self.round_counter, num_public_cards, raise_num, round_record = self.history.pop()
+            self.history_raise_nums[self.round_counter] = raise_num
+            self.round.undo(self.players, round_record)
+            # Put the dealt cards back on the deck
+            while len(self.public_cards) > num_public_cards:
+                self.dealer.deck.append(self.public_cards.pop())
             return True
         return False
 
@@ -92,6 +92,35 @@ class LimitHoldemRound:
 
         return self.game_pointer
 
+    def get_undo_record(self, players):
+        """
+        Record the part of the round and of the acting player that an action can change
+
+        Args:
+            players (list): The list of players that play the game
+
+        Returns:
+            (tuple): The record to pass to `undo`
+        """
+        player = players[self.game_pointer]
+        return (self.game_pointer, self.raise_amount, self.have_raised, self.not_raise_num, self.player_folded,
+                self.raised, self.raised[self.game_pointer], player.status, player.in_chips)
+
+    def undo(self, players, record):
+        """
+        Undo an action with the record taken by `get_undo_record` before it
+
+        Args:
+            players (list): The list of players that play the game
+            record (tuple): The record
+        """
+        (self.game_pointer, self.raise_amount, self.have_raised, self.not_raise_num, self.player_folded,
+         self.raised, raised, status, in_chips) = record
+        # A new round replaces the raised chips, so only the entry of the acting player changes in place
+        self.raised[self.game_pointer] = raised
+        players[self.game_pointer].status = status
+        players[self.game_pointer].in_chips = in_chips
+
     def get_legal_actions(self):
         """
         Obtain the legal actions for the current player
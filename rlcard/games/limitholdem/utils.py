@@ -1,3 +1,5 @@
+import itertools
+
 import numpy as np
 
 class Hand:
@@ -540,32 +542,9 @@ def compare_hands(hands):
     elif hands[1] == None:
         return [1, 0]
     '''
-    hand_category = [] #such as high_card, straight_flush, etc
     all_players = [0]*len(hands) #all the players in this round, 0 for losing and 1 for winning or draw
-    if None in hands:
-        fold_players = [i for i, j in enumerate(hands) if j is None]
-        if len(fold_players) == len(all_players) - 1:
-            for _ in enumerate(hands):
-                if _[0] in fold_players:
-                    all_players[_[0]] = 0
-                else:
-                    all_players[_[0]] = 1
-            return all_players
-        else:
-            for _ in enumerate(hands):
-                if hands[_[0]] is not None:
-                    hand = Hand(hands[_[0]])
-                    hand.evaluateHand()
-                    hand_category.append(hand.category)
-                elif hands[_[0]] is None:
-                    hand_category.append(0)
-    else:
-            for i in enumerate(hands):
-                hand = Hand(hands[i[0]])
-                hand.evaluateHand()
-                hand_category.append(hand.category)
-    potential_winner_index = [i for i, j in enumerate(hand_category) if j == max(hand_category)]# potential winner are those with same max card_catagory
-
+    potential_winner_index = [i for i, hand in enumerate(hands) if hand is not None]
+    # If every player folds except one, the hand of the alive player is not evaluated
     return final_compare(hands, potential_winner_index, all_players)
 
 def final_compare(hands, potential_winner_index, all_players):
@@ -590,25 +569,250 @@ def final_compare(hands, potential_winner_index, all_players):
     if len(potential_winner_index) == 1:
         all_players[potential_winner_index[0]] = 1
         return all_players
-    elif len(potential_winner_index) > 1:
-        # compare when having equal max categories
-        equal_hands = []
-        for _ in potential_winner_index:
-            hand = Hand(hands[_])
-            hand.evaluateHand()
-            equal_hands.append(hand)
-        hand = equal_hands[0]
-        if hand.category == 8:
-            return determine_winner_four_of_a_kind(equal_hands, all_players, potential_winner_index)
-        if hand.category == 7:
-            return determine_winner([2, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 4:
-            return determine_winner([2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 3:
-            return determine_winner([4, 2, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 2:
-            return determine_winner([4, 2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 1 or hand.category == 6:
-            return determine_winner([4, 3, 2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category in [5, 9]:
-            return determine_winner_straight(equal_hands, all_players, potential_winner_index)
+    strengths = [evaluate_hand(hands[i]) for i in potential_winner_index]
+    max_strength = max(strengths)
+    for i, strength in zip(potential_winner_index, strengths):
+        if strength == max_strength:
+            all_players[i] = 1
+    return all_players
+
+# The hand evaluator below maps any set of 5 to 7 cards to an integer
+# strength, where a greater strength is a better hand. The strength is
+# the category of the best five cards (1: high card, ..., 9: straight flush)
+# in the bits above 20, followed by up to five ranks that break the ties,
+# with 4 bits each. The strength of the non-flush hands only depends on
+# the number of cards of each rank, and is precomputed for all the rank
+# counts, indexed by the sum of count * 5 ** rank. The strength of the
+# flushes only depends on the ranks of the suited cards, and is precomputed
+# for all the 13-bit masks of ranks.
+
+RANK_LOOKUP = '23456789TJQKA'
+SUIT_LOOKUP = 'SCDH'
+_RANK_POWERS = [5 ** rank for rank in range(13)]
+_CARD_RANK_KEYS = np.array([5 ** (card // 4) for card in range(52)], dtype=np.int64)
+_CARD_SUIT_BITS = np.array([1 << (card // 4 + 16 * (card % 4)) for card in range(52)], dtype=np.int64)
+
+_PREFLOP_EQUITIES = {}
+_RANK_KEYS = None
+_RANK_STRENGTHS = None
+_RANK_TABLE = None
+_FLUSH_TABLE = None
+
+def card_to_index(card):
+    '''
+    Get the index of a card for the batch evaluation
+    Args:
+        card(str): a card, e.g. 'SA'
+    Returns:
+        (int): 4 * rank + suit, where the ranks are ordered as in '23456789TJQKA' and the suits as in 'SCDH'
+    '''
+    return 4 * RANK_LOOKUP.index(card[1]) + SUIT_LOOKUP.index(card[0])
+
+def evaluate_hand(cards):
+    '''
+    Evaluate the best five cards among some cards
+    Args:
+        cards(list): 5 to 7 cards, e.g. ['SA', 'HA', 'C9', 'D9', 'S2']
+    Returns:
+        (int): the strength of the hand, greater is better
+    '''
+    _build_tables()
+    rank_key = 0
+    suit_masks = {}
+    for card in cards:
+        rank = RANK_LOOKUP.index(card[1])
+        rank_key += _RANK_POWERS[rank]
+        suit_masks[card[0]] = suit_masks.get(card[0], 0) | (1 << rank)
+    strength = _RANK_TABLE[rank_key]
+    for suit, mask in suit_masks.items():
+        if suit in SUIT_LOOKUP:
+            strength = max(strength, _FLUSH_TABLE[mask])
+    return int(strength)
+
+def evaluate_hands(cards):
+    '''
+    Evaluate a batch of hands with NumPy
+    Args:
+        cards(numpy.array): (batch, 5 to 7) indices of distinct cards, see `card_to_index`
+    Returns:
+        (numpy.array): (batch,) the strengths of the hands, greater is better
+    '''
+    _build_tables()
+    cards = np.asarray(cards)
+    rank_keys = _CARD_RANK_KEYS[cards].sum(axis=-1)
+    strengths = _RANK_STRENGTHS[np.searchsorted(_RANK_KEYS, rank_keys)]
+    # The masks of the ranks of each suit are packed in 16-bit fields
+    suit_masks = _CARD_SUIT_BITS[cards].sum(axis=-1)
+    for suit in range(4):
+        np.maximum(strengths, _FLUSH_TABLE[(suit_masks >> (16 * suit)) & 0x1fff], out=strengths)
+    return strengths
+
+def estimate_equity(hand, public_cards=None, num_opponents=1, num_samples=1000, np_random=None):
+    '''
+    Estimate the equity of a hand against random hands by Monte Carlo. The public cards
+    and the hands of the opponents are completed at random, and all the samples are
+    evaluated as a batch. The equities before the flop are cached.
+    Args:
+        hand(list): the two hand cards, e.g. ['SA', 'HK'], as in the state of the game
+        public_cards(list): the known public cards, as in the state of the game
+        num_opponents(int): the number of opponents
+        num_samples(int): the number of sampled completions
+        np_random(numpy.random.RandomState): the random generator
+    Returns:
+        (numpy.array): the fractions of the samples that are won, tied and lost
+    '''
+    public_cards = public_cards or []
+    if np_random is None:
+        np_random = np.random
+    if len(public_cards) == 0:
+        ranks = sorted((RANK_LOOKUP.index(card[1]) for card in hand), reverse=True)
+        key = (tuple(ranks), hand[0][0] == hand[1][0], num_opponents, num_samples)
+        if key not in _PREFLOP_EQUITIES:
+            _PREFLOP_EQUITIES[key] = _sample_equity(hand, public_cards, num_opponents, num_samples, np_random)
+        return _PREFLOP_EQUITIES[key].copy()
+    return _sample_equity(hand, public_cards, num_opponents, num_samples, np_random)
+
+def _sample_equity(hand, public_cards, num_opponents, num_samples, np_random):
+    '''
+    Estimate the equity of a hand by Monte Carlo, see `estimate_equity`
+    '''
+    known = np.array([card_to_index(card) for card in hand + public_cards])
+    remaining = np.setdiff1d(np.arange(52), known)
+    num_public = 5 - len(public_cards)
+    num_drawn = num_public + 2 * num_opponents
+
+    # Draw the cards without replacement with a partial Fisher-Yates shuffle of each row
+    decks = np.tile(remaining, (num_samples, 1))
+    rows = np.arange(num_samples)
+    swaps = np_random.randint(np.arange(num_drawn), len(remaining), size=(num_samples, num_drawn))
+    for i in range(num_drawn):
+        swapped = decks[rows, swaps[:, i]]
+        decks[rows, swaps[:, i]] = decks[:, i]
+        decks[:, i] = swapped
+    drawn = decks[:, :num_drawn]
+
+    board = np.hstack([np.broadcast_to(known[2:], (num_samples, len(public_cards))), drawn[:, :num_public]])
+    hands = [np.broadcast_to(known[:2], (num_samples, 2))]
+    hands += [drawn[:, num_public+2*i:num_public+2*i+2] for i in range(num_opponents)]
+    strengths = evaluate_hands(np.concatenate([np.hstack([h, board]) for h in hands]))
+    strengths = strengths.reshape(num_opponents + 1, num_samples)
+    best_opponent = strengths[1:].max(axis=0)
+    wins = np.count_nonzero(strengths[0] > best_opponent)
+    ties = np.count_nonzero(strengths[0] == best_opponent)
+    return np.array([wins, ties, num_samples - wins - ties]) / num_samples
+
+def hand_category(strength):
+    '''
+    Get the category of a hand from its strength
+    Args:
+        strength(int): the strength of the hand
+    Returns:
+        (int): 1: high card, 2: one pair, 3: two pairs, 4: three of a kind, 5: straight,
+               6: flush, 7: full house, 8: four of a kind, 9: straight flush
+    '''
+    return strength >> 20
+
+def _encode_strengths(categories, ranks):
+    '''
+    Encode the categories and the ranks that break the ties as strengths
+    Args:
+        categories(numpy.array): (batch,) the categories
+        ranks(numpy.array): (batch, 5) the ranks that break the ties, padded with zeros
+    Returns:
+        (numpy.array): (batch,) the strengths
+    '''
+    strengths = categories.astype(np.int64)
+    for i in range(5):
+        strengths = (strengths << 4) | ranks[:, i]
+    return strengths
+
+def _straight_highs(masks):
+    '''
+    Get the highest rank of the best straight in 13-bit masks of ranks, or -1
+    '''
+    highs = np.full(len(masks), -1)
+    # A, 2, 3, 4, 5
+    highs[masks & 0b1000000001111 == 0b1000000001111] = 3
+    for high in range(4, 13):
+        highs[(masks >> (high - 4)) & 0b11111 == 0b11111] = high
+    return highs
+
+def _rank_strengths(counts):
+    '''
+    Evaluate the best five cards without flushes from the number of cards of each rank
+    Args:
+        counts(numpy.array): (batch, 13) the number of cards of each rank
+    Returns:
+        (numpy.array): (batch,) the strengths
+    '''
+    rank_ids = np.arange(13)
+    present = counts > 0
+    # Order the ranks by count and then by rank, so that the groups come first
+    # and the single cards are in descending order
+    ranks = np.argsort(-(counts * 16 + rank_ids), axis=1)
+    group_counts = np.take_along_axis(counts, ranks, axis=1)
+    masks = (present << rank_ids).sum(axis=1)
+    straight_highs = _straight_highs(masks)
+    # The highest rank that is not in the first group, or the first two groups
+    kickers = [np.where(present & (rank_ids != ranks[:, :1]), rank_ids, 0).max(axis=1),
+               np.where(present & (rank_ids != ranks[:, :1]) & (rank_ids != ranks[:, 1:2]), rank_ids, 0).max(axis=1)]
+    zeros = np.zeros((len(counts), 1), dtype=ranks.dtype)
+
+    conditions = [
+        group_counts[:, 0] == 4,
+        (group_counts[:, 0] == 3) & (group_counts[:, 1] >= 2),
+        straight_highs >= 0,
+        group_counts[:, 0] == 3,
+        (group_counts[:, 0] == 2) & (group_counts[:, 1] == 2),
+        group_counts[:, 0] == 2,
+    ]
+    categories = np.select(conditions, [8, 7, 5, 4, 3, 2], default=1)
+    tie_ranks = [
+        np.hstack([ranks[:, :1], kickers[0][:, None], zeros, zeros, zeros]),
+        np.hstack([ranks[:, :2], zeros, zeros, zeros]),
+        np.hstack([straight_highs[:, None], zeros, zeros, zeros, zeros]),
+        np.hstack([ranks[:, :3], zeros, zeros]),
+        np.hstack([ranks[:, :2], kickers[1][:, None], zeros, zeros]),
+        np.hstack([ranks[:, :4], zeros]),
+    ]
+    tie_ranks = np.select([c[:, None] for c in conditions], tie_ranks, default=ranks[:, :5])
+    return _encode_strengths(categories, tie_ranks)
+
+def _build_tables():
+    '''
+    Precompute the strengths of all the rank counts and of all the flushes
+    '''
+    global _RANK_KEYS, _RANK_STRENGTHS, _RANK_TABLE, _FLUSH_TABLE
+    if _FLUSH_TABLE is not None:
+        return
+
+    # All the rank counts of 5 to 7 cards with at most 4 cards of each rank
+    all_counts = []
+    for num_cards in range(5, 8):
+        combinations = np.array(list(itertools.combinations_with_replacement(range(13), num_cards)))
+        counts = np.zeros((len(combinations), 13), dtype=np.int64)
+        np.add.at(counts, (np.arange(len(combinations))[:, None], combinations), 1)
+        all_counts.append(counts[counts.max(axis=1) <= 4])
+    counts = np.concatenate(all_counts)
+    keys = (counts * 5 ** np.arange(13)).sum(axis=1)
+    order = np.argsort(keys)
+    rank_keys = keys[order]
+    rank_strengths = _rank_strengths(counts[order])
+
+    # The flushes of all the masks with at least 5 ranks
+    masks = np.arange(1 << 13)
+    bits = (masks[:, None] >> np.arange(13)) & 1
+    top_ranks = np.sort(np.where(bits, np.arange(13), -1), axis=1)[:, ::-1][:, :5]
+    straight_highs = _straight_highs(masks)
+    zeros = np.zeros((len(masks), 4), dtype=np.int64)
+    flush_table = np.where(
+        straight_highs >= 0,
+        _encode_strengths(np.full(len(masks), 9), np.hstack([straight_highs[:, None], zeros])),
+        _encode_strengths(np.full(len(masks), 6), np.maximum(top_ranks, 0)),
+    )
+    flush_table[bits.sum(axis=1) < 5] = 0
+
+    _RANK_KEYS = rank_keys
+    _RANK_STRENGTHS = rank_strengths
+    _RANK_TABLE = dict(zip(rank_keys.tolist(), rank_strengths.tolist()))
+    _FLUSH_TABLE = flush_table
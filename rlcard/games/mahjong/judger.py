@@ -4,6 +4,8 @@
 from collections import defaultdict
 import numpy as np
 
+from rlcard.games.mahjong.utils import cards2counts, count_sets_with_pair
+
 class MahjongJudger:
     ''' Determine what cards a player can play
     '''
@@ -120,96 +122,13 @@ class MahjongJudger:
             Result (bool): Win or not
             Maximum_score (int): Set count score of the player
         '''
-        set_count = 0
-        hand = [card.get_str() for card in player.hand]
-        count_dict = {card: hand.count(card) for card in hand}
         set_count = len(player.pile)
         if set_count >= 4:
             return True, set_count
-        used = []
-        maximum = 0
-        for each in count_dict:
-            if each in used:
-                continue
-            tmp_set_count = 0
-            tmp_hand = hand.copy()
-            if count_dict[each] == 2:
-                for _ in range(count_dict[each]):
-                    tmp_hand.pop(tmp_hand.index(each))
-                tmp_set_count, _set = self.cal_set(tmp_hand)
-                used.extend(_set)
-                if tmp_set_count + set_count > maximum:
-                    maximum = tmp_set_count + set_count
-                if tmp_set_count + set_count >= 4:
-                    #print(player.get_player_id(), sorted([card.get_str() for card in player.hand]))
-                    #print([[c.get_str() for c in s] for s in player.pile])
-                    #print(len(player.hand), sum([len(s) for s in player.pile]))
-                    #exit()
-                    return True, maximum
-        return False, maximum
-
-    @staticmethod
-    def check_consecutive(_list):
-        ''' Check if list is consecutive
-        Args:
-            _list (list): The target list
-
-        Return:
-            Result (bool): consecutive or not
-        '''
-        l = list(map(int, _list))
-        if sorted(l) == list(range(min(l), max(l)+1)):
-            return True
-        return False
-
-    def cal_set(self, cards):
-        ''' Calculate the set for given cards
-        Args:
-            Cards (list): List of cards.
-
-        Return:
-            Set_count (int):
-            Sets (list): List of cards that has been pop from user's hand
-        '''
-        tmp_cards = cards.copy()
-        sets = []
-        set_count = 0
-        _dict = {card: tmp_cards.count(card) for card in tmp_cards}
-        # check pong/gang
-        for each in _dict:
-            if _dict[each] == 3 or _dict[each] == 4:
-                set_count += 1
-                for _ in range(_dict[each]):
-                    tmp_cards.pop(tmp_cards.index(each))
-
-        # get all of the traits of each type in hand (except dragons and winds)
-        _dict_by_type = defaultdict(list)
-        for card in tmp_cards:
-            _type = card.split("-")[0]
-            _trait = card.split("-")[1]
-            if _type == 'dragons' or _type == 'winds':
-                continue
-            else:
-                _dict_by_type[_type].append(_trait)
-        for _type in _dict_by_type.keys():
-            values = sorted(_dict_by_type[_type])
-            if len(values) > 2:
-                for index, _ in enumerate(values):
-                    if index == 0:
-                        test_case = [values[index], values[index+1], values[index+2]]
-                    elif index == len(values)-1:
-                        test_case = [values[index-2], values[index-1], values[index]]
-                    else:
-                        test_case = [values[index-1], values[index], values[index+1]]
-                    if self.check_consecutive(test_case):
-                        set_count += 1
-                        for each in test_case:
-                            values.pop(values.index(each))
-                            c = _type+"-"+str(each)
-                            sets.append(c)
-                            if c in tmp_cards:
-                                tmp_cards.pop(tmp_cards.index(c))
-        return set_count, sets
+        sets = count_sets_with_pair(cards2counts(player.hand))
+        if sets is None:
+            return False, 0
+        return set_count + sets >= 4, set_count + sets
 
 #if __name__ == "__main__":
 #    judger = MahjongJudger()
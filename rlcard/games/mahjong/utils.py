@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 from rlcard.games.mahjong.card import MahjongCard as Card
 
@@ -73,3 +75,85 @@ def encode_cards(cards):
         num = cards.count(card)
         plane[index][:num] = 1
     return plane
+
+_TILE_INDEX = {tuple(card.split('-')): index for card, index in card_encoding_dict.items() if '-' in card}
+
+def cards2counts(cards):
+    ''' Count the cards of each of the 34 tiles, in the order of card_encoding_dict
+
+    Args:
+        cards (list): List of cards
+
+    Returns:
+        (list): The 34 counts, where each suit is 9 consecutive counts
+    '''
+    counts = [0] * 34
+    for card in cards:
+        counts[_TILE_INDEX[(card.type, card.trait)]] += 1
+    return counts
+
+def _suit_key(counts, start):
+    ''' Pack the 9 counts of a suit into the octal digits of an integer '''
+    key = 0
+    for count in reversed(counts[start:start+9]):
+        key = (key << 3) | count
+    return key
+
+@lru_cache(maxsize=None)
+def _count_suit_sets(key):
+    ''' The maximum number of sets (pongs, gongs and chows) in a suit, given
+    its counts as octal digits. Every set with the lowest tile is either a pong
+    or a chow starting from it, or the tile is left out, so the decompositions
+    are searched from the lowest tile. The results are memoized on the key.
+    '''
+    if key == 0:
+        return 0
+    shift = ((key & -key).bit_length() - 1) // 3 * 3
+    count = (key >> shift) & 7
+    maximum = _count_suit_sets(key & ~(7 << shift))
+    if count >= 3:
+        maximum = max(maximum, 1 + _count_suit_sets(key - (3 << shift)))
+    if shift <= 18 and (key >> (shift + 3)) & 7 and (key >> (shift + 6)) & 7:
+        maximum = max(maximum, 1 + _count_suit_sets(key - (0o111 << shift)))
+    return maximum
+
+def count_sets(counts):
+    ''' Calculate the maximum number of sets in the cards, where the tiles
+    that are not in a set are left out. Dragons and winds only form pongs and
+    gongs.
+
+    Args:
+        counts (list): The 34 counts, see cards2counts
+
+    Returns:
+        (int): The number of sets
+    '''
+    return (sum(_count_suit_sets(_suit_key(counts, start)) for start in (0, 9, 18))
+            + sum(count // 3 for count in counts[27:34]))
+
+def count_sets_with_pair(counts):
+    ''' Calculate the maximum number of sets in the cards when a pair is
+    left out. Only the suit of the pair is searched again for each pair.
+
+    Args:
+        counts (list): The 34 counts, see cards2counts
+
+    Returns:
+        (int): The number of sets, or None if there is no pair
+    '''
+    keys = [_suit_key(counts, start) for start in (0, 9, 18)]
+    suit_sets = [_count_suit_sets(key) for key in keys]
+    total = sum(suit_sets) + sum(count // 3 for count in counts[27:34])
+    maximum = None
+    for tile, count in enumerate(counts):
+        if count < 2:
+            continue
+        if tile < 27:
+            suit = tile // 9
+            key = keys[suit] - (2 << (3 * (tile % 9)))
+            sets = total - suit_sets[suit] + _count_suit_sets(key)
+        else:
+            sets = total - count // 3 + (count - 2) // 3
+        if maximum is None or sets > maximum:
+            maximum = sets
+    return maximum
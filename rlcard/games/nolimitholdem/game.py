@@ -1,7 +1,6 @@
 from enum import Enum
 
 import numpy as np
-from copy import deepcopy
 from rlcard.games.limitholdem import Game
 from rlcard.games.limitholdem import PlayerStatus
 
@@ -133,14 +132,10 @@ class NolimitholdemGame(Game):
             raise Exception('Action not allowed')
 
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            self.history.append((r, b, r_c, d, p, ps))
+            # First record what the action can change. The dealt cards are
+            # the public cards beyond the current ones
+            self.history.append((self.game_pointer, self.round_counter, self.stage, len(self.public_cards),
+                                 self.dealer.pot, self.round.get_undo_record(self.players)))
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -216,8 +211,12 @@ class NolimitholdemGame(Game):
             (bool): True if the game steps back successfully
         """
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, self.players = self.history.pop()
-            self.stage = Stage(self.round_counter)
+            self.game_pointer, self.round_counter, self.stage, num_public_cards, \
+                self.dealer.pot, round_record = self.history.pop()
+            self.round.undo(self.players, round_record)
+            # Put the dealt cards back on the deck
+            while len(self.public_cards) > num_public_cards:
+                self.dealer.deck.append(self.public_cards.pop())
             return True
         return False
 
@@ -123,6 +123,37 @@ class NolimitholdemRound:
 
         return self.game_pointer
 
+    def get_undo_record(self, players):
+        """
+        Record the part of the round and of the acting player that an action can change
+
+        Args:
+            players (list): The list of players that play the game
+
+        Returns:
+            (tuple): The record to pass to `undo`
+        """
+        player = players[self.game_pointer]
+        return (self.game_pointer, self.not_raise_num, self.not_playing_num, self.raised,
+                self.raised[self.game_pointer], player.status, player.in_chips, player.remained_chips)
+
+    def undo(self, players, record):
+        """
+        Undo an action with the record taken by `get_undo_record` before it
+
+        Args:
+            players (list): The list of players that play the game
+            record (tuple): The record
+        """
+        (self.game_pointer, self.not_raise_num, self.not_playing_num, self.raised,
+         raised, status, in_chips, remained_chips) = record
+        # A new round replaces the raised chips, so only the entry of the acting player changes in place
+        self.raised[self.game_pointer] = raised
+        player = players[self.game_pointer]
+        player.status = status
+        player.in_chips = in_chips
+        player.remained_chips = remained_chips
+
     def get_nolimit_legal_actions(self, players):
         """
         Obtain the legal actions for the current player
@@ -25,6 +25,8 @@ class SkatGame:
         '''
         ## Value provided by the environment during training
         self.allow_step_back: bool = allow_step_back
+        ## Value provided by the environment, True if the state is built by the environment when it is read
+        self.lazy_state: bool = False
         self.np_random = np.random.default_rng()
         ## Judger for determining round payoffs, legal actions, and if a game has won
         self.judger: SkatJudger = SkatJudger(game=self)
@@ -72,6 +74,8 @@ class SkatGame:
             self.round.play_card(action=action)
         self.actions.append(action)
         next_player_id = self.round.current_player_id
+        if self.lazy_state:
+            return None, next_player_id
         next_state = self.get_state()
         return next_state, next_player_id
     
@@ -126,6 +126,24 @@ class UnoGame:
 
         return self.round.get_legal_actions(self.players, self.round.current_player)
 
+    def get_legal_action_ids(self):
+        ''' Return the ids of the legal actions for current player
+
+        Returns:
+            (list): A sorted list of legal action ids
+        '''
+        return self.round.get_legal_action_ids(self.players, self.round.current_player)
+
+    def get_legal_action_mask(self):
+        ''' Return the mask of the legal actions for current player
+
+        Returns:
+            (numpy.array): A boolean array over the 61 actions
+        '''
+        mask = np.zeros(self.get_num_actions(), dtype=bool)
+        mask[self.get_legal_action_ids()] = True
+        return mask
+
     def get_num_players(self):
         ''' Return the number of players in Limit Texas Hold'em
 
@@ -1,3 +1,5 @@
+from rlcard.games.uno.utils import ACTION_SPACE, NUM_CARD_IDS
+
 
 class UnoPlayer:
 
@@ -10,6 +12,7 @@ class UnoPlayer:
         self.np_random = np_random
         self.player_id = player_id
         self.hand = []
+        self.hand_counts = [0] * NUM_CARD_IDS
         self.stack = []
 
     def get_player_id(self):
@@ -17,3 +20,25 @@ class UnoPlayer:
         '''
 
         return self.player_id
+
+    def add_card(self, card):
+        ''' Add a card to the hand of the player
+
+        Args:
+            card (object): object of UnoCard
+        '''
+        self.hand.append(card)
+        self.hand_counts[ACTION_SPACE[card.str]] += 1
+
+    def remove_card(self, index):
+        ''' Remove a card from the hand of the player
+
+        Args:
+            index (int): The index of the card in the hand
+
+        Returns:
+            (object): The object of UnoCard removed
+        '''
+        card = self.hand.pop(index)
+        self.hand_counts[ACTION_SPACE[card.str]] -= 1
+        return card
@@ -1,5 +1,6 @@
 from rlcard.games.uno.card import UnoCard
-from rlcard.games.uno.utils import cards2list, WILD, WILD_DRAW_4
+from rlcard.games.uno.utils import cards2list, get_legal_action_ids
+from rlcard.games.uno.utils import ACTION_LIST, COLOR_MAP, TRAIT_MAP
 
 
 class UnoRound:
@@ -77,7 +78,7 @@ class UnoRound:
                 if color == card.color and trait == card.trait:
                     remove_index = index
                     break
-        card = player.hand.pop(remove_index)
+        card = player.remove_card(remove_index)
         if not player.hand:
             self.is_over = True
             self.winner = [self.current_player]
@@ -93,45 +94,21 @@ class UnoRound:
             self._preform_non_number_action(players, card)
 
     def get_legal_actions(self, players, player_id):
-        wild_flag = 0
-        wild_draw_4_flag = 0
-        legal_actions = []
-        wild_4_actions = []
-        hand = players[player_id].hand
-        target = self.target
-        if target.type == 'wild':
-            for card in hand:
-                if card.type == 'wild':
-                    if card.trait == 'wild_draw_4':
-                        if wild_draw_4_flag == 0:
-                            wild_draw_4_flag = 1
-                            wild_4_actions.extend(WILD_DRAW_4)
-                    else:
-                        if wild_flag == 0:
-                            wild_flag = 1
-                            legal_actions.extend(WILD)
-                elif card.color == target.color:
-                    legal_actions.append(card.str)
-
-        # target is aciton card or number card
-        else:
-            for card in hand:
-                if card.type == 'wild':
-                    if card.trait == 'wild_draw_4':
-                        if wild_draw_4_flag == 0:
-                            wild_draw_4_flag = 1
-                            wild_4_actions.extend(WILD_DRAW_4)
-                    else:
-                        if wild_flag == 0:
-                            wild_flag = 1
-                            legal_actions.extend(WILD)
-                elif card.color == target.color or card.trait == target.trait:
-                    legal_actions.append(card.str)
-        if not legal_actions:
-            legal_actions = wild_4_actions
-        if not legal_actions:
-            legal_actions = ['draw']
-        return legal_actions
+        return [ACTION_LIST[action_id] for action_id in self.get_legal_action_ids(players, player_id)]
+
+    def get_legal_action_ids(self, players, player_id):
+        ''' Get the ids of the legal actions of a player from the count vector of the hand
+
+        Args:
+            players (list): The list of UnoPlayer
+            player_id (int): The id of the player
+
+        Returns:
+            (list): sorted ids of the legal actions
+        '''
+        # the color of a wild target is chosen after its string is made
+        target_id = COLOR_MAP[self.target.color] * 15 + TRAIT_MAP[self.target.trait]
+        return get_legal_action_ids(players[player_id].hand_counts, target_id)
 
     def get_state(self, players, player_id):
         ''' Get player's state
@@ -187,7 +164,7 @@ class UnoRound:
 
         # draw a card with the diffrent color of target
         else:
-            players[self.current_player].hand.append(card)
+            players[self.current_player].add_card(card)
             self.current_player = (self.current_player + self.direction) % self.num_players
 
     def _preform_non_number_action(self, players, card):
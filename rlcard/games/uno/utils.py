@@ -27,6 +27,33 @@ WILD = ['r-wild', 'g-wild', 'b-wild', 'y-wild']
 
 WILD_DRAW_4 = ['r-wild_draw_4', 'g-wild_draw_4', 'b-wild_draw_4', 'y-wild_draw_4']
 
+# A hand is also kept as a count vector of its cards indexed by the ids of
+# the actions playing them, i.e. color index * 15 + trait index
+NUM_CARD_IDS = 60
+WILD_IDS = [ACTION_SPACE[action] for action in WILD]
+WILD_DRAW_4_IDS = [ACTION_SPACE[action] for action in WILD_DRAW_4]
+DRAW_ID = ACTION_SPACE['draw']
+_WILD_COUNTS = slice(WILD_IDS[0], NUM_CARD_IDS, 15)
+_WILD_DRAW_4_COUNTS = slice(WILD_DRAW_4_IDS[0], NUM_CARD_IDS, 15)
+
+
+def _init_playable_cards():
+    ''' Generate the table from the id of the target card to the mask of the
+    non-wild cards that can be played on it
+    '''
+    playable = np.zeros((NUM_CARD_IDS, NUM_CARD_IDS), dtype=bool)
+    for target_color in range(4):
+        for target_trait in range(15):
+            target_playable = playable[target_color * 15 + target_trait].reshape(4, 15)
+            target_playable[target_color, :13] = True
+            if target_trait < 13:
+                target_playable[:, target_trait] = True
+    playable.flags.writeable = False
+    return playable
+
+PLAYABLE_CARDS = _init_playable_cards()
+PLAYABLE_CARD_IDS = [tuple(np.flatnonzero(playable).tolist()) for playable in PLAYABLE_CARDS]
+
 
 def init_deck():
     ''' Generate uno deck of 108 cards
@@ -66,6 +93,48 @@ def cards2list(cards):
         cards_list.append(card.get_str())
     return cards_list
 
+def get_legal_action_ids(hand_counts, target_id):
+    ''' Get the ids of the legal actions of a hand
+
+    Args:
+        hand_counts (list): count vector of the hand
+        target_id (int): the id of the target card
+
+    Returns:
+        (list): sorted ids of the legal actions
+    '''
+    legal_ids = [card_id for card_id in PLAYABLE_CARD_IDS[target_id] if hand_counts[card_id]]
+    if any(hand_counts[_WILD_COUNTS]):
+        legal_ids.extend(WILD_IDS)
+        legal_ids.sort()
+    # wild draw 4 can only be played without any other playable card
+    if not legal_ids:
+        if any(hand_counts[_WILD_DRAW_4_COUNTS]):
+            legal_ids = list(WILD_DRAW_4_IDS)
+        else:
+            legal_ids = [DRAW_ID]
+    return legal_ids
+
+def get_legal_action_mask(hand_counts, target_id):
+    ''' Get the mask of the legal actions of hands over the action space
+
+    Args:
+        hand_counts (array): (..., 60) count vectors of the hands
+        target_id (int or array): the id of the target card of each hand
+
+    Returns:
+        (array): (..., 61) boolean numpy array of the legal actions
+    '''
+    held = np.asarray(hand_counts) > 0
+    mask = np.zeros(held.shape[:-1] + (NUM_CARD_IDS + 1,), dtype=bool)
+    card_mask = mask[..., :NUM_CARD_IDS]
+    np.logical_and(PLAYABLE_CARDS[target_id], held, out=card_mask)
+    mask[..., _WILD_COUNTS] = held[..., _WILD_COUNTS].any(axis=-1, keepdims=True)
+    no_action = ~card_mask.any(axis=-1, keepdims=True)
+    mask[..., _WILD_DRAW_4_COUNTS] = held[..., _WILD_DRAW_4_COUNTS].any(axis=-1, keepdims=True) & no_action
+    mask[..., DRAW_ID] = ~card_mask.any(axis=-1)
+    return mask
+
 def hand2dict(hand):
     ''' Get the corresponding dict representation of hand
 
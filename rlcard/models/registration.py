@@ -11,8 +11,15 @@ class ModelSpec(object):
             entry_point (string): a string that indicates the location of the model class
         '''
         self.model_id = model_id
-        mod_name, class_name = entry_point.split(':')
-        self._entry_point = getattr(importlib.import_module(mod_name), class_name)
+        self._mod_name, self._class_name = entry_point.split(':')
+        self._entry_point = None
+
+    def _load_entry_point(self):
+        ''' Import the model class on first use, so that registering does not import every model
+        '''
+        if self._entry_point is None:
+            self._entry_point = getattr(importlib.import_module(self._mod_name), self._class_name)
+        return self._entry_point
 
     def load(self):
         ''' Instantiates an instance of the model
@@ -20,7 +27,7 @@ class ModelSpec(object):
         Returns:
             Model (Model): an instance of the Model
         '''
-        model = self._entry_point()
+        model = self._load_entry_point()()
         return model
 
 
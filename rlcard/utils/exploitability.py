@@ -0,0 +1,108 @@
+''' Exact best-response and exploitability evaluation of agents
+
+The agent is queried once per observation, and the best responses are
+computed by single passes over the public tree of the game with range
+vectors, so the result is deterministic. Only two-player Leduc Hold'em is
+supported. The public tree of Limit Texas Hold'em is small, but its range
+vectors over all the hands and boards are far too large to evaluate exactly.
+'''
+import numpy as np
+
+from rlcard.agents.leduc_cfr_solver import LeducPublicTree, RANKS
+
+def get_action_probs(agent, state):
+    ''' Get the action probabilities of an agent in a state. The probabilities
+    are read from `info['probs']` returned by `eval_step`, e.g., for `CFRAgent`
+    and `NFSPAgent`. Agents that do not return probabilities, e.g., `DQNAgent`
+    and rule agents, are assumed to be deterministic.
+
+    Args:
+        agent (object): The agent
+        state (dict): The state, as given to `eval_step`
+
+    Returns:
+        (numpy.array): The probabilities of the legal actions, in the order of `state['raw_legal_actions']`
+    '''
+    action, info = agent.eval_step(state)
+    raw_legal_actions = state['raw_legal_actions']
+    if isinstance(info, dict) and 'probs' in info:
+        probs = np.array([info['probs'].get(a, 0) for a in raw_legal_actions], dtype=np.float64)
+    else:
+        if not agent.use_raw:
+            action = raw_legal_actions[list(state['legal_actions'].keys()).index(action)]
+        probs = np.array([a == action for a in raw_legal_actions], dtype=np.float64)
+    if probs.sum() > 0:
+        return probs / probs.sum()
+    return np.full(len(probs), 1.0 / len(probs))
+
+class BestResponse(object):
+    ''' Evaluate the best responses against an agent that plays both positions
+    of a two-player game. The policy of the agent is cached per observation.
+    '''
+
+    def __init__(self, env, agent):
+        ''' Initialize
+
+        Args:
+            env (Env): The environment, used to encode the states for the agent
+            agent (object): The evaluated agent
+        '''
+        if env.name != 'leduc-holdem' or env.num_players != 2:
+            raise ValueError('Exact best responses are only supported for two-player leduc-holdem')
+        self.env = env
+        self.agent = agent
+        self.tree = LeducPublicTree()
+        self._cache = {}
+        self._policies = {}
+
+    def policy(self, node):
+        ''' Get the action probabilities of the agent at a decision node
+
+        Args:
+            node (PublicNode): The decision node
+
+        Returns:
+            (numpy.array): (boards, ranks, actions) action probabilities
+        '''
+        if id(node) not in self._policies:
+            probs = np.zeros((node.num_boards, len(RANKS), len(node.actions)))
+            for b in range(node.num_boards):
+                for h in range(len(RANKS)):
+                    state = self.env._extract_state(self.tree.get_state(node, b, h))
+                    key = (state['obs'].tobytes(), tuple(node.actions))
+                    if key not in self._cache:
+                        self._cache[key] = get_action_probs(self.agent, state)
+                    probs[b, h] = self._cache[key]
+            self._policies[id(node)] = probs
+        return self._policies[id(node)]
+
+    def values(self):
+        ''' Compute the payoffs of the best responses in each position
+
+        Returns:
+            (numpy.array): The payoffs of a best response in the small blind
+              and in the big blind, in big blinds
+        '''
+        return np.array([self.tree.best_response_value(player_id, self.policy) for player_id in range(2)])
+
+    def exploitability(self):
+        ''' Compute the exploitability of the agent, i.e., the expected payoff
+        of a best response per game when the positions are random. It is zero
+        for a Nash equilibrium.
+
+        Returns:
+            (float): The exploitability, in big blinds per game
+        '''
+        return float(self.values().mean())
+
+def exploitability(env, agent):
+    ''' Compute the exploitability of an agent, see `BestResponse.exploitability`
+
+    Args:
+        env (Env): The environment
+        agent (object): The evaluated agent
+
+    Returns:
+        (float): The exploitability, in big blinds per game
+    '''
+    return BestResponse(env, agent).exploitability()
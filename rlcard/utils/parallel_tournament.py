@@ -0,0 +1,146 @@
+''' Evaluate agents over many games in a pool of worker processes
+
+The games are split into chunks of a fixed size. Each chunk is played in a new
+environment, with the environment and the global random generators seeded
+from the tournament seed and the index of the chunk through
+`seeding.hash_seed`. The workers thus draw disjoint seed streams, and the
+results only depend on the seed and the chunk size, not on the number of
+workers, so that they match a serial run with `num_workers=0`.
+'''
+import multiprocessing as mp
+import random
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+import rlcard
+from rlcard.utils import seeding
+from rlcard.utils.utils import load_model
+
+TournamentResult = namedtuple('TournamentResult', ['mean', 'var', 'count'])
+
+# The agents of a worker process, loaded once by `_init_worker`
+_worker_agents = None
+
+class ParallelTournament(object):
+    ''' A tournament whose games are played by a pool of worker processes,
+    started once and reused by every call to `run`.
+
+    With the fork start method, the models are loaded once in this process
+    and the workers share them copy-on-write, so that the weights of torch
+    models are not copied. Otherwise, every worker loads the models once.
+    '''
+
+    def __init__(self, env_id, models, config={}, num_workers=None, games_per_chunk=100, device=None, context=None):
+        ''' Initialize
+
+        Args:
+            env_id (string): The name of the registered environment
+            models (list): The agent of each seat, either an agent or a model path accepted by `load_model`
+            config (dict): The config of the environment. The seed is set for every chunk of games
+            num_workers (int): The number of worker processes, by default the number of CPUs.
+              With 0, the games are played in this process
+            games_per_chunk (int): The number of games played in each environment
+            device (torch.device): The device of the torch models
+            context (string): The multiprocessing start method, by default that of the platform
+        '''
+        self.env_id = env_id
+        self.config = dict(config)
+        self.num_players = len(models)
+        self.games_per_chunk = games_per_chunk
+        if num_workers is None:
+            num_workers = mp.cpu_count()
+        self.num_workers = num_workers
+
+        ctx = mp.get_context(context)
+        self._agents = None
+        if num_workers == 0 or ctx.get_start_method() == 'fork':
+            self._agents = _load_agents(env_id, self.config, models, device)
+            models = self._agents
+        self._pool = None
+        if num_workers > 0:
+            self._pool = ctx.Pool(num_workers, initializer=_init_worker,
+                                  initargs=(env_id, self.config, models, device))
+
+    def run(self, num_games, seed=0):
+        ''' Play a tournament
+
+        Args:
+            num_games (int): The number of games to play
+            seed (int): The seed of the tournament
+
+        Returns:
+            (TournamentResult): The mean and the variance of the payoffs of each seat,
+              and the number of games of each seat
+        '''
+        tasks = []
+        for index, start in enumerate(range(0, num_games, self.games_per_chunk)):
+            tasks.append((self.env_id, self.config, seed, index, min(self.games_per_chunk, num_games - start)))
+        if self._pool is None:
+            results = [_play_chunk(*task, agents=self._agents) for task in tasks]
+        else:
+            results = self._pool.starmap(_play_chunk, tasks)
+
+        payoffs = np.concatenate(results) if results else np.zeros((0, self.num_players))
+        return TournamentResult(payoffs.mean(axis=0), payoffs.var(axis=0),
+                                np.full(self.num_players, len(payoffs)))
+
+    def close(self):
+        ''' Stop the worker processes
+        '''
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def _load_agents(env_id, config, models, device):
+    ''' Load the models given as paths, and keep the given agents
+    '''
+    env = rlcard.make(env_id, config)
+    return [load_model(model, env, position, device) if isinstance(model, str) else model
+            for position, model in enumerate(models)]
+
+def _init_worker(env_id, config, models, device):
+    ''' Load the agents of a worker process
+    '''
+    global _worker_agents
+    _worker_agents = _load_agents(env_id, config, models, device)
+    if 'torch' in sys.modules:
+        # One thread per worker, as there is a worker per CPU
+        sys.modules['torch'].set_num_threads(1)
+
+def _play_chunk(env_id, config, seed, index, num_games, agents=None):
+    ''' Play a chunk of games in a new environment
+
+    Args:
+        env_id (string): The name of the registered environment
+        config (dict): The config of the environment
+        seed (int): The seed of the tournament
+        index (int): The index of the chunk
+        num_games (int): The number of games of the chunk
+        agents (list): The agents, by default those of the worker process
+
+    Returns:
+        (numpy.array): The (num_games, num_players) payoffs
+    '''
+    if agents is None:
+        agents = _worker_agents
+    chunk_seed = seeding.hash_seed((seed, index), max_bytes=4)
+    np.random.seed(chunk_seed)
+    random.seed(chunk_seed)
+    if 'torch' in sys.modules:
+        sys.modules['torch'].manual_seed(chunk_seed)
+
+    env = rlcard.make(env_id, dict(config, seed=chunk_seed))
+    env.set_agents(agents)
+    payoffs = np.zeros((num_games, env.num_players))
+    for i in range(num_games):
+        payoffs[i] = env.play()
+    return payoffs
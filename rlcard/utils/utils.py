@@ -1,15 +1,20 @@
+from collections import namedtuple
+
 import numpy as np
 
 from rlcard.games.base import Card
 
+Transitions = namedtuple('Transitions', ['state', 'action', 'reward', 'next_state', 'legal_actions', 'done'])
+
+def is_torch_available():
+    ''' Check whether torch is installed, without importing it
+    '''
+    import importlib.util
+    return importlib.util.find_spec('torch') is not None
+
 def set_seed(seed):
     if seed is not None:
-        import subprocess
-        import sys
-
-        reqs = subprocess.check_output([sys.executable, '-m', 'pip', 'freeze'])
-        installed_packages = [r.decode().split('==')[0] for r in reqs.split()]
-        if 'torch' in installed_packages:
+        if is_torch_available():
             import torch
             torch.backends.cudnn.deterministic = True
             torch.manual_seed(seed)
@@ -147,17 +152,141 @@ def print_card(cards):
     for line in lines:
         print ('   '.join(line))
 
+class Trajectory(object):
+    ''' The trajectory of a player, recorded by `Env.run` with `columnar=True`.
+    Instead of a list of state dicts and actions, the observations, actions
+    and legal actions are appended into arrays that grow by doubling. The
+    legal actions of all the states are concatenated, with the offsets of
+    each state, since there can be much fewer of them than actions.
+    '''
+
+    def __init__(self, num_actions, capacity=16):
+        ''' Initialize
+
+        Args:
+            num_actions (int): The number of actions of the environment
+            capacity (int): The initial number of states that fit in the arrays
+        '''
+        self.num_actions = num_actions
+        self.num_states = 0
+        self.num_actions_taken = 0
+        self.obs = None
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.legal_actions = np.zeros(4 * capacity, dtype=np.int64)
+        self.legal_offsets = np.zeros(capacity + 1, dtype=np.int64)
+
+    def add_state(self, state):
+        ''' Append the observation and the legal actions of a state
+
+        Args:
+            state (dict): The state extracted by the environment
+        '''
+        obs = np.asarray(state['obs'])
+        if self.obs is None:
+            self.obs = np.zeros((len(self.actions),) + obs.shape, dtype=obs.dtype)
+        elif self.num_states == len(self.obs):
+            self.obs = _grow(self.obs, 2 * len(self.obs))
+            self.legal_offsets = _grow(self.legal_offsets, len(self.obs) + 1)
+        self.obs[self.num_states] = obs
+
+        legal_actions = list(state['legal_actions'])
+        start = self.legal_offsets[self.num_states]
+        stop = start + len(legal_actions)
+        if stop > len(self.legal_actions):
+            self.legal_actions = _grow(self.legal_actions, max(2 * len(self.legal_actions), stop))
+        self.legal_actions[start:stop] = legal_actions
+        self.num_states += 1
+        self.legal_offsets[self.num_states] = stop
+
+    def add_action(self, action):
+        ''' Append the action taken in the last state. Raw actions are kept
+        in an object array
+
+        Args:
+            action (int): The action id, or the raw action
+        '''
+        if self.num_actions_taken == len(self.actions):
+            self.actions = _grow(self.actions, 2 * len(self.actions))
+        if self.actions.dtype != object and not isinstance(action, (int, np.integer)):
+            self.actions = self.actions.astype(object)
+        self.actions[self.num_actions_taken] = action
+        self.num_actions_taken += 1
+
+    def finish(self):
+        ''' Trim the arrays to the recorded length, so that the stored
+        trajectory takes no spare memory
+        '''
+        if self.obs is not None:
+            self.obs = self.obs[:self.num_states].copy()
+        self.actions = self.actions[:self.num_actions_taken].copy()
+        self.legal_offsets = self.legal_offsets[:self.num_states + 1].copy()
+        self.legal_actions = self.legal_actions[:self.legal_offsets[-1]].copy()
+
+    def legal_mask(self, start, stop):
+        ''' Get the boolean masks of the legal actions of some states
+
+        Args:
+            start (int): The index of the first state
+            stop (int): The index after the last state
+
+        Returns:
+            (numpy.array): A (stop - start, num_actions) boolean array
+        '''
+        mask = np.zeros((stop - start, self.num_actions), dtype=bool)
+        if stop == start:
+            return mask
+        offsets = self.legal_offsets[start:stop + 1]
+        rows = np.repeat(np.arange(stop - start), np.diff(offsets))
+        mask[rows, self.legal_actions[offsets[0]:offsets[-1]]] = True
+        return mask
+
+    def to_transitions(self, payoff):
+        ''' Get the transitions of the trajectory, where only the last one is
+        rewarded with the payoff. The states and the next states are views of
+        the observations
+
+        Args:
+            payoff (float): The payoff of the player
+
+        Returns:
+            (Transitions): The arrays of the transitions, where `legal_actions`
+              holds the masks of the legal actions of the next states
+        '''
+        num_transitions = min(self.num_actions_taken, max(self.num_states - 1, 0))
+        reward = np.zeros(num_transitions)
+        done = np.zeros(num_transitions, dtype=bool)
+        if num_transitions > 0:
+            reward[-1] = payoff
+            done[-1] = True
+            state = self.obs[:num_transitions]
+            next_state = self.obs[1:num_transitions + 1]
+        else:
+            state = next_state = np.zeros((0,) + (self.obs.shape[1:] if self.obs is not None else ()))
+        return Transitions(state, self.actions[:num_transitions], reward, next_state,
+                           self.legal_mask(1, num_transitions + 1), done)
+
+def _grow(array, size):
+    ''' Copy an array into a larger one along the first axis
+    '''
+    new_array = np.zeros((size,) + array.shape[1:], dtype=array.dtype)
+    new_array[:len(array)] = array
+    return new_array
+
 def reorganize(trajectories, payoffs):
     ''' Reorganize the trajectory to make it RL friendly
 
     Args:
-        trajectory (list): A list of trajectories
+        trajectory (list): A list of trajectories, or of Trajectory objects recorded with `columnar=True`
         payoffs (list): A list of payoffs for the players. Each entry corresponds to one player
 
     Returns:
-        (list): A new trajectories that can be fed into RL algorithms.
+        (list): A new trajectories that can be fed into RL algorithms. For Trajectory
+          objects, the Transitions of each player, whose arrays can be fed in a batch
 
     '''
+    if len(trajectories) > 0 and isinstance(trajectories[0], Trajectory):
+        return [trajectory.to_transitions(payoff) for trajectory, payoff in zip(trajectories, payoffs)]
+
     num_players = len(trajectories)
     new_trajectories = [[] for _ in range(num_players)]
 
@@ -204,22 +333,41 @@ def tournament(env, num):
     Returns:
         A list of avrage payoffs for each player
     '''
-    payoffs = [0 for _ in range(env.num_players)]
-    counter = 0
-    while counter < num:
-        _, _payoffs = env.run(is_training=False)
-        if isinstance(_payoffs, list):
-            for _p in _payoffs:
-                for i, _ in enumerate(payoffs):
-                    payoffs[i] += _p[i]
-                counter += 1
-        else:
-            for i, _ in enumerate(payoffs):
-                payoffs[i] += _payoffs[i]
-            counter += 1
-    for i, _ in enumerate(payoffs):
-        payoffs[i] /= counter
-    return payoffs
+    payoffs = np.zeros((num, env.num_players))
+    for i in range(num):
+        payoffs[i] = env.play()
+    return payoffs.mean(axis=0).tolist()
+
+def load_model(model_path, env=None, position=None, device=None):
+    ''' Load the agent of a seat for evaluation
+
+    Args:
+        model_path (string): The path of a saved torch agent, the directory of a CFR model,
+          'random', or the name of a model in the model zoo
+        env (Env class): The environment, needed for CFR and random agents
+        position (int): The seat of the agent, needed for the model zoo
+        device (torch.device): The device of a torch agent
+
+    Returns:
+        The agent
+    '''
+    import os
+    if os.path.isfile(model_path):  # Torch model
+        import torch
+        agent = torch.load(model_path, map_location=device)
+        agent.set_device(device)
+    elif os.path.isdir(model_path):  # CFR model
+        from rlcard.agents import CFRAgent
+        agent = CFRAgent(env, model_path)
+        agent.load()
+    elif model_path == 'random':  # Random model
+        from rlcard.agents import RandomAgent
+        agent = RandomAgent(num_actions=env.num_actions)
+    else:  # A model in the model zoo
+        from rlcard import models
+        agent = models.load(model_path).agents[position]
+
+    return agent
 
 def plot_curve(csv_path, save_path, algorithm):
     ''' Read data from csv file and plot the results
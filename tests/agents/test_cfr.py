@@ -1,8 +1,9 @@
+import os
 import unittest
 import numpy as np
 
 import rlcard
-from rlcard.agents.cfr_agent import CFRAgent
+from rlcard.agents.cfr_agent import CFRAgent, InfoSetTable
 
 class TestNFSP(unittest.TestCase):
 
@@ -18,6 +19,87 @@ class TestNFSP(unittest.TestCase):
         action, _ = agent.eval_step(state)
 
         self.assertIn(action, [0, 2])
+        self.assertIn(agent.eval_action(state), [0, 2])
+
+    def test_train_monte_carlo(self):
+
+        for sampling in ['external', 'outcome']:
+            env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+            agent = CFRAgent(env, model_path='experiments/cfr_model', sampling=sampling)
+
+            for _ in range(100):
+                agent.train()
+
+            self.assertGreater(len(agent.table), 0)
+            self.assertTrue(np.all(agent.table.average_policy >= 0))
+            self.assertTrue(np.all(np.isfinite(agent.table.regrets)))
+
+            state, _ = env.reset()
+            action, _ = agent.eval_step(state)
+            self.assertIn(action, state['legal_actions'])
+
+        with self.assertRaises(ValueError):
+            CFRAgent(env, sampling='unknown')
+
+    def test_train_plus(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRAgent(env, model_path='experiments/cfr_model', plus=True)
+
+        for _ in range(20):
+            agent.train()
+
+        self.assertTrue(np.all(agent.table.regrets >= 0))
+        row_sums = np.add.reduceat(agent.table.policy, agent.table.offsets[:-1])
+        self.assertTrue(np.allclose(row_sums, 1))
+
+    def test_regret_matching(self):
+        table = InfoSetTable()
+        for i, legal_actions in enumerate([[0, 1], [1, 2, 3], [0]]):
+            table.add(InfoSetTable.hash_key(bytes([i])), legal_actions)
+        table.regrets[:] = [1., 3., -1., 0., -2., 5.]
+        table.reach_probs[:] = [0.5, 1., 0.]
+
+        table.update_average_policy(2)
+        self.assertTrue(np.allclose(table.average_policy, [0.5, 0.5, 2/3, 2/3, 2/3, 0.]))
+        self.assertTrue(np.all(table.reach_probs == 0))
+
+        table.regret_matching()
+        self.assertTrue(np.allclose(table.policy, [0.25, 0.75, 1/3, 1/3, 1/3, 1.]))
+        table.regret_matching(plus=True)
+        self.assertTrue(np.all(table.regrets >= 0))
+
+    def test_delta_and_merge(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRAgent(env)
+        for _ in range(3):
+            agent.train()
+
+        # Traverse from a copy of the table, then merge the changes into another copy
+        base = InfoSetTable.from_arrays(agent.table.to_arrays())
+        agent.iteration += 1
+        agent.traverse()
+        table = InfoSetTable.from_arrays(base.to_arrays())
+        table.merge(agent.table.delta(base))
+
+        self.assertEqual(len(table), len(agent.table))
+        rows, positions = table.match(agent.table.keys, agent.table.offsets, agent.table.actions)
+        self.assertTrue(np.all(positions >= 0))
+        self.assertTrue(np.allclose(table.regrets[positions], agent.table.regrets, atol=1e-4))
+        self.assertTrue(np.allclose(table.average_policy[positions], agent.table.average_policy, atol=1e-4))
+        self.assertTrue(np.allclose(table.reach_probs[rows], agent.table.reach_probs))
+
+    def test_train_parallel(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRAgent(env, sampling='external', num_workers=2, traversals_per_worker=2)
+        try:
+            for _ in range(3):
+                agent.train()
+        finally:
+            agent.close()
+
+        self.assertEqual(agent.iteration, 3)
+        self.assertGreater(len(agent.table), 0)
+        self.assertGreater(agent.table.average_policy.sum(), 0)
 
     def test_save_and_load(self):
         env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
@@ -30,8 +112,70 @@ class TestNFSP(unittest.TestCase):
 
         new_agent = CFRAgent(env, model_path='experiments/cfr_model')
         new_agent.load()
-        self.assertEqual(len(agent.policy), len(new_agent.policy))
-        self.assertEqual(len(agent.average_policy), len(new_agent.average_policy))
-        self.assertEqual(len(agent.regrets), len(new_agent.regrets))
+        self.assertEqual(len(agent.table), len(new_agent.table))
+        self.assertTrue(np.array_equal(agent.table.keys, new_agent.table.keys))
+        self.assertTrue(np.array_equal(agent.table.actions, new_agent.table.actions))
+        self.assertTrue(np.array_equal(agent.table.policy, new_agent.table.policy))
+        self.assertTrue(np.array_equal(agent.table.average_policy, new_agent.table.average_policy))
+        self.assertTrue(np.array_equal(agent.table.regrets, new_agent.table.regrets))
         self.assertEqual(agent.iteration, new_agent.iteration)
 
+        # The loaded model can be trained further
+        new_agent.train()
+        self.assertEqual(new_agent.iteration, agent.iteration + 1)
+
+    def test_save_over_loaded_model(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRAgent(env, model_path='experiments/cfr_model_resave')
+        for _ in range(100):
+            agent.train()
+        agent.save()
+
+        # The loaded table is memory-mapped from the files that are saved over
+        loaded_agent = CFRAgent(env, model_path='experiments/cfr_model_resave')
+        loaded_agent.load()
+        loaded_agent.train()
+        regrets = np.array(loaded_agent.table.regrets)
+        average_policy = np.array(loaded_agent.table.average_policy)
+        loaded_agent.save()
+
+        new_agent = CFRAgent(env, model_path='experiments/cfr_model_resave')
+        new_agent.load()
+        self.assertEqual(new_agent.iteration, 101)
+        self.assertTrue(np.array_equal(new_agent.table.keys, loaded_agent.table.keys))
+        self.assertTrue(np.array_equal(new_agent.table.regrets, regrets))
+        self.assertTrue(np.array_equal(new_agent.table.average_policy, average_policy))
+        self.assertGreater(np.abs(new_agent.table.average_policy).sum(), 0)
+
+    def test_info_set_table(self):
+        table = InfoSetTable(capacity=1)
+        keys = [InfoSetTable.hash_key(np.array([i], dtype=np.float64)) for i in range(3)]
+        for key, legal_actions in zip(keys, [[0, 1], [2], [0, 1, 3]]):
+            table.add(key, legal_actions)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.find(keys[1]), 1)
+        self.assertIsNone(table.find(InfoSetTable.hash_key(b'missing')))
+        self.assertEqual(list(table.get_positions(keys[2], np.array([0, 1, 3]))[1]), [3, 4, 5])
+        self.assertEqual(list(table.get_positions(keys[2], np.array([1, 3]))[1]), [4, 5])
+        self.assertEqual(list(table.offsets), [0, 2, 3, 6])
+        self.assertTrue(np.allclose(table.policy[table.row_slice(0)], [0.5, 0.5]))
+
+        # Meeting an information set with new legal actions widens its row
+        table.regrets[table.row_slice(0)] = [1., 2.]
+        self.assertEqual(list(table.get_positions(keys[0], np.array([1, 2]))[1]), [1, 2])
+        self.assertEqual(list(table.offsets), [0, 3, 4, 7])
+        self.assertEqual(list(table.actions), [0, 1, 2, 2, 0, 1, 3])
+        self.assertEqual(list(table.regrets[table.row_slice(0)]), [1., 2., 0.])
+        self.assertEqual(list(table.policy[table.row_slice(0)]), [0.5, 0.5, 0.])
+        self.assertEqual(table.find(keys[2]), 2)
+
+    def test_load_pickles(self):
+        env = rlcard.make('leduc-holdem')
+        agent = CFRAgent(env, model_path=os.path.join(rlcard.__path__[0], 'models/pretrained/leduc_holdem_cfr'))
+        agent.load()
+        self.assertGreater(len(agent.table), 0)
+
+        state, _ = env.reset()
+        action, _ = agent.eval_step(state)
+        self.assertIn(action, state['legal_actions'])
+
@@ -0,0 +1,55 @@
+import unittest
+import torch
+import numpy as np
+
+import rlcard
+from rlcard.agents.dqn_agent import DQNAgent, Memory
+from rlcard.agents.distributed_dqn import SharedMemory, DistributedDQNTrainer
+
+class TestDistributedDQN(unittest.TestCase):
+
+    def test_shared_memory(self):
+
+        memory = SharedMemory(4, 2, [3], 2)
+        for i in range(6):
+            memory.save(np.full(3, i), i % 2, float(i), np.full(3, i+1), np.array([True, i % 2 == 0]), i == 5)
+        self.assertEqual(len(memory), 4)
+        self.assertEqual(memory.num_added, 6)
+        self.assertEqual(sorted(memory.rewards.tolist()), [2., 3., 4., 5.])
+
+        state_batch, action_batch, reward_batch, next_state_batch, legal_actions_batch, done_batch = memory.sample()
+        self.assertEqual(state_batch.shape, (2, 3))
+        self.assertEqual(legal_actions_batch.shape, (2, 2))
+        self.assertEqual(legal_actions_batch.dtype, bool)
+        self.assertTrue(np.array_equal(next_state_batch[:, 0], state_batch[:, 0] + 1))
+
+    def test_train(self):
+
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        agent = DQNAgent(replay_memory_size=200,
+                         replay_memory_init_size=20,
+                         update_target_estimator_every=10,
+                         num_actions=env.num_actions,
+                         state_shape=env.state_shape[0],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'))
+        trainer = DistributedDQNTrainer(env, agent, num_actors=2, seed=0)
+
+        num_callbacks = []
+        trainer.start(20, callback=lambda trainer: num_callbacks.append(trainer.num_frames), callback_every=10)
+
+        self.assertEqual(agent.train_t, 20)
+        self.assertEqual(len(num_callbacks), 2)
+        self.assertGreaterEqual(trainer.num_frames, 20)
+        self.assertIsInstance(agent.memory, Memory)
+
+    def test_prioritized_replay(self):
+
+        env = rlcard.make('leduc-holdem')
+        agent = DQNAgent(num_actions=env.num_actions,
+                         state_shape=env.state_shape[0],
+                         mlp_layers=[10,10],
+                         prioritized_replay=True,
+                         device=torch.device('cpu'))
+        with self.assertRaises(ValueError):
+            DistributedDQNTrainer(env, agent, num_actors=2)
@@ -1,8 +1,12 @@
 import unittest
+from unittest import mock
 import torch
 import numpy as np
 
-from rlcard.agents.dqn_agent import DQNAgent
+import rlcard
+from rlcard.agents import RandomAgent
+from rlcard.agents.dqn_agent import DQNAgent, SumTree, PrioritizedMemory
+from rlcard.utils import reorganize
 
 class TestDQN(unittest.TestCase):
 
@@ -43,6 +47,8 @@ class TestDQN(unittest.TestCase):
         predicted_action, _ = agent.eval_step({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']})
         self.assertGreaterEqual(predicted_action, 0)
         self.assertLessEqual(predicted_action, 1)
+        predicted_action = agent.eval_action({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}})
+        self.assertIn(predicted_action, [0, 1])
 
         for _ in range(num_steps):
             ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), 0, {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']}, True]
@@ -51,3 +57,89 @@ class TestDQN(unittest.TestCase):
         predicted_action = agent.step({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}})
         self.assertGreaterEqual(predicted_action, 0)
         self.assertLessEqual(predicted_action, 1)
+
+    def test_feed_batch(self):
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        agent = DQNAgent(replay_memory_size=100,
+                         replay_memory_init_size=10,
+                         train_every=3,
+                         batch_size=4,
+                         num_actions=env.num_actions,
+                         state_shape=env.state_shape[0],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'))
+        env.set_agents([agent, RandomAgent(env.num_actions)])
+        num_transitions = 0
+        for _ in range(20):
+            transitions = reorganize(*env.run(is_training=True, columnar=True))[0]
+            agent.feed_batch(transitions)
+            num_transitions += len(transitions.action)
+        self.assertEqual(agent.total_t, num_transitions)
+        self.assertEqual(agent.train_t, (num_transitions - 10) // 3 + 1)
+        self.assertEqual(len(agent.memory.memory), num_transitions)
+
+    def test_legal_actions_mask(self):
+
+        agent = DQNAgent(replay_memory_size=10,
+                         replay_memory_init_size=4,
+                         batch_size=4,
+                         num_actions=3,
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'))
+
+        q_values = agent.predict({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 2: None}})
+        self.assertEqual(q_values[1], -np.inf)
+        self.assertTrue(np.isfinite(q_values[[0, 2]]).all())
+
+        for _ in range(4):
+            agent.feed_memory(np.random.random_sample((2,)), 0, 0, np.random.random_sample((2,)), [1], False)
+        _, _, _, _, legal_actions_batch, _ = agent.memory.sample()
+        self.assertEqual(legal_actions_batch.shape, (4, 3))
+        self.assertEqual(legal_actions_batch.dtype, bool)
+        self.assertTrue((legal_actions_batch == [False, True, False]).all())
+        agent.train()
+
+    def test_sum_tree(self):
+
+        tree = SumTree(5)
+        tree.update(np.arange(5), [1., 2., 3., 4., 0.])
+        self.assertEqual(tree.total(), 10.)
+        self.assertEqual(list(tree.find([0., 0.5, 1., 2.9, 3., 5.9, 6., 9.9])), [0, 0, 1, 1, 2, 2, 3, 3])
+
+        tree.update([3, 3], [1., 1.])
+        self.assertEqual(tree.total(), 7.)
+        self.assertEqual(tree.get([3])[0], 1.)
+
+    def test_prioritized_memory_rounding(self):
+
+        memory = PrioritizedMemory(8, 4)
+        for i in range(3):
+            memory.save(np.full(2, i), 0, 0., np.full(2, i), np.array([True, True]), False)
+        # A prefix sum that reaches the total falls past the saved transitions
+        with mock.patch('numpy.random.rand', return_value=np.ones(4)):
+            *_, weights, indices = memory.sample(0.5)
+        self.assertTrue((indices < 3).all())
+        self.assertTrue(np.isfinite(weights).all())
+
+    def test_train_prioritized_replay(self):
+
+        agent = DQNAgent(replay_memory_size=50,
+                         replay_memory_init_size=10,
+                         update_target_estimator_every=10,
+                         batch_size=4,
+                         state_shape=[2],
+                         mlp_layers=[10,10],
+                         device=torch.device('cpu'),
+                         prioritized_replay=True)
+
+        for _ in range(100):
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), np.random.random_sample(), {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, True]
+            agent.feed(ts)
+
+        self.assertEqual(len(agent.memory.memory), 50)
+        self.assertAlmostEqual(agent.memory.tree.total(), agent.memory.tree.get(np.arange(50)).sum())
+        *_, weights, indices = agent.memory.sample(0.5)
+        self.assertEqual(weights.shape, (4,))
+        self.assertLessEqual(weights.max(), 1.)
+        self.assertTrue((indices < 50).all())
@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents import CFRAgent, RandomAgent
+from rlcard.agents.leduc_cfr_solver import LeducCFRSolver
+
+class TestLeducCFRSolver(unittest.TestCase):
+
+    def test_public_tree(self):
+        solver = LeducCFRSolver()
+        self.assertEqual(solver.tree.root.kind, 'decision')
+        self.assertEqual(solver.tree.root.player, 0)
+        self.assertEqual(solver.tree.root.chips, [1, 2])
+        for node in solver.tree.nodes:
+            self.assertEqual(len(node.actions), len(node.children))
+            self.assertEqual(node.regrets.shape[0], 1 if node.round_counter == 0 else 3)
+
+        # The uniform policy loses half a big blind when folding preflop,
+        # and the showdowns are symmetric
+        payoffs = solver.expected_payoffs('policy')
+        self.assertAlmostEqual(payoffs.sum(), 0)
+        self.assertAlmostEqual(payoffs[0], -0.0940, places=3)
+
+    def test_train(self):
+        solver = LeducCFRSolver(model_path='experiments/leduc_cfr_solver_model')
+        for _ in range(200):
+            solver.train()
+        self.assertEqual(solver.iteration, 200)
+        for node in solver.tree.nodes:
+            self.assertTrue(np.all(node.regrets >= 0))
+            self.assertTrue(np.all(node.average_policy >= 0))
+        self.assertAlmostEqual(solver.expected_payoffs()[0], 0.0119, places=3)
+
+    def test_save_and_load(self):
+        solver = LeducCFRSolver(model_path='experiments/leduc_cfr_solver_model')
+        for _ in range(10):
+            solver.train()
+        solver.save()
+
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        agent = CFRAgent(env, model_path='experiments/leduc_cfr_solver_model')
+        agent.load()
+        self.assertEqual(agent.iteration, 10)
+
+        # Every observation of the environment is in the table with its legal actions
+        env.set_agents([RandomAgent(num_actions=env.num_actions) for _ in range(env.num_players)])
+        for _ in range(100):
+            trajectories, _ = env.run()
+            for trajectory in trajectories:
+                for state in trajectory[0:-1:2]:
+                    row = agent.table.find(agent.table.hash_key(state['obs']))
+                    self.assertIsNotNone(row)
+                    actions = agent.table.actions[agent.table.row_slice(row)]
+                    self.assertTrue(set(state['legal_actions']).issubset(actions))
+
+        state, _ = env.reset()
+        action, _ = agent.eval_step(state)
+        self.assertIn(action, state['legal_actions'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,10 @@ import unittest
 import torch
 import numpy as np
 
-from rlcard.agents.nfsp_agent import NFSPAgent
+import rlcard
+from rlcard.agents import RandomAgent
+from rlcard.agents.nfsp_agent import NFSPAgent, ReservoirBuffer, Transition
+from rlcard.utils import reorganize
 
 class TestNFSP(unittest.TestCase):
 
@@ -36,6 +39,8 @@ class TestNFSP(unittest.TestCase):
         predicted_action, _ = agent.eval_step({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']})
         self.assertGreaterEqual(predicted_action, 0)
         self.assertLessEqual(predicted_action, 1)
+        predicted_action = agent.eval_action({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}})
+        self.assertIn(predicted_action, [0, 1])
 
         for _ in range(num_steps):
             agent.sample_episode_policy()
@@ -45,3 +50,88 @@ class TestNFSP(unittest.TestCase):
 
             ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), 0, {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']}, True]
             agent.feed(ts)
+
+    def test_train_prioritized_replay(self):
+
+        agent = NFSPAgent(num_actions=2,
+                          state_shape=[2],
+                          hidden_layers_sizes=[10,10],
+                          reservoir_buffer_capacity=50,
+                          batch_size=4,
+                          min_buffer_size_to_learn=20,
+                          q_replay_memory_size=50,
+                          q_replay_memory_init_size=20,
+                          q_batch_size=4,
+                          q_mlp_layers=[10,10],
+                          q_prioritized_replay=True,
+                          device=torch.device('cpu'))
+
+        for _ in range(100):
+            agent.sample_episode_policy()
+            agent.step({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}})
+            ts = [{'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}}, np.random.randint(2), 0, {'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}, 'raw_legal_actions': ['call', 'raise']}, True]
+            agent.feed(ts)
+
+        self.assertGreater(agent._rl_agent.train_t, 0)
+
+    def test_feed_batch(self):
+        env = rlcard.make('leduc-holdem', config={'seed': 0})
+        agent = NFSPAgent(num_actions=env.num_actions,
+                          state_shape=env.state_shape[0],
+                          hidden_layers_sizes=[10,10],
+                          anticipatory_param=1,
+                          batch_size=4,
+                          min_buffer_size_to_learn=10,
+                          q_replay_memory_init_size=10,
+                          q_batch_size=4,
+                          q_mlp_layers=[10,10],
+                          device=torch.device('cpu'))
+        env.set_agents([agent, RandomAgent(env.num_actions)])
+        num_transitions = 0
+        for _ in range(20):
+            agent.sample_episode_policy()
+            transitions = reorganize(*env.run(is_training=True, columnar=True))[0]
+            # The pending best response actions are added to the reservoir buffer when the transitions are fed
+            agent.feed_batch(transitions)
+            num_transitions += len(transitions.action)
+            self.assertEqual(len(agent._reservoir_buffer), num_transitions)
+        self.assertEqual(agent.total_t, num_transitions)
+        self.assertTrue(np.all(agent._reservoir_buffer.sample(4).action_probs.sum(axis=1) == 1))
+
+    def test_pending_transitions(self):
+        agent = NFSPAgent(num_actions=2,
+                          state_shape=[2],
+                          hidden_layers_sizes=[10,10],
+                          anticipatory_param=1,
+                          batch_size=4,
+                          q_mlp_layers=[10,10],
+                          device=torch.device('cpu'))
+        # An agent that is never fed adds its transitions in batches
+        for i in range(10):
+            agent.step({'obs': np.random.random_sample((2,)), 'legal_actions': {0: None, 1: None}})
+            self.assertEqual(len(agent._reservoir_buffer), (i + 1) // 4 * 4)
+            self.assertLess(len(agent._pending_actions), 4)
+        agent.sample_episode_policy()
+        self.assertEqual(len(agent._reservoir_buffer), 10)
+
+    def test_reservoir_buffer(self):
+
+        buffer = ReservoirBuffer(10)
+        for i in range(5):
+            buffer.add(Transition(info_state=np.full(3, i, dtype=np.int8), action_probs=np.array([1., 0.])))
+        self.assertEqual(len(buffer), 5)
+
+        buffer.add_batch(np.arange(100, dtype=np.int8).repeat(3).reshape(100, 3), np.tile([0., 1.], (100, 1)))
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(buffer._add_calls, 105)
+
+        transitions = buffer.sample(4)
+        self.assertEqual(transitions.info_state.shape, (4, 3))
+        self.assertEqual(transitions.info_state.dtype, np.int8)
+        self.assertEqual(transitions.action_probs.shape, (4, 2))
+        self.assertEqual(len(list(buffer)), 10)
+        with self.assertRaises(ValueError):
+            buffer.sample(11)
+
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
@@ -1,4 +1,6 @@
 import unittest
+from collections import Counter
+import numpy as np
 
 import rlcard
 from rlcard.agents.random_agent import RandomAgent
@@ -23,6 +25,41 @@ class TestDoudizhuEnv(unittest.TestCase):
         for legal_action in legal_actions:
             self.assertLessEqual(legal_action, env.num_actions-1)
 
+    def test_action_features(self):
+        env = rlcard.make('doudizhu')
+        def cards2array(cards):
+            matrix = np.zeros([4, 15], dtype=np.int8)
+            for card, num_times in Counter(cards).items():
+                matrix[:num_times, '3456789TJQKA2BR'.index(card)] = 1
+            return np.concatenate((matrix[:, :13].flatten('F'), matrix[0, 13:]))
+
+        for action_id in range(0, env.num_actions, 97):
+            cards = env._decode_action(action_id)
+            self.assertTrue(np.array_equal(env.get_action_feature(action_id), cards2array(cards)))
+        self.assertEqual(env.get_action_feature(env.num_actions-1).sum(), 0)
+
+        state, _ = env.reset()
+        for action_id, feature in state['legal_actions'].items():
+            self.assertTrue(np.array_equal(feature, cards2array(env._decode_action(action_id))))
+        self.assertTrue(np.array_equal(state['obs'][:54], cards2array(state['raw_obs']['current_hand'])))
+        self.assertTrue(np.array_equal(state['obs'][54:108], cards2array(state['raw_obs']['others_hand'])))
+
+    def test_played_counts(self):
+        env = rlcard.make('doudizhu', config={'seed': 0, 'allow_step_back': True})
+        np.random.seed(0)
+        state, _ = env.reset()
+        states = []
+        while not env.is_over():
+            states.append(state)
+            raw_obs = state['raw_obs']
+            for counts, cards in zip(raw_obs['played_counts'], raw_obs['played_cards']):
+                self.assertEqual(''.join(c * n for c, n in zip('3456789TJQKA2BR', counts.tolist())), cards)
+            state, _ = env.step(np.random.choice(list(state['legal_actions'])))
+        # The counts of earlier states are kept, and are restored by step_back
+        self.assertEqual(sum(counts.sum() for counts in states[0]['raw_obs']['played_counts']), 0)
+        env.step_back()
+        self.assertEqual(env.get_state(env.get_player_id())['obs'].tolist(), states[-1]['obs'].tolist())
+
     def test_step(self):
         env = rlcard.make('doudizhu')
         _, player_id = env.reset()
@@ -30,6 +67,18 @@ class TestDoudizhuEnv(unittest.TestCase):
         _, next_player_id = env.step(env.num_actions-2)
         self.assertEqual(next_player_id, (player.player_id+1)%len(env.game.players))
 
+    def test_play(self):
+        payoffs = []
+        for play in [False, True]:
+            env = rlcard.make('doudizhu', config={'seed': 0})
+            env.set_agents([RandomAgent(env.num_actions) for _ in range(env.num_players)])
+            np.random.seed(0)
+            if play:
+                payoffs.append([list(env.play()) for _ in range(10)])
+            else:
+                payoffs.append([list(env.run(is_training=False)[1]) for _ in range(10)])
+        self.assertEqual(payoffs[0], payoffs[1])
+
     def test_step_back(self):
         env = rlcard.make('doudizhu', config={'allow_step_back':True})
         _, player_id = env.reset()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.envs import LazyState
+from rlcard.agents.cfr_agent import CFRAgent
+
+def check_lazy_state(test, env_id, num_steps=300):
+    ''' Step an environment with lazy states and one without with the same
+    seed and actions, and compare their states
+    '''
+    env = rlcard.make(env_id, config={'seed': 3})
+    lazy_env = rlcard.make(env_id, config={'seed': 3, 'lazy_state': True})
+    np_random = np.random.RandomState(0)
+    state, player_id = env.reset()
+    lazy_state, lazy_player_id = lazy_env.reset()
+    for step in range(num_steps):
+        test.assertIsInstance(lazy_state, LazyState)
+        test.assertEqual(lazy_player_id, player_id)
+        # Skip reading some of the states
+        if step % 3 != 0:
+            test.assertEqual(sorted(lazy_state.keys()), sorted(state.keys()))
+            test.assertEqual(np.asarray(lazy_state['obs']).tolist(), np.asarray(state['obs']).tolist())
+            test.assertEqual(list(lazy_state['legal_actions']), list(state['legal_actions']))
+        action = np_random.choice(list(state['legal_actions']))
+        state, player_id = env.step(action)
+        lazy_state, lazy_player_id = lazy_env.step(action)
+        if env.is_over():
+            test.assertTrue(lazy_env.is_over())
+            test.assertEqual(list(lazy_env.get_payoffs()), list(env.get_payoffs()))
+            state, player_id = env.reset()
+            lazy_state, lazy_player_id = lazy_env.reset()
+
+class TestLazyState(unittest.TestCase):
+
+    def test_leduc_holdem(self):
+        check_lazy_state(self, 'leduc-holdem')
+
+    def test_doudizhu(self):
+        check_lazy_state(self, 'doudizhu')
+
+    def test_skat(self):
+        check_lazy_state(self, 'skat')
+
+    def test_uno(self):
+        check_lazy_state(self, 'uno')
+
+    def test_gin_rummy(self):
+        check_lazy_state(self, 'gin-rummy')
+
+    def test_outdated_state(self):
+        env = rlcard.make('doudizhu', config={'seed': 0, 'lazy_state': True})
+        state, _ = env.reset()
+        next_state, _ = env.step(list(state['legal_actions'])[0])
+        # Passing is legal for the next player
+        env.step(env._ACTION_2_ID['pass'])
+        with self.assertRaises(RuntimeError):
+            next_state['obs']
+        # A state that was read stays available
+        self.assertIn('obs', state)
+
+    def test_step_back(self):
+        env = rlcard.make('leduc-holdem', config={'seed': 0, 'allow_step_back': True, 'lazy_state': True})
+        state, player_id = env.reset()
+        obs = state['obs'].tolist()
+        env.step(list(state['legal_actions'])[0])
+        state, back_player_id = env.step_back()
+        self.assertEqual(back_player_id, player_id)
+        self.assertEqual(state['obs'].tolist(), obs)
+
+    def test_cfr(self):
+        env = rlcard.make('leduc-holdem', config={'seed': 0, 'allow_step_back': True})
+        lazy_env = rlcard.make('leduc-holdem', config={'seed': 0, 'allow_step_back': True, 'lazy_state': True})
+        agent = CFRAgent(env, model_path='experiments/cfr_model')
+        lazy_agent = CFRAgent(lazy_env, model_path='experiments/cfr_model')
+        for _ in range(10):
+            agent.train()
+            lazy_agent.train()
+        self.assertEqual(agent.table.policy.tolist(), lazy_agent.table.policy.tolist())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -63,6 +63,18 @@ class TestLeducholdemEnv(unittest.TestCase):
             total += payoff
         self.assertEqual(total, 0)
 
+    def test_play(self):
+        payoffs = []
+        for play in [False, True]:
+            env = rlcard.make('leduc-holdem', config={'seed': 0})
+            env.set_agents([RandomAgent(env.num_actions) for _ in range(env.num_players)])
+            np.random.seed(0)
+            if play:
+                payoffs.append([list(env.play()) for _ in range(10)])
+            else:
+                payoffs.append([list(env.run(is_training=False)[1]) for _ in range(10)])
+        self.assertEqual(payoffs[0], payoffs[1])
+
     def test_get_perfect_information(self):
         env = rlcard.make('leduc-holdem')
         _, player_id = env.reset()
@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.envs.vector_env import VectorEnv
+
+def check_vector_env(test, env_id, num_envs=5, num_workers=2, num_steps=200, context=None):
+    ''' Step the vector environment and single environments with the same
+    seeds and actions, and compare them
+    '''
+    config = {'seed': 7}
+    envs = [rlcard.make(env_id, config={'seed': 7 + i}) for i in range(num_envs)]
+    np_random = np.random.RandomState(0)
+    with VectorEnv(env_id, num_envs, config=config, num_workers=num_workers, context=context) as vector_env:
+        obs, legal_actions, player_ids = vector_env.reset()
+        states = [env.reset() for env in envs]
+        for step in range(num_steps + 1):
+            for i, (state, player_id) in enumerate(states):
+                test.assertEqual(player_ids[i], player_id)
+                test.assertEqual(obs[player_id][i].tolist(),
+                                 np.reshape(state['obs'], vector_env.state_shape[player_id]).tolist())
+                test.assertEqual(np.flatnonzero(legal_actions[i]).tolist(), sorted(state['legal_actions']))
+            if step == num_steps:
+                break
+            actions = np.array([np_random.choice(np.flatnonzero(mask)) for mask in legal_actions])
+            obs, legal_actions, player_ids, payoffs, dones = vector_env.step(actions)
+            for i, env in enumerate(envs):
+                env.step(actions[i])
+                test.assertEqual(dones[i], env.is_over())
+                if env.is_over():
+                    test.assertEqual(payoffs[i].tolist(), list(env.get_payoffs()))
+                    states[i] = env.reset()
+                else:
+                    player_id = env.get_player_id()
+                    states[i] = (env.get_state(player_id), player_id)
+
+class TestVectorEnv(unittest.TestCase):
+
+    def test_leduc_holdem(self):
+        check_vector_env(self, 'leduc-holdem')
+
+    def test_blackjack(self):
+        check_vector_env(self, 'blackjack', num_envs=3, num_workers=3)
+
+    def test_doudizhu(self):
+        check_vector_env(self, 'doudizhu', num_envs=3, num_steps=100)
+
+    def test_uno(self):
+        check_vector_env(self, 'uno', num_envs=4, num_workers=1)
+
+    def test_bridge(self):
+        check_vector_env(self, 'bridge', num_envs=2, num_steps=100)
+
+    def test_spawn(self):
+        check_vector_env(self, 'limit-holdem', num_envs=2, num_steps=20, context='spawn')
+
+    def test_worker_exception(self):
+        vector_env = VectorEnv('doudizhu', 2, num_workers=1)
+        vector_env.reset()
+        with self.assertRaises(RuntimeError):
+            vector_env.step(np.full(2, vector_env.num_actions))
+        self.assertTrue(vector_env.closed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -62,6 +62,28 @@ class TestBlackjackGame(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_step_back_restores_state(self):
+        def snapshot(game):
+            return (game.game_pointer, dict(game.winner), [c.get_index() for c in game.dealer.deck],
+                    [c.get_index() for c in game.dealer.hand], game.dealer.status, game.dealer.score,
+                    [([c.get_index() for c in p.hand], p.status, p.score) for p in game.players])
+
+        config = dict(DEFAULT_GAME_CONFIG, game_num_players=2)
+        for num_decks in [0, 1]:
+            config['game_num_decks'] = num_decks
+            game = Game(allow_step_back=True)
+            game.configure(config)
+            for _ in range(20):
+                game.init_game()
+                snapshots = []
+                while not game.is_over():
+                    snapshots.append(snapshot(game))
+                    game.step(np.random.choice(['hit', 'stand']))
+                while snapshots:
+                    self.assertTrue(game.step_back())
+                    self.assertEqual(snapshot(game), snapshots.pop())
+                self.assertFalse(game.step_back())
+
     def test_get_state(self):
         game = Game()
         game.configure(DEFAULT_GAME_CONFIG)
@@ -1,11 +1,20 @@
+import os
+import json
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 import numpy as np
 import functools
+from collections import OrderedDict
 
 from rlcard.games.doudizhu.game import DoudizhuGame as Game
 from rlcard.games.doudizhu.utils import get_landlord_score, encode_cards
 from rlcard.games.doudizhu.utils import doudizhu_sort_str
+from rlcard.games.doudizhu.utils import CARD_TYPE, TYPE_CARD, ACTION_2_ID, ID_2_ACTION, JSONDATA_PATH
+from rlcard.games.doudizhu.utils import cards2str, cards2mask, contains_cards, contains_masks, get_gt_cards
 from rlcard.games.doudizhu.judger import DoudizhuJudger as Judger
+from rlcard.games.doudizhu import utils
 
 
 class TestDoudizhuGame(unittest.TestCase):
@@ -137,6 +146,72 @@ class TestDoudizhuGame(unittest.TestCase):
         self.assertEqual(plane[1][13], 1)
         self.assertEqual(plane[1][14], 1)
 
+    def test_contains_masks(self):
+        hand = '3334455TTTTJQKA2BR'
+        self.assertTrue(contains_masks(cards2mask(hand), cards2mask('TTTT')))
+        self.assertFalse(contains_masks(cards2mask(hand), cards2mask('44455')))
+        targets = CARD_TYPE[1]
+        contained = contains_masks(cards2mask(hand), np.array([cards2mask(cards) for cards in targets]))
+        for cards, result in zip(targets, contained):
+            self.assertEqual(result, contains_cards(hand, cards))
+
+    def test_get_gt_cards(self):
+        game = Game()
+        game.init_game()
+        player, greater_player = game.players[0], game.players[1]
+        greater_player.played_cards = '55'
+        hand = cards2str(player.current_hand)
+        gt_cards = get_gt_cards(player, greater_player)
+        self.assertEqual(gt_cards[0], 'pass')
+        self.assertEqual(len(gt_cards), len(set(gt_cards)))
+        expected = [cards for cards in CARD_TYPE[1] if contains_cards(hand, cards) and any(
+            (card_type == 'pair' and int(weight) > 2) or card_type in ('bomb', 'rocket')
+            for card_type, weight in CARD_TYPE[0][cards])]
+        self.assertEqual(set(gt_cards[1:]), set(expected))
+
+        # Nothing is greater than the rocket
+        greater_player.played_cards = 'BR'
+        self.assertEqual(get_gt_cards(player, greater_player), ['pass'])
+
+    def test_action_tables(self):
+        # The tables built from the cached arrays are the ones in jsondata
+        with open(os.path.join(JSONDATA_PATH, 'action_space.txt'), 'r') as f:
+            self.assertEqual(ID_2_ACTION, f.readline().strip().split())
+        self.assertEqual(ACTION_2_ID['pass'], len(ID_2_ACTION) - 1)
+        with open(os.path.join(JSONDATA_PATH, 'card_type.json'), 'r') as f:
+            card_type = json.load(f, object_pairs_hook=OrderedDict)
+        self.assertEqual(list(CARD_TYPE[0].items()), list(card_type.items()))
+        with open(os.path.join(JSONDATA_PATH, 'type_card.json'), 'r') as f:
+            type_card = json.load(f, object_pairs_hook=OrderedDict)
+        self.assertEqual(list(TYPE_CARD.keys()), list(type_card.keys()))
+        for card_type in type_card:
+            self.assertEqual(list(TYPE_CARD[card_type].items()), list(type_card[card_type].items()))
+
+    def test_action_tables_cache(self):
+        # Extract jsondata before copying it
+        utils.get_cache_path()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            jsondata_path = os.path.join(tmp_dir, 'jsondata')
+            os.makedirs(jsondata_path)
+            for name in utils.SOURCE_FILES:
+                shutil.copy(os.path.join(JSONDATA_PATH, name), jsondata_path)
+            with mock.patch.object(utils, 'JSONDATA_PATH', jsondata_path), \
+                    mock.patch.object(utils, 'CACHE_DIR', os.path.join(tmp_dir, 'cache')):
+                cache_path = utils.get_cache_path()
+                self.assertEqual(utils._load_tables()['actions'].tolist(), ID_2_ACTION)
+                self.assertTrue(os.path.isfile(os.path.join(cache_path, 'actions.npy')))
+                self.assertIsInstance(utils._load_tables()['actions'], np.memmap)
+
+                # Changed sources are cached in another directory
+                with open(os.path.join(jsondata_path, 'action_space.txt'), 'w') as f:
+                    f.write(' '.join(reversed(ID_2_ACTION)) + '\n')
+                self.assertNotEqual(utils.get_cache_path(), cache_path)
+                self.assertEqual(utils._load_tables()['actions'].tolist(), ID_2_ACTION[::-1])
+
+                # So are other versions of the arrays
+                with mock.patch.object(utils, 'CACHE_VERSION', utils.CACHE_VERSION + 1):
+                    self.assertFalse(os.path.exists(utils.get_cache_path()))
+
     def test_judge_payoffs(self):
         payoffs = Judger.judge_payoffs(0, 0)
         self.assertEqual(payoffs[0], 1)
@@ -18,6 +18,8 @@ from rlcard.games.gin_rummy.utils.action_event import draw_card_action_id, pick_
 from rlcard.games.gin_rummy.utils.action_event import declare_dead_hand_action_id
 from rlcard.games.gin_rummy.utils.action_event import gin_action_id, discard_action_id, knock_action_id
 from rlcard.games.gin_rummy.utils.melding import get_all_set_melds, get_all_run_melds, get_meld_clusters
+from rlcard.games.gin_rummy.utils.melding import get_best_meld_clusters, get_best_meld_cluster_masks
+from rlcard.games.gin_rummy.utils.melding import get_meld_cluster_masks
 from rlcard.games.gin_rummy.utils.settings import Setting, Settings
 from rlcard.games.gin_rummy.utils.thinker import Thinker
 
@@ -135,16 +137,6 @@ class TestGinRummyGame(unittest.TestCase):
         hand = [utils.card_from_text(x) for x in hand_text]
         going_out_deadwood_count = 10
         knock_cards, gin_cards = judge.get_going_out_cards(hand=hand, going_out_deadwood_count=going_out_deadwood_count)
-
-        player = GinRummyPlayer(player_id=0, np_random=np.random.RandomState())
-        player.hand = hand
-        player.did_populate_hand()
-        meld_clusters = player.get_meld_clusters()
-        alpha, beta = judge._get_going_out_cards(meld_clusters=meld_clusters,
-                                                 hand=hand,
-                                                 going_out_deadwood_count=going_out_deadwood_count)
-        self.assertEqual(set(alpha), set(knock_cards))
-        self.assertEqual(beta, [])
         self.assertEqual(knock_cards, [utils.card_from_text('8D')])
         self.assertEqual(gin_cards, [])
 
@@ -154,20 +146,42 @@ class TestGinRummyGame(unittest.TestCase):
         going_out_deadwood_count = 10
         knock_cards, gin_cards = judge.get_going_out_cards(hand=hand, going_out_deadwood_count=going_out_deadwood_count)
 
-        player = GinRummyPlayer(player_id=0, np_random=np.random.RandomState())
-        player.hand = hand
-        player.did_populate_hand()
-        meld_clusters = player.get_meld_clusters()
-        alpha, beta = judge._get_going_out_cards(meld_clusters=meld_clusters,
-                                                 hand=hand,
-                                                 going_out_deadwood_count=going_out_deadwood_count)
-        self.assertEqual(set(alpha), set(knock_cards))
-        self.assertEqual(beta, [])
-
         correct_knock_cards = [utils.card_from_text(x) for x in ['7H', '4S', '4H', '3H', '2S', 'AS', 'AH', 'AD', 'AC']]
         self.assertEqual(set(knock_cards), set(correct_knock_cards))
         self.assertEqual(gin_cards, [])
 
+    def test_meld_cluster_masks(self):
+        hand_text = ['9H', 'AC', 'TH', '3C', '3D', '7C', 'QH', '3H', '8C', '8D',
+                     '4D', '7H', '8S', '5H', '4H', 'AS', 'TD', '3S', '2S', 'AH']
+        hand = [utils.card_from_text(x) for x in hand_text]
+        hand_mask = utils.get_cards_mask(hand)
+        self.assertEqual(set(utils.get_cards_from_mask(hand_mask)), set(hand))
+        meld_cluster_masks = get_meld_cluster_masks(hand_mask=hand_mask)
+        meld_clusters = get_meld_clusters(hand=hand)
+        self.assertEqual(set(frozenset(frozenset(utils.get_cards_from_mask(meld_pile_mask))
+                                       for meld_pile_mask in meld_cluster) for meld_cluster in meld_cluster_masks),
+                         set(frozenset(frozenset(meld_pile) for meld_pile in meld_cluster)
+                             for meld_cluster in meld_clusters))
+
+        # check best meld clusters against the deadwood counts of all meld clusters
+        hand_text = ['7H', '6H', '5H', '4H', '3H', '4S', '4D', 'AS', 'AH', 'AD']
+        hand = [utils.card_from_text(x) for x in hand_text]
+        deadwood_count, _ = get_best_meld_cluster_masks(hand_mask=utils.get_cards_mask(hand))
+        deadwood_counts = [utils.get_deadwood_count(hand=hand, meld_cluster=meld_cluster)
+                           for meld_cluster in get_meld_clusters(hand=hand)]
+        self.assertEqual(deadwood_count, min(deadwood_counts))
+        self.assertEqual(deadwood_count, 3)  # 3H is left over from the run with the set of fours
+        best_meld_clusters = get_best_meld_clusters(hand=hand)
+        self.assertEqual(len(best_meld_clusters), deadwood_counts.count(deadwood_count))
+        for meld_cluster in best_meld_clusters:
+            self.assertEqual(utils.get_deadwood_count(hand=hand, meld_cluster=meld_cluster), deadwood_count)
+
+        # hand without melds has the deadwood count of all its cards
+        hand_text = ['KS', 'QH', 'JD', 'TC', '9S', '8H', '7D', '6C', '5S', '4H']
+        hand = [utils.card_from_text(x) for x in hand_text]
+        self.assertEqual(get_best_meld_cluster_masks(hand_mask=utils.get_cards_mask(hand)), (79, ()))
+        self.assertEqual(get_best_meld_clusters(hand=hand), [])
+
     def test_corrected_settings(self):
         default_setting = Setting.default_setting()
         config = {Setting.max_drawn_card_count: 10,
@@ -99,6 +99,27 @@ class TestLimitHoldemMethods(unittest.TestCase):
             action = np.random.choice(legal_actions)
             game.step(action)
 
+    def test_step_back_restores_state(self):
+        def snapshot(game):
+            return (game.game_pointer, game.round_counter, list(game.history_raise_nums),
+                    [c.get_index() for c in game.dealer.deck], [c.get_index() for c in game.public_cards],
+                    [(p.status, p.in_chips) for p in game.players], game.round.game_pointer,
+                    list(game.round.raised), game.round.have_raised, game.round.not_raise_num,
+                    game.round.raise_amount, game.get_legal_actions())
+
+        game = Game(allow_step_back=True, num_players=3)
+        np.random.seed(0)
+        for _ in range(20):
+            game.init_game()
+            snapshots = []
+            while not game.is_over():
+                snapshots.append(snapshot(game))
+                game.step(np.random.choice(game.get_legal_actions()))
+            while snapshots:
+                self.assertTrue(game.step_back())
+                self.assertEqual(snapshot(game), snapshots.pop())
+            self.assertFalse(game.step_back())
+
     def test_payoffs(self):
         game = Game()
         np.random.seed(0)
@@ -3,6 +3,9 @@ import numpy as np
 
 from rlcard.games.mahjong.game import MahjongGame as Game
 from rlcard.games.mahjong.player import MahjongPlayer as Player
+from rlcard.games.mahjong.judger import MahjongJudger as Judger
+from rlcard.games.mahjong.card import MahjongCard as Card
+from rlcard.games.mahjong.utils import cards2counts, count_sets, count_sets_with_pair
 
 class TestMahjongMethods(unittest.TestCase):
 
@@ -68,6 +71,31 @@ class TestMahjongMethods(unittest.TestCase):
         success = game.step_back()
         self.assertEqual(success, False)
 
+    def test_count_sets(self):
+        def counts(suit):
+            return list(suit) + [0] * (34 - len(suit))
+        self.assertEqual(count_sets(counts([1, 1, 2, 1, 1])), 2)
+        self.assertEqual(count_sets(counts([3, 3, 3])), 3)
+        self.assertEqual(count_sets(counts([4, 1, 1])), 2)
+        self.assertEqual(count_sets(counts([0] * 27 + [4, 2, 3])), 2)
+        # The nine gates with a 5 wins with a pair of 5
+        self.assertEqual(count_sets_with_pair(counts([3, 1, 1, 1, 2, 1, 1, 1, 3])), 4)
+        self.assertIsNone(count_sets_with_pair(counts([1, 1, 1])))
+
+    def test_judge_hu(self):
+        def cards(card_type, traits):
+            return [Card(card_type, trait) for trait in traits]
+        judger = Judger(np.random.RandomState())
+        player = Player(0, np.random.RandomState())
+        player.hand = cards('dots', '11123456') + cards('bamboo', '2226') + cards('winds', ['east'] * 3)
+        self.assertEqual(cards2counts(player.hand)[18:25], [3, 1, 1, 1, 1, 1, 0])
+        # The pair of 1 leaves two chows in dots, not a pong
+        self.assertEqual(judger.judge_hu(player), (True, 4))
+        player.hand = cards('dots', '11123457') + cards('bamboo', '2226') + cards('winds', ['east'] * 3)
+        self.assertEqual(judger.judge_hu(player), (False, 3))
+        player.pile = [cards('characters', '999')]
+        self.assertEqual(judger.judge_hu(player), (True, 4))
+
     def test_player_get_player_id(self):
         player = Player(0, np.random.RandomState())
         self.assertEqual(0, player.get_player_id())
@@ -36,6 +36,29 @@ class TestNolimitholdemMethods(unittest.TestCase):
         game.init_game()
         game.step(Action.CHECK_CALL)
 
+    def test_step_back_restores_state(self):
+        def snapshot(game):
+            state = game.get_state(game.game_pointer)
+            return (game.game_pointer, game.round_counter, game.stage, state['pot'],
+                    [c.get_index() for c in game.dealer.deck], [c.get_index() for c in game.public_cards],
+                    [(p.status, p.in_chips, p.remained_chips) for p in game.players], game.round.game_pointer,
+                    list(game.round.raised), game.round.not_raise_num, game.round.not_playing_num,
+                    game.get_legal_actions())
+
+        game = Game(allow_step_back=True, num_players=3)
+        np_random = np.random.RandomState(0)
+        for _ in range(20):
+            game.init_game()
+            snapshots = []
+            while not game.is_over():
+                snapshots.append(snapshot(game))
+                legal_actions = game.get_legal_actions()
+                game.step(legal_actions[np_random.randint(len(legal_actions))])
+            while snapshots:
+                self.assertTrue(game.step_back())
+                self.assertEqual(snapshot(game), snapshots.pop())
+            self.assertFalse(game.step_back())
+
     def test_bet_more_than_chips(self):
         game = Game()
 
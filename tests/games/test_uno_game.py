@@ -3,7 +3,9 @@ import numpy as np
 
 from rlcard.games.uno.game import UnoGame as Game
 from rlcard.games.uno.player import UnoPlayer as Player
-from rlcard.games.uno.utils import ACTION_LIST
+from rlcard.games.uno.card import UnoCard as Card
+from rlcard.games.uno.utils import ACTION_LIST, ACTION_SPACE
+from rlcard.games.uno.utils import get_legal_action_ids, get_legal_action_mask
 from rlcard.games.uno.utils import hand2dict, encode_hand, encode_target
 
 class TestUnoMethods(unittest.TestCase):
@@ -36,6 +38,48 @@ class TestUnoMethods(unittest.TestCase):
         for action in actions:
             self.assertIn(action, ACTION_LIST)
 
+    def test_get_legal_action_ids(self):
+        player = Player(0, np.random.RandomState())
+        for card in [Card('number', 'r', '5'), Card('action', 'g', 'skip'),
+                     Card('number', 'b', '5'), Card('wild', 'y', 'wild_draw_4')]:
+            player.add_card(card)
+        # same color or same trait
+        legal_ids = get_legal_action_ids(player.hand_counts, ACTION_SPACE['b-5'])
+        self.assertEqual([ACTION_LIST[i] for i in legal_ids], ['r-5', 'b-5'])
+        # only color for a wild target
+        legal_ids = get_legal_action_ids(player.hand_counts, ACTION_SPACE['g-wild'])
+        self.assertEqual([ACTION_LIST[i] for i in legal_ids], ['g-skip'])
+        # wild draw 4 without any other playable card
+        legal_ids = get_legal_action_ids(player.hand_counts, ACTION_SPACE['y-7'])
+        self.assertEqual([ACTION_LIST[i] for i in legal_ids], ['r-wild_draw_4', 'g-wild_draw_4',
+                                                               'b-wild_draw_4', 'y-wild_draw_4'])
+        wild_card = Card('wild', 'r', 'wild')
+        player.add_card(wild_card)
+        legal_ids = get_legal_action_ids(player.hand_counts, ACTION_SPACE['y-7'])
+        self.assertEqual([ACTION_LIST[i] for i in legal_ids], ['r-wild', 'g-wild', 'b-wild', 'y-wild'])
+        player.remove_card(player.hand.index(wild_card))
+        player.remove_card(3)
+        self.assertEqual(sum(player.hand_counts), len(player.hand))
+        legal_ids = get_legal_action_ids(player.hand_counts, ACTION_SPACE['y-7'])
+        self.assertEqual([ACTION_LIST[i] for i in legal_ids], ['draw'])
+
+    def test_get_legal_action_mask(self):
+        game = Game()
+        hand_counts, target_ids, legal_ids = [], [], []
+        for _ in range(20):
+            game.init_game()
+            while not game.is_over():
+                hand_counts.append(list(game.players[game.get_player_id()].hand_counts))
+                target = game.round.target
+                target_ids.append(ACTION_SPACE[target.color + '-' + target.trait])
+                legal_ids.append(game.get_legal_action_ids())
+                self.assertEqual(game.get_legal_actions(), [ACTION_LIST[i] for i in legal_ids[-1]])
+                game.step(np.random.choice(game.get_legal_actions()))
+        legal_action_mask = get_legal_action_mask(np.array(hand_counts), np.array(target_ids))
+        self.assertEqual(legal_action_mask.shape, (len(legal_ids), 61))
+        for mask, ids in zip(legal_action_mask, legal_ids):
+            self.assertEqual(np.flatnonzero(mask).tolist(), ids)
+
     def test_step(self):
         game = Game()
         game.init_game()
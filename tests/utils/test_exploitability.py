@@ -0,0 +1,57 @@
+import unittest
+import numpy as np
+
+import rlcard
+from rlcard.agents import CFRAgent, RandomAgent
+from rlcard.agents.leduc_cfr_solver import LeducCFRSolver
+from rlcard.models.leducholdem_rule_models import LeducHoldemRuleAgentV2
+from rlcard.utils.exploitability import BestResponse, exploitability, get_action_probs
+
+class TestExploitability(unittest.TestCase):
+
+    def test_random_agent(self):
+        env = rlcard.make('leduc-holdem')
+        solver = LeducCFRSolver()
+        value = exploitability(env, RandomAgent(num_actions=env.num_actions))
+        self.assertAlmostEqual(value, solver.exploitability('policy'))
+
+        # A best response wins at least as much as the uniform policy
+        values = BestResponse(env, RandomAgent(num_actions=env.num_actions)).values()
+        payoffs = solver.expected_payoffs('policy')
+        self.assertTrue(np.all(values >= payoffs))
+
+    def test_solver_converges(self):
+        solver = LeducCFRSolver()
+        values = []
+        for _ in range(3):
+            for _ in range(30):
+                solver.train()
+            values.append(solver.exploitability())
+        self.assertTrue(values[0] > values[1] > values[2] > 0)
+        self.assertLess(values[2], 0.05)
+
+    def test_cfr_agent(self):
+        env = rlcard.make('leduc-holdem', config={'allow_step_back': True})
+        agent = CFRAgent(env, model_path='experiments/cfr_model')
+        for _ in range(10):
+            agent.train()
+        first = exploitability(env, agent)
+        self.assertGreater(first, 0)
+        self.assertEqual(first, exploitability(env, agent))
+
+    def test_deterministic_agent(self):
+        env = rlcard.make('leduc-holdem')
+        agent = LeducHoldemRuleAgentV2()
+        state, _ = env.reset()
+        probs = get_action_probs(agent, state)
+        self.assertEqual(probs.sum(), 1)
+        self.assertEqual(np.count_nonzero(probs), 1)
+        self.assertGreater(exploitability(env, agent), 0)
+
+    def test_unsupported_env(self):
+        env = rlcard.make('limit-holdem')
+        with self.assertRaises(ValueError):
+            BestResponse(env, RandomAgent(num_actions=env.num_actions))
+
+if __name__ == '__main__':
+    unittest.main()
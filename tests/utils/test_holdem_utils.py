@@ -2,7 +2,7 @@ import itertools
 import unittest
 
 from rlcard.games.limitholdem.judger import LimitHoldemJudger
-from rlcard.games.limitholdem.utils import compare_hands
+from rlcard.games.limitholdem.utils import compare_hands, evaluate_hand, evaluate_hands, hand_category, card_to_index, estimate_equity
 from rlcard.games.limitholdem.utils import Hand as Hand
 import numpy as np
 ''' Combinations selected for testing compare_hands function
@@ -291,6 +291,54 @@ class TestHoldemUtils(unittest.TestCase):
                                 ])
         self.assertEqual(winner, [0, 0, 1, 1])
 
+    def test_evaluate_hand(self):
+        self.assertEqual(hand_category(evaluate_hand(['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8', 'CA'])), 9)
+        self.assertEqual(hand_category(evaluate_hand(['S2', 'D8', 'H8', 'S7', 'S8', 'C8', 'D3'])), 8)
+        self.assertEqual(hand_category(evaluate_hand(['CJ', 'SJ', 'HJ', 'D9', 'C9', 'C8', 'C7'])), 7)
+        self.assertEqual(hand_category(evaluate_hand(['CA', 'CQ', 'CT', 'C8', 'C6', 'C4', 'C2'])), 6)
+        self.assertEqual(hand_category(evaluate_hand(['D5', 'ST', 'C2', 'D3', 'S4', 'S5', 'HA'])), 5)
+        self.assertEqual(hand_category(evaluate_hand(['CJ', 'SJ', 'HJ', 'D9', 'C2', 'C7', 'C4'])), 4)
+        self.assertEqual(hand_category(evaluate_hand(['CJ', 'SJ', 'H9', 'D9', 'C2', 'C8', 'C7'])), 3)
+        self.assertEqual(hand_category(evaluate_hand(['CJ', 'SJ', 'H9', 'D3', 'C2', 'C8', 'C7'])), 2)
+        self.assertEqual(hand_category(evaluate_hand(['CJ', 'S5', 'H9', 'D4', 'C2', 'C8', 'C7'])), 1)
+
+        # Hands of 5 and 6 cards
+        self.assertEqual(hand_category(evaluate_hand(['SA', 'SK', 'SQ', 'SJ', 'ST'])), 9)
+        self.assertEqual(hand_category(evaluate_hand(['SA', 'HA', 'SQ', 'DQ', 'ST', 'HT'])), 3)
+        self.assertGreater(evaluate_hand(['H6', 'D5', 'S4', 'C3', 'H2']), evaluate_hand(['HA', 'D5', 'S4', 'C3', 'H2']))
+        self.assertEqual(evaluate_hand(['SA', 'HA', 'SQ', 'DQ', 'ST', 'HT']), evaluate_hand(['SA', 'HA', 'SQ', 'DQ', 'ST']))
+
+    def test_evaluate_hands(self):
+        deck = [suit + rank for suit in 'SCDH' for rank in '23456789TJQKA']
+        np_random = np.random.RandomState(seed=7)
+        for num_cards in range(5, 8):
+            hands = [list(np_random.choice(deck, num_cards, replace=False)) for _ in range(200)]
+            indices = np.array([[card_to_index(card) for card in hand] for hand in hands])
+            strengths = evaluate_hands(indices)
+            self.assertEqual(strengths.shape, (200,))
+            self.assertEqual(strengths.tolist(), [evaluate_hand(hand) for hand in hands])
+
+    def test_estimate_equity(self):
+        np_random = np.random.RandomState(seed=7)
+        equity = estimate_equity(['SA', 'HA'], [], num_samples=5000, np_random=np_random)
+        self.assertAlmostEqual(equity.sum(), 1)
+        self.assertAlmostEqual(equity[0], 0.85, delta=0.02)
+
+        # The equities before the flop are cached, also for the same hand in other suits
+        self.assertEqual(estimate_equity(['CA', 'DA'], [], num_samples=5000).tolist(), equity.tolist())
+
+        # More opponents lower the equity
+        equity_3 = estimate_equity(['SA', 'HA'], [], num_opponents=3, num_samples=5000, np_random=np_random)
+        self.assertLess(equity_3[0], equity[0])
+
+        # A royal flush on the board is always a tie
+        equity = estimate_equity(['S2', 'H3'], ['CA', 'CK', 'CQ', 'CJ', 'CT'], num_opponents=2, num_samples=100, np_random=np_random)
+        self.assertEqual(equity.tolist(), [0, 1, 0])
+
+        # The nuts on the turn
+        equity = estimate_equity(['SA', 'SK'], ['SQ', 'SJ', 'ST', 'H2'], num_samples=100, np_random=np_random)
+        self.assertEqual(equity.tolist(), [1, 0, 0])
+
     def test_split_pots_among_players(self):
         j = LimitHoldemJudger(np.random.RandomState(seed=7))
 
@@ -0,0 +1,66 @@
+import unittest
+import subprocess
+import sys
+
+# Budget for the self import time of the modules of rlcard, without numpy.
+# They take a few milliseconds, while importing every game eagerly took more
+# than a hundred, so the budget leaves room for slow or loaded machines
+IMPORT_TIME_BUDGET_US = 100000
+# The import time is the best of several runs, to tolerate a loaded machine
+IMPORT_TIME_RUNS = 3
+
+def import_modules(statement):
+    ''' Run the statement in a fresh interpreter and return the names of the
+    modules imported
+    '''
+    code = statement + '; import sys; print(chr(10).join(sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code],
+                            capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+def rlcard_import_time(statement):
+    ''' Run the statement in a fresh interpreter with `-X importtime` and
+    return the sum of the self import times in microseconds of the modules
+    of rlcard
+    '''
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, check=True)
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        if name.strip().startswith('rlcard'):
+            total += int(self_time)
+    return total
+
+class TestImportTime(unittest.TestCase):
+
+    def test_import_rlcard(self):
+        modules = import_modules('import rlcard, rlcard.agents, rlcard.models')
+        for name in modules:
+            self.assertFalse(name.startswith('torch'), name)
+            self.assertFalse(name.startswith('rlcard.games.') and name != 'rlcard.games.base', name)
+            self.assertFalse(name.startswith('rlcard.agents.'), name)
+            self.assertNotIn(name, ('subprocess', 'rlcard.envs.doudizhu', 'rlcard.envs.uno'))
+
+    def test_import_time(self):
+        statement = 'import rlcard, rlcard.agents, rlcard.models'
+        import_time = min(rlcard_import_time(statement) for _ in range(IMPORT_TIME_RUNS))
+        self.assertLess(import_time, IMPORT_TIME_BUDGET_US)
+
+    def test_make(self):
+        modules = import_modules("import rlcard; rlcard.make('leduc-holdem')")
+        self.assertIn('rlcard.envs.leducholdem', modules)
+        self.assertNotIn('rlcard.envs.doudizhu', modules)
+        self.assertNotIn('rlcard.games.mahjong', modules)
+
+    def test_agents(self):
+        modules = import_modules('from rlcard.agents import RandomAgent, CFRAgent')
+        self.assertIn('rlcard.agents.random_agent', modules)
+        self.assertIn('rlcard.agents.cfr_agent', modules)
+        self.assertNotIn('rlcard.agents.human_agents', modules)
+        self.assertFalse(any(name.startswith('torch') for name in modules))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+
+from rlcard.agents import RandomAgent
+from rlcard.utils.parallel_tournament import ParallelTournament
+
+class TestParallelTournament(unittest.TestCase):
+
+    def check_parallel_tournament(self, env_id, models, context=None):
+        results = []
+        for num_workers in [0, 2]:
+            with ParallelTournament(env_id, models, num_workers=num_workers, games_per_chunk=7, context=context) as tournament:
+                results.append(tournament.run(30, seed=3))
+                # The pool is reused, and another seed gives other games
+                results.append(tournament.run(30, seed=4))
+        serial, serial_other_seed, parallel, parallel_other_seed = results
+        self.assertEqual(serial.mean.tolist(), parallel.mean.tolist())
+        self.assertEqual(serial.var.tolist(), parallel.var.tolist())
+        self.assertEqual(serial_other_seed.mean.tolist(), parallel_other_seed.mean.tolist())
+        self.assertEqual(serial.count.tolist(), [30] * len(models))
+
+    def test_leduc_holdem(self):
+        self.check_parallel_tournament('leduc-holdem', ['leduc-holdem-rule-v1', 'random'])
+
+    def test_doudizhu(self):
+        self.check_parallel_tournament('doudizhu', ['doudizhu-rule-v1', 'random', 'random'])
+
+    def test_spawn(self):
+        self.check_parallel_tournament('no-limit-holdem', [RandomAgent(5), 'random'], context='spawn')
+
+    def test_payoffs(self):
+        with ParallelTournament('leduc-holdem', ['random', 'random'], num_workers=0) as tournament:
+            result = tournament.run(200, seed=0)
+        self.assertAlmostEqual(result.mean.sum(), 0)
+        self.assertTrue(np.all(result.var > 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -33,7 +33,25 @@ class TestUtils(unittest.TestCase):
 
     def test_reorganize(self):
         trajectories = reorganize([[[1,2],1,[4,5]]], [1])
-        self.assertEqual(np.array(trajectories).shape, (1, 1, 5))
+        self.assertEqual(len(trajectories), 1)
+        self.assertEqual(len(trajectories[0]), 1)
+        state, action, reward, next_state, done = trajectories[0][0]
+        self.assertEqual((state, action, reward, next_state, done), ([1,2], 1, 1, [4,5], True))
+
+    def test_reorganize_columnar(self):
+        trajectories = []
+        for columnar in [False, True]:
+            env = rlcard.make('leduc-holdem', config={'seed': 0})
+            env.set_agents([RandomAgent(env.num_actions), RandomAgent(env.num_actions)])
+            np.random.seed(0)
+            trajectories.append(reorganize(*env.run(is_training=True, columnar=columnar)))
+        for player_trajectory, transitions in zip(*trajectories):
+            self.assertEqual(len(transitions.action), len(player_trajectory))
+            for i, (state, action, reward, next_state, done) in enumerate(player_trajectory):
+                self.assertEqual(transitions.state[i].tolist(), state['obs'].tolist())
+                self.assertEqual(transitions.next_state[i].tolist(), next_state['obs'].tolist())
+                self.assertEqual(np.flatnonzero(transitions.legal_actions[i]).tolist(), sorted(next_state['legal_actions']))
+                self.assertEqual((transitions.action[i], transitions.reward[i], transitions.done[i]), (action, reward, done))
 
     def test_tournament(self):
         env = rlcard.make('leduc-holdem')